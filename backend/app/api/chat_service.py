@@ -0,0 +1,580 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from fastapi import BackgroundTasks, Depends, HTTPException
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from app.api.models import (
+    BatchChatResult,
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+    SearchFilters,
+    Source,
+)
+from app.cache.response import CacheKey, ResponseCache, get_response_cache, make_cache_key
+from app.cache.semantic import SemanticCache, get_semantic_cache
+from app.cache.session import ChatSession, SessionStore, get_session_store
+from app.config import Settings, get_settings
+from app.core.admission import AdmissionController, AdmissionRejected, get_admission_controller
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.core.singleflight import SingleFlight, get_chat_singleflight
+import app.db.connection as db_conn
+from app.db.repository import QueryLogRepository
+from app.rag.embedder import CachedEmbeddings
+from app.rag.filters import MetadataFilter, date_to_int
+from app.rag.quotes import RECOMMEND, decide_response_mode
+from app.rag.registry import RagRegistry, get_rag_registry
+from app.rag.rewrite import REWRITTEN, decide_rewrite
+
+logger = logging.getLogger(__name__)
+
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "error"
+
+DEGRADED_ANSWER = (
+    "답변 생성 시간이 초과되어 요약 답변을 드리지 못했습니다. "
+    "아래 관련 글을 참고해주세요."
+)
+DEGRADED_ANSWER_NO_SOURCES = (
+    "답변 생성 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."
+)
+
+
+def to_langchain_history(messages: list[ChatMessage] | None) -> list[BaseMessage]:
+    """chat_history를 LangChain 메시지 형식으로 변환한다."""
+    chat_history = []
+    for msg in messages or []:
+        if msg.role == "human":
+            chat_history.append(HumanMessage(content=msg.content))
+        else:
+            chat_history.append(AIMessage(content=msg.content))
+    return chat_history
+
+
+def to_metadata_filter(filters: SearchFilters | None) -> MetadataFilter | None:
+    """요청 필터를 검색기용 MetadataFilter로 변환한다. 조건이 없으면 None."""
+    if filters is None:
+        return None
+    metadata_filter = MetadataFilter(
+        category=tuple(filters.category),
+        tags=tuple(filters.tags),
+        type=tuple(filters.type),
+        author=tuple(filters.author),
+        topics=tuple(filters.topics),
+        date_from=date_to_int(filters.date_from) if filters.date_from else None,
+        date_to=date_to_int(filters.date_to) if filters.date_to else None,
+    )
+    return metadata_filter or None
+
+
+def extract_sources(documents: list[Document]) -> list[Source]:
+    """소스 문서에서 중복 제거하여 출처를 생성한다."""
+    seen_urls = set()
+    sources = []
+    for doc in documents:
+        url = doc.metadata.get("url", "")
+        title = doc.metadata.get("title", "")
+        if url and url not in seen_urls:
+            seen_urls.add(url)
+            sources.append(Source(title=title, url=url))
+    return sources
+
+
+@dataclass
+class Generated:
+    """RAG 파이프라인 실행 결과 (single-flight로 공유된다)."""
+
+    response: ChatResponse
+    outcome: str = OUTCOME_OK
+    query: str | None = None  # 검색에 사용한 독립 질문 (캐시 히트 시 None)
+    chunk_ids: list[str] = field(default_factory=list)
+
+
+def chunk_ids(documents: list[Document]) -> list[str]:
+    return [doc.id for doc in documents if doc.id]
+
+
+def degraded_response(exc: DeadlineExceeded) -> ChatResponse:
+    """마감 시간 초과 시 검색된 출처와 템플릿 답변으로 구성한 응답."""
+    sources = extract_sources(exc.context)
+    return ChatResponse(
+        answer=DEGRADED_ANSWER if sources else DEGRADED_ANSWER_NO_SOURCES,
+        sources=sources,
+        degraded=True,
+    )
+
+
+def timeout_outcome(exc: DeadlineExceeded) -> str:
+    return f"timeout_{exc.stage}"
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Server-Sent Events 형식의 메시지를 생성한다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def save_query_log(
+    message_id: str,
+    request: ChatRequest,
+    answer: str,
+    sources: list[Source],
+    response_time_ms: int,
+    rewrite_path: str | None = None,
+    outcome: str | None = OUTCOME_OK,
+) -> None:
+    """쿼리 로그를 저장한다. DB 미설정 또는 저장 실패 시 응답에는 영향을 주지 않는다."""
+    if not db_conn.async_session_factory:
+        return
+    try:
+        async with db_conn.async_session_factory() as session:
+            repo = QueryLogRepository(session)
+            await repo.save_query_log(
+                message_id=message_id,
+                blog_id=request.blog_id,
+                question=request.question,
+                answer=answer,
+                sources=[s.model_dump() for s in sources],
+                response_time_ms=response_time_ms,
+                has_results=len(sources) > 0,
+                rewrite_path=rewrite_path,
+                outcome=outcome,
+            )
+    except Exception:
+        logger.exception("쿼리 로그 저장 실패", extra={
+            "blog_id": request.blog_id,
+            "question": request.question[:100],
+        })
+
+
+class ChatService:
+    """/chat, /chat/stream, /chat/batch 공통 처리 파이프라인.
+
+    세션 조회 → 정확 일치 응답 캐시 → single-flight(시맨틱 캐시 → RAG 체인) → 세션 갱신
+    → 쿼리 로그 순으로 처리한다.
+    RAG 체인은 요청 마감 시간 안에서 실행되며, 초과 시 degraded 응답을 반환하고 캐싱하지 않는다.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        registry: RagRegistry,
+        semantic_cache: SemanticCache,
+        response_cache: ResponseCache,
+        singleflight: SingleFlight,
+        admission: AdmissionController,
+        sessions: SessionStore,
+    ):
+        self.settings = settings
+        self.registry = registry
+        self.semantic_cache = semantic_cache
+        self.response_cache = response_cache
+        self.singleflight = singleflight
+        self.admission = admission
+        self.sessions = sessions
+
+    def validate(self, request: ChatRequest) -> None:
+        if request.blog_id not in self.settings.blog_collections:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown blog_id: {request.blog_id}"
+            )
+
+    async def _resolve_session(
+        self, request: ChatRequest, create: bool = True
+    ) -> tuple[ChatSession | None, ChatRequest, str | None]:
+        """세션을 조회하거나 새로 만든다.
+
+        세션은 클라이언트가 session_id를 보냈거나 new_session으로 요청한 경우에만 만든다
+        (create=False이면 만들지 않는다). 세션을 쓰지 않는 요청은 세션 없이 처리된다.
+        요청의 chat_history가 없거나 비어 있으면 세션에 저장된 대화를 chat_history로 채운 요청을 반환한다
+        (항상 chat_history: []를 보내는 클라이언트도 세션 히스토리를 잃지 않는다).
+
+        Returns:
+            (세션 또는 None, chat_history가 채워진 요청, 직전 턴의 독립 질문)
+        """
+        session = None
+        if request.session_id:
+            session = await self.sessions.get(request.session_id, request.blog_id)
+        if session is None:
+            if not create or not (request.session_id or request.new_session):
+                return None, request, None
+            session = self.sessions.create(request.blog_id)
+        if request.chat_history or not session.turns:
+            return session, request, None
+        request = request.model_copy(update={"chat_history": session.history()})
+        return session, request, session.last_query
+
+    async def _record_turn(
+        self, session: ChatSession | None, request: ChatRequest, answer: str, generated: Generated | None
+    ) -> None:
+        if session is None:
+            return
+        session.append_turn(request.question, answer, self.sessions.max_turns)
+        if generated is not None and generated.query:
+            session.last_query = generated.query
+            session.last_chunk_ids = generated.chunk_ids
+        await self.sessions.save(session)
+
+    def _new_deadline(self) -> Deadline | None:
+        if self.settings.chat_deadline_seconds <= 0:
+            return None
+        return Deadline(self.settings.chat_deadline_seconds, {
+            "history": self.settings.deadline_share_history,
+            "rewrite": self.settings.deadline_share_rewrite,
+            "retrieval": self.settings.deadline_share_retrieval,
+            "generation": 1.0,
+        })
+
+    def _rewrite_path(self, request: ChatRequest) -> str:
+        return decide_rewrite(
+            request.question, request.chat_history, self.settings.question_rewrite_policy
+        )
+
+    def _response_mode(self, request: ChatRequest) -> str:
+        return decide_response_mode(
+            request.blog_id, request.question, request.chat_history, request.mode,
+            auto=self.settings.inspireme_fast_path_enabled,
+        )
+
+    def _chat_key(self, request: ChatRequest) -> CacheKey:
+        """응답 캐시와 single-flight에 공통으로 쓰는 요청 키를 생성한다."""
+        return make_cache_key(
+            request.blog_id,
+            request.language,
+            request.question,
+            request.chat_history,
+            self.registry.index_version(request.blog_id),
+            self._response_mode(request),
+            self._filter_key(request),
+        )
+
+    def _filter_key(self, request: ChatRequest) -> str:
+        metadata_filter = to_metadata_filter(request.filters)
+        return metadata_filter.cache_key() if metadata_filter else ""
+
+    def _cached_response(self, key: CacheKey) -> ChatResponse | None:
+        if not self.settings.response_cache_enabled:
+            return None
+        return self.response_cache.get(key)
+
+    def _cache_response(self, key: CacheKey, response: ChatResponse) -> None:
+        if self.settings.response_cache_enabled:
+            self.response_cache.put(key, response)
+
+    async def _lookup_semantic_cache(
+        self, request: ChatRequest
+    ) -> tuple[ChatResponse | None, list[float] | None]:
+        """chat_history가 없는 질문에 대해 시맨틱 캐시를 조회한다.
+
+        명언 추천 모드는 검색 시간만 들고 LLM 답변과 섞이면 안 되므로 시맨틱 캐시를 쓰지 않는다.
+        필터가 있는 요청은 검색 범위가 달라 필터 없는 답변을 재사용할 수 없으므로 제외한다.
+
+        Returns:
+            (캐싱된 응답 또는 None, 질문 임베딩 또는 None). 캐시 미적용 대상이면 (None, None).
+        """
+        if not self.settings.semantic_cache_enabled or request.chat_history:
+            return None, None
+        if self._response_mode(request) == RECOMMEND or to_metadata_filter(request.filters):
+            return None, None
+        embedding = await self.registry.manager.embeddings.aembed_query(request.question)
+        cached = self.semantic_cache.lookup(request.blog_id, request.language, embedding)
+        return cached, embedding
+
+    def _store_semantic(
+        self, request: ChatRequest, embedding: list[float] | None, response: ChatResponse
+    ) -> None:
+        if embedding is not None:
+            self.semantic_cache.store(
+                request.blog_id, request.language, request.question, embedding, response
+            )
+
+    async def _chain_input(
+        self,
+        request: ChatRequest,
+        rewrite_path: str,
+        deadline: Deadline | None,
+        previous_query: str | None = None,
+    ) -> dict:
+        """체인 입력을 만든다. chat_history는 최근 턴 + 이전 대화 요약으로 제한된다.
+
+        요약은 LLM 호출이므로 마감 시간의 history 단계 안에서만 기다리고,
+        초과하면 요약 없이 최근 턴만 사용한다.
+        """
+        chat_history = to_langchain_history(request.chat_history)
+        if chat_history:
+            history_manager = self.registry.history_manager
+            if deadline is None:
+                chat_history = await history_manager.abound(chat_history)
+            else:
+                chat_history = await history_manager.abound_within(
+                    chat_history, deadline.stage_timeout("history")
+                )
+        return {
+            "input": request.question,
+            "chat_history": chat_history,
+            "rewrite_path": rewrite_path,
+            "deadline": deadline,
+            "previous_query": previous_query,
+            "response_mode": self._response_mode(request),
+            "metadata_filter": to_metadata_filter(request.filters),
+        }
+
+    def _get_chain(self, request: ChatRequest):
+        return self.registry.get_chain(
+            request.blog_id, request.language, self.settings.openai_model, self.settings.top_k
+        )
+
+    async def _generate(
+        self,
+        request: ChatRequest,
+        rewrite_path: str,
+        deadline: Deadline | None,
+        previous_query: str | None = None,
+    ) -> Generated:
+        """시맨틱 캐시 조회 후 미스이면 RAG 체인을 실행한다. message_id는 채우지 않는다.
+
+        마감 시간 초과 시 degraded 응답과 timeout_<단계> outcome을 반환한다.
+        """
+        cached, query_embedding = await self._lookup_semantic_cache(request)
+        if cached is not None:
+            return Generated(cached)
+
+        chain_input = await self._chain_input(request, rewrite_path, deadline, previous_query)
+        try:
+            result = await self._get_chain(request).ainvoke(chain_input)
+        except DeadlineExceeded as e:
+            logger.warning("요청 마감 시간 초과 - degraded 응답", extra={
+                "blog_id": request.blog_id, "stage": e.stage,
+            })
+            return Generated(degraded_response(e), timeout_outcome(e))
+        context = result.get("context", [])
+        response = ChatResponse(answer=result["answer"], sources=extract_sources(context))
+        self._store_semantic(request, query_embedding, response)
+        return Generated(response, query=result.get("query"), chunk_ids=chunk_ids(context))
+
+    async def answer(
+        self,
+        request: ChatRequest,
+        background_tasks: BackgroundTasks | None = None,
+        create_session: bool = True,
+    ) -> ChatResponse:
+        """질문에 답변한다.
+
+        같은 질문이 동시에 들어오면 하나의 체인 실행 결과를 공유한다 (single-flight).
+        message_id와 쿼리 로그는 요청마다 따로 생성된다.
+        """
+        self.validate(request)
+
+        start_time = time.time()
+        deadline = self._new_deadline()
+        message_id = str(uuid.uuid4())
+        session, request, previous_query = await self._resolve_session(request, create_session)
+        rewrite_path = self._rewrite_path(request)
+        reply_ids = {"message_id": message_id, "session_id": session and session.session_id}
+
+        # 정확 일치 캐시 히트는 Chroma/OpenAI를 모두 건너뛰고 로그 저장도 응답 이후로 미룬다
+        chat_key = self._chat_key(request)
+        cached = self._cached_response(chat_key)
+        if cached is not None:
+            response = cached.model_copy(update=reply_ids)
+            await self._record_turn(session, request, response.answer, None)
+            response_time_ms = int((time.time() - start_time) * 1000)
+            log_args = (
+                message_id, request, response.answer, response.sources, response_time_ms, rewrite_path,
+            )
+            if background_tasks is not None:
+                background_tasks.add_task(save_query_log, *log_args)
+            else:
+                await save_query_log(*log_args)
+            return response
+
+        try:
+            generated, _ = await self.singleflight.do(
+                chat_key, lambda: self._generate(request, rewrite_path, deadline, previous_query)
+            )
+        except Exception:
+            # stream()과 같이 실패한 요청도 outcome=error로 쿼리 로그에 남긴 뒤 그대로 전파한다
+            response_time_ms = int((time.time() - start_time) * 1000)
+            await save_query_log(message_id, request, "", [], response_time_ms, rewrite_path, OUTCOME_ERROR)
+            raise
+        if not generated.response.degraded:
+            self._cache_response(chat_key, generated.response)
+        response = generated.response.model_copy(update=reply_ids)
+        await self._record_turn(session, request, response.answer, generated)
+
+        response_time_ms = int((time.time() - start_time) * 1000)
+        await save_query_log(
+            message_id, request, response.answer, response.sources, response_time_ms,
+            rewrite_path, generated.outcome,
+        )
+        return response
+
+    async def stream(self, request: ChatRequest) -> AsyncIterator[str]:
+        """답변을 SSE 이벤트 문자열로 스트리밍한다.
+
+        답변 토큰을 `token` 이벤트로 전송하고, 마지막에 sources, message_id, session_id를
+        `done` 이벤트로 전송한다. 생성 중 오류가 발생하면 `error` 이벤트로 종료한다.
+        캐시 히트 시에는 전체 답변을 하나의 `token` 이벤트로 전송한다.
+        """
+        start_time = time.time()
+        deadline = self._new_deadline()
+        message_id = str(uuid.uuid4())
+        session, request, previous_query = await self._resolve_session(request)
+        rewrite_path = self._rewrite_path(request)
+        chat_key = self._chat_key(request)
+
+        cached = self._cached_response(chat_key)
+        query_embedding = None
+        if cached is None:
+            cached, query_embedding = await self._lookup_semantic_cache(request)
+        if cached is not None:
+            yield sse_event("token", {"token": cached.answer})
+            yield sse_event("done", {
+                "sources": [s.model_dump() for s in cached.sources],
+                "message_id": message_id,
+                "session_id": session and session.session_id,
+                "degraded": False,
+            })
+            self._cache_response(chat_key, cached)
+            await self._record_turn(session, request, cached.answer, None)
+            response_time_ms = int((time.time() - start_time) * 1000)
+            await save_query_log(
+                message_id, request, cached.answer, cached.sources, response_time_ms, rewrite_path
+            )
+            return
+
+        chain = self._get_chain(request)
+        context: list[Document] = []
+        answer_parts: list[str] = []
+        outcome = OUTCOME_OK
+        search_query = None
+        try:
+            chain_input = await self._chain_input(request, rewrite_path, deadline, previous_query)
+            async for chunk in chain.astream(chain_input):
+                if "query" in chunk:
+                    search_query = chunk["query"]
+                if "context" in chunk:
+                    context = chunk["context"]
+                token = chunk.get("answer")
+                if token:
+                    answer_parts.append(token)
+                    yield sse_event("token", {"token": token})
+        except DeadlineExceeded as e:
+            # 이미 보낸 토큰은 그대로 두고, 아직 없으면 템플릿 답변을 보낸다
+            logger.warning("스트리밍 마감 시간 초과", extra={
+                "blog_id": request.blog_id, "stage": e.stage, "sent_tokens": len(answer_parts),
+            })
+            outcome = timeout_outcome(e)
+            context = e.context or context
+            if not answer_parts:
+                fallback = degraded_response(e)
+                answer_parts.append(fallback.answer)
+                yield sse_event("token", {"token": fallback.answer})
+        except Exception:
+            logger.exception("스트리밍 답변 생성 실패", extra={
+                "blog_id": request.blog_id,
+                "question": request.question[:100],
+            })
+            yield sse_event("error", {"detail": "답변 생성 중 오류가 발생했습니다."})
+            # 실패한 요청도 쿼리 로그에 남겨 outcome 통계에서 오류율을 볼 수 있게 한다
+            response_time_ms = int((time.time() - start_time) * 1000)
+            await save_query_log(
+                message_id, request, "".join(answer_parts), extract_sources(context),
+                response_time_ms, rewrite_path, OUTCOME_ERROR,
+            )
+            return
+
+        degraded = outcome != OUTCOME_OK
+        sources = extract_sources(context)
+        yield sse_event("done", {
+            "sources": [s.model_dump() for s in sources],
+            "message_id": message_id,
+            "session_id": session and session.session_id,
+            "degraded": degraded,
+        })
+
+        response = ChatResponse(answer="".join(answer_parts), sources=sources, degraded=degraded)
+        if not degraded:
+            self._store_semantic(request, query_embedding, response)
+            self._cache_response(chat_key, response)
+        await self._record_turn(
+            session, request, response.answer,
+            Generated(response, outcome, search_query, chunk_ids(context)),
+        )
+
+        response_time_ms = int((time.time() - start_time) * 1000)
+        await save_query_log(
+            message_id, request, response.answer, sources, response_time_ms, rewrite_path, outcome
+        )
+
+    async def _prefetch_query_embeddings(self, requests: list[ChatRequest]) -> None:
+        """재작성 없이 그대로 검색될 질문들의 임베딩을 한 번의 API 호출로 미리 계산한다.
+
+        결과는 쿼리 임베딩 캐시에 저장되므로 이후 시맨틱 캐시 조회와 검색기는 캐시 히트가 된다.
+        """
+        embeddings = self.registry.manager.embeddings
+        if not isinstance(embeddings, CachedEmbeddings):
+            return
+        questions = [
+            r.question for r in requests
+            if r.blog_id in self.settings.blog_collections and self._rewrite_path(r) != REWRITTEN
+        ]
+        if questions:
+            await embeddings.aembed_queries(questions)
+
+    async def answer_batch(
+        self, requests: list[ChatRequest], max_concurrency: int
+    ) -> list[BatchChatResult]:
+        """여러 질문을 최대 max_concurrency개씩 동시에 처리한다. 결과는 요청 순서를 유지한다.
+
+        각 항목은 단건 요청과 같은 admission 슬롯(전체/blog_id별 상한)을 사용한다.
+        """
+        try:
+            await self._prefetch_query_embeddings(requests)
+        except Exception:
+            # 일괄 임베딩 실패 시 항목별 임베딩으로 진행
+            logger.exception("일괄 쿼리 임베딩 실패", extra={"count": len(requests)})
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(request: ChatRequest) -> BatchChatResult:
+            async with semaphore:
+                try:
+                    self.validate(request)
+                    async with self.admission.slot(request.blog_id):
+                        # 배치 항목은 기존 세션만 읽고 새 세션은 만들지 않는다
+                        return BatchChatResult(
+                            response=await self.answer(request, create_session=False)
+                        )
+                except HTTPException as e:
+                    return BatchChatResult(error=str(e.detail))
+                except AdmissionRejected as e:
+                    return BatchChatResult(error=e.reason)
+                except Exception:
+                    logger.exception("배치 항목 처리 실패", extra={
+                        "blog_id": request.blog_id,
+                        "question": request.question[:100],
+                    })
+                    return BatchChatResult(error="답변 생성 중 오류가 발생했습니다.")
+
+        return await asyncio.gather(*(run(r) for r in requests))
+
+
+def get_chat_service(
+    settings: Settings = Depends(get_settings),
+    registry: RagRegistry = Depends(get_rag_registry),
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    singleflight: SingleFlight = Depends(get_chat_singleflight),
+    admission: AdmissionController = Depends(get_admission_controller),
+    sessions: SessionStore = Depends(get_session_store),
+) -> ChatService:
+    return ChatService(
+        settings, registry, semantic_cache, response_cache, singleflight, admission, sessions
+    )
@@ -1,6 +1,7 @@
+from datetime import date
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ChatMessage(BaseModel):
@@ -8,11 +9,34 @@ class ChatMessage(BaseModel):
     content: str
 
 
+class SearchFilters(BaseModel):
+    """검색 사전 필터. 필드 안의 값은 OR, 필드 간에는 AND, 날짜는 양 끝 포함.
+
+    블로그는 category/tags/date_from/date_to, inspireme는 type/author/topics를 사용한다.
+    """
+
+    category: list[str] = []
+    tags: list[str] = []
+    date_from: date | None = None
+    date_to: date | None = None
+    type: list[Literal["quote", "author"]] = []
+    author: list[str] = []
+    topics: list[str] = []
+
+
 class ChatRequest(BaseModel):
     blog_id: str
     question: str
     chat_history: list[ChatMessage] | None = None
     language: str | None = None
+    # 서버 세션 ID. chat_history 없이(또는 빈 목록으로) 보내면 세션에 저장된 대화를 히스토리로 사용한다
+    session_id: str | None = None
+    # session_id 없이 true로 보내면 새 세션을 만들어 응답의 session_id로 반환한다 (배치 항목은 무시)
+    new_session: bool = False
+    # inspireme 응답 모드. None이면 의도 분류기로 결정, "recommend"는 LLM 없이 명언 목록 반환
+    mode: Literal["generate", "recommend"] | None = None
+    # 메타데이터 사전 필터 (검색 대상 청크를 제한)
+    filters: SearchFilters | None = None
 
 
 class Source(BaseModel):
@@ -24,6 +48,45 @@ class ChatResponse(BaseModel):
     answer: str
     sources: list[Source]
     message_id: str = ""
+    degraded: bool = False  # 마감 시간 초과로 템플릿 답변을 반환한 경우
+    session_id: str | None = None
+
+
+class BatchChatRequest(BaseModel):
+    requests: list[ChatRequest] = Field(min_length=1)
+    max_concurrency: int | None = Field(default=None, ge=1)
+
+
+class BatchChatResult(BaseModel):
+    response: ChatResponse | None = None
+    error: str | None = None
+
+
+class BatchChatResponse(BaseModel):
+    results: list[BatchChatResult]
+
+
+class SearchRequest(BaseModel):
+    blog_id: str
+    query: str = Field(min_length=1)
+    limit: int = Field(default=5, ge=1)
+    # BM25 + 시맨틱 RRF 융합 여부 (None이면 use_hybrid_search 설정을 따른다).
+    # true인데 blog_id의 BM25 인덱스가 없으면 400
+    hybrid: bool | None = None
+    filters: SearchFilters | None = None
+
+
+class SearchResult(BaseModel):
+    title: str
+    url: str
+    score: float
+    snippet: str
+    chunks: int  # 이 게시글에서 검색된 청크 수
+
+
+class SearchResponse(BaseModel):
+    results: list[SearchResult]
+    took_ms: int
 
 
 class IndexResponse(BaseModel):
@@ -3,32 +3,43 @@ import shutil
 import subprocess
 import tempfile
 import time
-import uuid
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from langchain_core.messages import AIMessage, HumanMessage
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.chat_service import ChatService, get_chat_service, to_metadata_filter
 from app.api.models import (
+    BatchChatRequest,
+    BatchChatResponse,
     ChatRequest,
     ChatResponse,
     FeedbackRequest,
     FeedbackResponse,
     HealthResponse,
     IndexResponse,
-    Source,
+    SearchRequest,
+    SearchResponse,
+    SearchResult,
 )
+from app.cache.response import ResponseCache, get_response_cache
+from app.cache.semantic import SemanticCache, get_semantic_cache
+from app.cache.session import SessionStore, get_session_store
 from app.config import Settings, get_settings
+from app.core.admission import AdmissionController, get_admission_controller
+from app.core.http import HttpPool, get_http_pool
+from app.core.singleflight import SingleFlight, get_chat_singleflight
 import app.db.connection as db_conn
 from app.db.connection import get_session
 from app.db.repository import QueryLogRepository
-from app.rag.chain import create_rag_chain
 from app.rag.chunker import split_documents
 from app.rag.document_loader import load_blog_documents
-from app.rag.embedder import create_embeddings
+from app.rag.indexing import build_search_indexes, remove_search_indexes
 from app.rag.inspireme_loader import load_inspireme_documents
-from app.rag.vector_store import VectorStoreManager
+from app.rag.registry import RagRegistry, get_rag_registry
+from app.rag.search import search_posts
 
 logger = logging.getLogger(__name__)
 
@@ -41,13 +52,6 @@ BLOG_REPOS = {
 }
 
 
-def get_vector_store_manager(
-    settings: Settings = Depends(get_settings),
-) -> VectorStoreManager:
-    embeddings = create_embeddings(settings.embedding_model)
-    return VectorStoreManager(settings.chroma_host, settings.chroma_port, embeddings)
-
-
 def verify_index_token(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     settings: Settings = Depends(get_settings),
@@ -60,74 +64,133 @@ def verify_index_token(
     return credentials.credentials
 
 
+def client_ip(http_request: Request, settings: Settings) -> str:
+    """rate limit에 사용할 클라이언트 IP를 반환한다."""
+    if settings.rate_limit_trust_forwarded_for:
+        forwarded = http_request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return http_request.client.host if http_request.client else ""
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
     settings: Settings = Depends(get_settings),
-    manager: VectorStoreManager = Depends(get_vector_store_manager),
+    service: ChatService = Depends(get_chat_service),
+    admission: AdmissionController = Depends(get_admission_controller),
 ):
     """RAG 기반 Q&A - blog_id로 Collection 선택"""
-    if request.blog_id not in settings.blog_collections:
+    service.validate(request)
+    async with admission.admit(request.blog_id, client_ip(http_request, settings)):
+        return await service.answer(request, background_tasks)
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    http_request: Request,
+    settings: Settings = Depends(get_settings),
+    service: ChatService = Depends(get_chat_service),
+    admission: AdmissionController = Depends(get_admission_controller),
+):
+    """RAG 기반 Q&A 스트리밍 (SSE)
+
+    admission 슬롯은 스트림이 끝날 때까지 유지된다.
+    """
+    service.validate(request)
+    admission.check_rate(client_ip(http_request, settings))
+    await admission.acquire(request.blog_id)
+
+    released = False
+
+    async def release_once():
+        nonlocal released
+        if not released:
+            released = True
+            await admission.release(request.blog_id)
+
+    async def event_stream():
+        try:
+            async for event in service.stream(request):
+                yield event
+        finally:
+            await release_once()
+
+    # 스트림이 시작되기 전에 연결이 끊긴 경우에도 슬롯이 반환되도록 background로 한 번 더 해제
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release_once),
+    )
+
+
+@router.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(
+    request: BatchChatRequest,
+    http_request: Request,
+    settings: Settings = Depends(get_settings),
+    service: ChatService = Depends(get_chat_service),
+    admission: AdmissionController = Depends(get_admission_controller),
+):
+    """여러 질문을 제한된 동시성으로 처리 - 결과는 요청 순서대로, 항목별 오류 포함"""
+    admission.check_rate(client_ip(http_request, settings))
+    if len(request.requests) > settings.batch_max_items:
         raise HTTPException(
-            status_code=400, detail=f"Unknown blog_id: {request.blog_id}"
+            status_code=400,
+            detail=f"Too many requests in batch: {len(request.requests)} > {settings.batch_max_items}",
         )
 
-    start_time = time.time()
-    message_id = str(uuid.uuid4())
-
-    store = manager.get_store(request.blog_id)
-    chain = create_rag_chain(store, settings.openai_model, settings.top_k, blog_id=request.blog_id, language=request.language)
-
-    # chat_history를 LangChain 메시지 형식으로 변환
-    chat_history = []
-    if request.chat_history:
-        for msg in request.chat_history:
-            if msg.role == "human":
-                chat_history.append(HumanMessage(content=msg.content))
-            else:
-                chat_history.append(AIMessage(content=msg.content))
-
-    result = chain.invoke({
-        "input": request.question,
-        "chat_history": chat_history,
-    })
-
-    # 소스 문서에서 중복 제거하여 출처 생성
-    seen_urls = set()
-    sources = []
-    for doc in result.get("context", []):
-        url = doc.metadata.get("url", "")
-        title = doc.metadata.get("title", "")
-        if url and url not in seen_urls:
-            seen_urls.add(url)
-            sources.append(Source(title=title, url=url))
-
-    response_time_ms = int((time.time() - start_time) * 1000)
-
-    # 쿼리 로그 저장
-    if db_conn.async_session_factory:
-        try:
-            async with db_conn.async_session_factory() as session:
-                repo = QueryLogRepository(session)
-                await repo.save_query_log(
-                    message_id=message_id,
-                    blog_id=request.blog_id,
-                    question=request.question,
-                    answer=result["answer"],
-                    sources=[s.model_dump() for s in sources],
-                    response_time_ms=response_time_ms,
-                    has_results=len(sources) > 0,
-                )
-        except Exception:
-            logger.exception("쿼리 로그 저장 실패", extra={
-                "blog_id": request.blog_id,
-                "question": request.question[:100],
-            })
+    max_concurrency = min(
+        request.max_concurrency or settings.batch_max_concurrency,
+        settings.batch_max_concurrency,
+    )
+    results = await service.answer_batch(request.requests, max_concurrency)
+    return BatchChatResponse(results=results)
 
-    return ChatResponse(
-        answer=result["answer"],
-        sources=sources,
-        message_id=message_id,
+
+@router.post("/search", response_model=SearchResponse)
+async def search(
+    request: SearchRequest,
+    http_request: Request,
+    settings: Settings = Depends(get_settings),
+    registry: RagRegistry = Depends(get_rag_registry),
+    admission: AdmissionController = Depends(get_admission_controller),
+):
+    """LLM 없이 검색기만 실행해 관련 게시글을 url 단위로 반환 (입력 중 추천용)"""
+    if request.blog_id not in settings.blog_collections:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown blog_id: {request.blog_id}"
+        )
+    # LLM 호출이 없어 실행 슬롯은 잡지 않고 클라이언트별 rate limit만 적용한다
+    admission.check_rate(client_ip(http_request, settings))
+    start_time = time.perf_counter()
+    hybrid = settings.use_hybrid_search if request.hybrid is None else request.hybrid
+    # 재인덱싱마다 BM25 인덱스를 다시 만들거나 지우므로, 디스크에 있는 인덱스는 현재 Collection과 같은 청크다.
+    # 명시적으로 hybrid를 요청했는데 인덱스가 없으면 조용히 시맨틱 검색으로 바꾸지 않고 거절한다
+    keyword_index = registry.keyword_index(request.blog_id) if hybrid else None
+    if request.hybrid and keyword_index is None:
+        raise HTTPException(
+            status_code=400, detail=f"Keyword index not available for: {request.blog_id}"
+        )
+    # 후보 수가 요청값에 끌려 커지지 않도록 최대 결과 수로 먼저 제한한다
+    limit = min(request.limit, settings.search_max_results)
+    hits = await search_posts(
+        registry.manager, request.blog_id, request.query,
+        limit=limit,
+        fetch_k=max(settings.search_fetch_k, limit),
+        keyword_index=keyword_index,
+        rrf_k=settings.hybrid_rrf_k,
+        weights=(settings.hybrid_semantic_weight, settings.hybrid_keyword_weight),
+        vector_index=registry.local_vector_index(request.blog_id),
+        metadata_filter=to_metadata_filter(request.filters),
+    )
+    return SearchResponse(
+        results=[SearchResult(**vars(hit)) for hit in hits],
+        took_ms=int((time.perf_counter() - start_time) * 1000),
     )
 
 
@@ -136,7 +199,8 @@ async def reindex(
     blog_id: str,
     _token: str = Depends(verify_index_token),
     settings: Settings = Depends(get_settings),
-    manager: VectorStoreManager = Depends(get_vector_store_manager),
+    registry: RagRegistry = Depends(get_rag_registry),
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
 ):
     """블로그 문서 전체 재인덱싱 (Bearer 토큰 인증 필요)"""
     if blog_id not in settings.blog_collections:
@@ -144,31 +208,43 @@ async def reindex(
             status_code=400, detail=f"Unknown blog_id: {blog_id}"
         )
 
-    manager.delete_collection(blog_id)
-
-    if blog_id == "inspireme":
-        documents = await load_inspireme_documents(settings.inspireme_api_url)
-        indexed = manager.index_documents(blog_id, documents)
-    elif blog_id in BLOG_REPOS:
-        clone_dir = tempfile.mkdtemp(prefix=f"reindex-{blog_id}-")
-        try:
-            subprocess.run(
-                ["git", "clone", "--depth", "1", BLOG_REPOS[blog_id], clone_dir],
-                check=True,
-                capture_output=True,
-            )
-            contents_dir = f"{clone_dir}/contents/"
-
-            documents = load_blog_documents(contents_dir, blog_id)
-            chunks = split_documents(documents, settings.chunk_size, settings.chunk_overlap)
-            indexed = manager.index_documents(blog_id, chunks)
-        finally:
-            shutil.rmtree(clone_dir, ignore_errors=True)
-    else:
+    if blog_id != "inspireme" and blog_id not in BLOG_REPOS:
         raise HTTPException(
             status_code=400, detail=f"No repository for: {blog_id}"
         )
 
+    manager = registry.manager
+
+    try:
+        manager.delete_collection(blog_id)
+        # 중간에 실패해도 삭제된 Collection과 다른 청크를 담은 이전 인덱스가 로드되지 않도록 먼저 지운다
+        remove_search_indexes(settings, blog_id)
+
+        if blog_id == "inspireme":
+            chunks = await load_inspireme_documents(settings.inspireme_api_url)
+            indexed = manager.index_documents(blog_id, chunks)
+        else:
+            clone_dir = tempfile.mkdtemp(prefix=f"reindex-{blog_id}-")
+            try:
+                subprocess.run(
+                    ["git", "clone", "--depth", "1", BLOG_REPOS[blog_id], clone_dir],
+                    check=True,
+                    capture_output=True,
+                )
+                contents_dir = f"{clone_dir}/contents/"
+
+                documents = load_blog_documents(contents_dir, blog_id)
+                chunks = split_documents(documents, settings.chunk_size, settings.chunk_overlap)
+                indexed = manager.index_documents(blog_id, chunks)
+            finally:
+                shutil.rmtree(clone_dir, ignore_errors=True)
+
+        build_search_indexes(settings, manager, blog_id, chunks)
+    finally:
+        # 중간에 실패해도 삭제/재생성된 Collection을 가리키는 체인과 이전 답변 캐시는 반드시 폐기한다
+        registry.invalidate(blog_id)
+        semantic_cache.clear(blog_id)
+
     return IndexResponse(status="ok", blog_id=blog_id, indexed_chunks=indexed)
 
 
@@ -223,6 +299,8 @@ async def admin_stats():
             "feedback_score": {"total": 0, "up": 0, "down": 0, "up_ratio": 0.0},
             "avg_response_time": 0.0,
             "search_failure_rate": 0.0,
+            "response_time_by_rewrite_path": [],
+            "outcome_counts": [],
         }
 
     async with db_conn.async_session_factory() as session:
@@ -234,6 +312,8 @@ async def admin_stats():
             await repo.get_avg_response_time(),
             await repo.get_search_failure_rate(),
         )
+        response_time_by_rewrite_path = await repo.get_response_time_by_rewrite_path()
+        outcome_counts = await repo.get_outcome_counts()
 
     return {
         "daily_queries": daily_queries,
@@ -241,9 +321,45 @@ async def admin_stats():
         "feedback_score": feedback_score,
         "avg_response_time": avg_response_time,
         "search_failure_rate": search_failure_rate,
+        "response_time_by_rewrite_path": response_time_by_rewrite_path,
+        "outcome_counts": outcome_counts,
+    }
+
+
+@router.get("/admin/cache")
+async def admin_cache(
+    registry: RagRegistry = Depends(get_rag_registry),
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    singleflight: SingleFlight = Depends(get_chat_singleflight),
+    sessions: SessionStore = Depends(get_session_store),
+):
+    """캐시 현황 (항목 수, 히트/미스) 반환"""
+    return {
+        "response": response_cache.stats(),
+        "semantic": semantic_cache.stats(),
+        "registry": registry.stats(),
+        "singleflight": singleflight.stats(),
+        "sessions": sessions.stats(),
     }
 
 
+@router.get("/admin/http")
+async def admin_http(http_pool: HttpPool | None = Depends(get_http_pool)):
+    """공유 HTTP 커넥션 풀 현황 (활성/유휴 커넥션 수, 사용률) 반환"""
+    if http_pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **http_pool.stats()}
+
+
+@router.get("/admin/admission")
+async def admin_admission(
+    admission: AdmissionController = Depends(get_admission_controller),
+):
+    """Admission control 현황 (in-flight, 대기열 깊이, 거부 수) 반환"""
+    return admission.stats()
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health():
     return HealthResponse(status="ok")
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache
+
+from app.api.models import ChatMessage, ChatResponse
+from app.config import get_settings
+
+CacheKey = tuple[str, str | None, str, str, int, str, str]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """대소문자, 공백, 끝 문장부호 차이를 제거한 질문 문자열을 반환한다."""
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text.rstrip("?!.。？！ ")
+
+
+def hash_history(chat_history: Sequence[ChatMessage] | None) -> str:
+    """chat_history의 해시. 히스토리가 없으면 빈 문자열."""
+    if not chat_history:
+        return ""
+    payload = json.dumps(
+        [[m.role, m.content] for m in chat_history], ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_cache_key(
+    blog_id: str,
+    language: str | None,
+    question: str,
+    chat_history: Sequence[ChatMessage] | None,
+    index_version: int,
+    mode: str = "",
+    filters: str = "",
+) -> CacheKey:
+    return (
+        blog_id, language, normalize_question(question), hash_history(chat_history), index_version, mode,
+        filters,
+    )
+
+
+class ResponseCache:
+    """정확히 같은 질문에 대한 LRU + TTL 응답 캐시.
+
+    키에 인덱스 버전이 포함되므로 재인덱싱으로 버전이 올라가면 이전 항목은 더 이상
+    조회되지 않고 LRU/TTL로 자연스럽게 제거된다.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[CacheKey, tuple[float, ChatResponse]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: CacheKey) -> ChatResponse | None:
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, response = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: CacheKey, response: ChatResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    settings = get_settings()
+    return ResponseCache(
+        max_entries=settings.response_cache_max_entries,
+        ttl_seconds=settings.response_cache_ttl_seconds,
+    )
@@ -0,0 +1,140 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from app.api.models import ChatResponse
+from app.config import get_settings
+
+BucketKey = tuple[str, str | None]
+
+
+@dataclass
+class _Entry:
+    question: str
+    response: ChatResponse
+    created_at: float
+
+
+class _Bucket:
+    """(blog_id, language) 단위 캐시 버킷. 정규화된 임베딩 행렬을 함께 유지한다."""
+
+    def __init__(self):
+        self.entries: OrderedDict[str, _Entry] = OrderedDict()
+        self.embeddings: dict[str, np.ndarray] = {}
+        self._matrix: np.ndarray | None = None
+        self._keys: list[str] = []
+
+    def matrix(self) -> tuple[list[str], np.ndarray]:
+        if self._matrix is None:
+            self._keys = list(self.entries)
+            self._matrix = np.stack([self.embeddings[k] for k in self._keys])
+        return self._keys, self._matrix
+
+    def put(self, key: str, entry: _Entry, embedding: np.ndarray) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        self.embeddings[key] = embedding
+        self._matrix = None
+
+    def remove(self, key: str) -> None:
+        self.entries.pop(key, None)
+        self.embeddings.pop(key, None)
+        self._matrix = None
+
+
+class SemanticCache:
+    """질문 임베딩 유사도 기반 답변 캐시.
+
+    같은 blog_id/language에서 이전에 답변한 질문과 코사인 유사도가 threshold 이상이면
+    저장된 응답을 재사용한다. 버킷별 최대 항목 수를 넘으면 LRU로, ttl_seconds가 지나면
+    만료로 제거한다. 이벤트 루프 안에서만 사용하므로 별도 락을 두지 않는다.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 500, ttl_seconds: int = 3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._buckets: dict[BucketKey, _Bucket] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding: list[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def _expire(self, bucket: _Bucket) -> None:
+        deadline = time.monotonic() - self.ttl_seconds
+        expired = [k for k, e in bucket.entries.items() if e.created_at < deadline]
+        for key in expired:
+            bucket.remove(key)
+
+    def lookup(
+        self, blog_id: str, language: str | None, embedding: list[float]
+    ) -> ChatResponse | None:
+        """유사한 질문의 캐싱된 응답을 반환한다. 없으면 None."""
+        bucket = self._buckets.get((blog_id, language))
+        if bucket is not None:
+            self._expire(bucket)
+        if bucket is None or not bucket.entries:
+            self.misses += 1
+            return None
+
+        keys, matrix = bucket.matrix()
+        scores = matrix @ self._normalize(embedding)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        key = keys[best]
+        bucket.entries.move_to_end(key)
+        self.hits += 1
+        return bucket.entries[key].response
+
+    def store(
+        self,
+        blog_id: str,
+        language: str | None,
+        question: str,
+        embedding: list[float],
+        response: ChatResponse,
+    ) -> None:
+        """답변을 캐시에 저장한다. 버킷이 가득 차면 가장 오래 사용되지 않은 항목을 제거한다."""
+        bucket = self._buckets.setdefault((blog_id, language), _Bucket())
+        entry = _Entry(question=question, response=response, created_at=time.monotonic())
+        bucket.put(question, entry, self._normalize(embedding))
+        while len(bucket.entries) > self.max_entries:
+            oldest = next(iter(bucket.entries))
+            bucket.remove(oldest)
+
+    def clear(self, blog_id: str | None = None) -> None:
+        """blog_id의 모든 버킷을 비운다. blog_id가 None이면 전체를 비운다."""
+        if blog_id is None:
+            self._buckets.clear()
+            return
+        for key in [k for k in self._buckets if k[0] == blog_id]:
+            del self._buckets[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": sum(len(b.entries) for b in self._buckets.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+@lru_cache
+def get_semantic_cache() -> SemanticCache:
+    settings = get_settings()
+    return SemanticCache(
+        threshold=settings.semantic_cache_threshold,
+        max_entries=settings.semantic_cache_max_entries,
+        ttl_seconds=settings.semantic_cache_ttl_seconds,
+    )
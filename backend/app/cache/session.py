@@ -0,0 +1,149 @@
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+
+import app.db.connection as db_conn
+from app.api.models import ChatMessage
+from app.config import get_settings
+from app.db.repository import ChatSessionRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChatSession:
+    """서버에 저장되는 대화 세션.
+
+    Attributes:
+        turns: 대화 메시지 (role, content). 최대 max_turns턴까지만 유지한다
+        last_query: 직전 턴에서 검색에 사용한 독립 질문 (재작성 결과 또는 원래 질문)
+        last_chunk_ids: 직전 턴에서 검색된 청크 ID 목록
+    """
+
+    session_id: str
+    blog_id: str
+    turns: list[dict] = field(default_factory=list)
+    last_query: str | None = None
+    last_chunk_ids: list[str] = field(default_factory=list)
+
+    def history(self) -> list[ChatMessage]:
+        return [ChatMessage(**turn) for turn in self.turns]
+
+    def append_turn(self, question: str, answer: str, max_turns: int) -> None:
+        self.turns.append({"role": "human", "content": question})
+        self.turns.append({"role": "ai", "content": answer})
+        if len(self.turns) > max_turns * 2:
+            self.turns = self.turns[-max_turns * 2:]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class SessionStore:
+    """LRU + TTL 메모리 세션 저장소. persistent=True이면 DB(chat_sessions)에도 write-through한다.
+
+    메모리에서 만료/축출된 세션은 DB에 남아 있으면 다시 로드된다 (TTL은 DB 기준으로도 적용).
+    DB 오류는 로그만 남기고 메모리 저장소만으로 계속 동작한다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: int = 1800,
+        max_turns: int = 20,
+        persistent: bool = False,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self.persistent = persistent
+        self._entries: OrderedDict[str, tuple[float, ChatSession]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+
+    def create(self, blog_id: str) -> ChatSession:
+        self.created += 1
+        return ChatSession(session_id=str(uuid.uuid4()), blog_id=blog_id)
+
+    async def get(self, session_id: str, blog_id: str) -> ChatSession | None:
+        """세션을 조회한다. 없거나 만료되었거나 다른 blog_id의 세션이면 None."""
+        session = self._get_memory(session_id)
+        if session is None and self.persistent:
+            session = await self._load(session_id)
+            if session is not None:
+                self._put_memory(session)
+        if session is None or session.blog_id != blog_id:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return session
+
+    async def save(self, session: ChatSession) -> None:
+        self._put_memory(session)
+        if self.persistent:
+            await self._store(session)
+
+    def _get_memory(self, session_id: str) -> ChatSession | None:
+        item = self._entries.get(session_id)
+        if item is None:
+            return None
+        expires_at, session = item
+        if expires_at < time.monotonic():
+            del self._entries[session_id]
+            return None
+        self._entries.move_to_end(session_id)
+        return session
+
+    def _put_memory(self, session: ChatSession) -> None:
+        self._entries[session.session_id] = (time.monotonic() + self.ttl_seconds, session)
+        self._entries.move_to_end(session.session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(self, session_id: str) -> ChatSession | None:
+        if not db_conn.async_session_factory:
+            return None
+        try:
+            async with db_conn.async_session_factory() as db:
+                data = await ChatSessionRepository(db).get(session_id, self.ttl_seconds)
+        except Exception:
+            logger.exception("세션 로드 실패", extra={"session_id": session_id})
+            return None
+        return ChatSession(**data) if data else None
+
+    async def _store(self, session: ChatSession) -> None:
+        if not db_conn.async_session_factory:
+            return
+        try:
+            async with db_conn.async_session_factory() as db:
+                await ChatSessionRepository(db).save(
+                    session.session_id, session.blog_id, session.to_dict()
+                )
+        except Exception:
+            logger.exception("세션 저장 실패", extra={"session_id": session.session_id})
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "created": self.created,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "persistent": self.persistent,
+        }
+
+
+@lru_cache
+def get_session_store() -> SessionStore:
+    settings = get_settings()
+    return SessionStore(
+        max_entries=settings.session_max_entries,
+        ttl_seconds=settings.session_ttl_seconds,
+        max_turns=settings.session_max_turns,
+        persistent=settings.session_persistent,
+    )
@@ -9,16 +9,105 @@ class Settings(BaseSettings):
     openai_api_key: str = ""
     openai_model: str = "gpt-4.1-nano"
     embedding_model: str = "text-embedding-3-small"
+    # 쿼리 임베딩 LRU 캐시 크기 (embed_documents 캐싱은 선택)
+    embedding_cache_size: int = 2048
+    embedding_cache_documents: bool = False
 
     # ChromaDB
     chroma_host: str = "localhost"
     chroma_port: int = 8000
 
+    # 공유 HTTP 커넥션 풀 (OpenAI 클라이언트 공유, Chroma 클라이언트는 같은 한도 적용)
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_http2: bool = True
+    http_timeout_seconds: float = 60.0
+
     # RAG
     chunk_size: int = 1000
     chunk_overlap: int = 200
     top_k: int = 5
+    # Hybrid Search: 시맨틱 검색 + 인덱싱 시 저장된 BM25 인덱스를 RRF(Σ weight / (k + rank))로 융합
     use_hybrid_search: bool = False
+    keyword_index_dir: str = "data/bm25"
+    hybrid_keyword_k: int = 20
+    hybrid_rrf_k: int = 60
+    hybrid_semantic_weight: float = 1.0
+    hybrid_keyword_weight: float = 1.0
+    # 시맨틱 검색 백엔드: "chroma" | "local" (재인덱싱 시 Chroma 임베딩을 내보낸 메모리 맵 인덱스, 없으면 chroma)
+    vector_backend: str = "chroma"
+    local_vector_dir: str = "data/vectors"
+    # 로컬 인덱스 후보 검색 행렬: "none"(float32) | "int8"(1/4 크기, 상위 rescore_k개 후보는 float32로 재계산)
+    local_vector_quantization: str = "none"
+    local_vector_rescore_k: int = 100
+    # MMR: fetch_k개 후보를 가져와 관련도와 다양성을 고려해 top_k개 선택 (1=관련도만)
+    mmr_enabled: bool = True
+    mmr_fetch_k: int = 20
+    mmr_lambda: float = 0.5
+    # 질문 재작성 정책: "auto"(자체 완결적 질문은 재작성 생략) | "always"
+    question_rewrite_policy: str = "auto"
+    # 질문 재작성 전용 모델 (빈 값이면 openai_model)
+    rewrite_model: str = ""
+    # 답변 모델 티어 (저렴한 모델부터, 빈 목록이면 openai_model 하나로 답변).
+    # 질문 토큰 수, 패킹된 컨텍스트 토큰 수, 히스토리 메시지 수 중 임계값을 넘은 신호 수만큼 상위 티어 사용
+    model_routing_tiers: list[str] = []
+    routing_question_tokens: int = 40
+    routing_context_tokens: int = 2500
+    routing_history_messages: int = 4
+    # QA 프롬프트에 넣을 컨텍스트 토큰 예산 (0이면 검색 결과를 그대로 사용)
+    context_token_budget: int = 3000
+    # 질문 기반 추출형 압축 (LLM 미사용, 문장/코드 블록 단위로 관련 span만 남김)
+    context_compression_enabled: bool = False
+    # 요청 마감 시간(초, 0이면 비활성화)과 단계별 최대 비율. 생성 단계는 남은 시간 전부를 사용한다.
+    chat_deadline_seconds: float = 20.0
+    deadline_share_history: float = 0.1
+    deadline_share_rewrite: float = 0.2
+    deadline_share_retrieval: float = 0.3
+    # inspireme 명언 추천 요청을 의도 분류기로 감지해 LLM 없이 템플릿 답변 (요청의 mode가 우선)
+    inspireme_fast_path_enabled: bool = True
+    # 대화 히스토리: 최근 N턴은 원문(토큰 예산 내), 이전 턴은 요약 하나로 압축
+    history_max_turns: int = 3
+    history_token_budget: int = 1500
+    history_summary_cache_size: int = 1000
+
+    # 시맨틱 답변 캐시 (chat_history가 없는 질문에만 적용)
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_max_entries: int = 500
+    semantic_cache_ttl_seconds: int = 3600
+
+    # 서버 대화 세션 (LRU + TTL 메모리 저장소, session_persistent=true이면 MySQL에도 저장)
+    session_max_entries: int = 10000
+    session_ttl_seconds: int = 1800
+    session_max_turns: int = 20
+    session_persistent: bool = False
+
+    # 정확 일치 응답 캐시 (정규화된 질문 + 히스토리 해시 + 인덱스 버전)
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 1000
+    response_cache_ttl_seconds: int = 600
+
+    # /search (LLM 없이 검색기만 실행, search_fetch_k개 청크를 게시글 단위로 묶음)
+    search_fetch_k: int = 20
+    search_max_results: int = 20
+
+    # /chat/batch
+    batch_max_items: int = 200
+    batch_max_concurrency: int = 8
+
+    # Admission control (/chat, /chat/stream, /chat/batch)
+    admission_max_in_flight: int = 64
+    admission_max_in_flight_per_blog: int = 32
+    admission_max_queue: int = 128
+    admission_queue_timeout_seconds: float = 5.0
+    # 클라이언트 IP별 토큰 버킷 (초당 충전량, 최대 버스트). 충전량 0 이하이면 비활성화 (기본값)
+    # 인그레스 뒤에서는 모든 요청의 접속 IP가 인그레스 IP이므로, 켤 때는 반드시
+    # rate_limit_trust_forwarded_for도 함께 켜야 클라이언트별로 버킷이 나뉜다
+    rate_limit_per_client: float = 0.0
+    rate_limit_burst: int = 10
+    # 게이트웨이 뒤에서 X-Forwarded-For 첫 번째 값을 클라이언트 IP로 사용
+    rate_limit_trust_forwarded_for: bool = False
 
     # 멀티 블로그 Collection 설정
     blog_collections: dict[str, str] = {
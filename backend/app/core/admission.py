@@ -0,0 +1,179 @@
+import asyncio
+import math
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from app.config import get_settings
+
+# 이 시간 이상 사용되지 않은 클라이언트 버킷은 정리한다
+_BUCKET_IDLE_SECONDS = 600
+
+
+class AdmissionRejected(Exception):
+    """요청이 admission control 또는 rate limit에 의해 거부됨 (HTTP 429로 변환된다)."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """토큰 하나를 소비한다. 성공하면 0, 실패하면 다음 토큰까지 남은 초를 반환한다."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """/chat 계열 요청의 동시 실행 수를 제한한다.
+
+    - 전체 / blog_id별 in-flight 상한을 넘으면 최대 max_queue개까지 대기열에서 기다린다.
+    - 대기열이 가득 차거나 queue_timeout 안에 슬롯을 얻지 못하면 거부한다.
+    - 클라이언트 IP별 토큰 버킷으로 요청 빈도를 제한한다 (rate_per_client <= 0이면 비활성화).
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 64,
+        max_in_flight_per_blog: int = 32,
+        max_queue: int = 128,
+        queue_timeout: float = 5.0,
+        rate_per_client: float = 0.0,
+        burst_per_client: int = 10,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_blog = max_in_flight_per_blog
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate_per_client = rate_per_client
+        self.burst_per_client = burst_per_client
+
+        self._condition = asyncio.Condition()
+        self._in_flight = 0
+        self._in_flight_by_blog: dict[str, int] = defaultdict(int)
+        self._waiting = 0
+        self._buckets: dict[str, TokenBucket] = {}
+        self._last_prune = time.monotonic()
+
+        self.admitted = 0
+        self.rejected = {"rate_limited": 0, "queue_full": 0, "timeout": 0}
+        self.max_queue_depth = 0
+
+    def check_rate(self, client_ip: str) -> None:
+        """클라이언트의 토큰 버킷에서 토큰 하나를 소비한다. 부족하면 AdmissionRejected."""
+        if self.rate_per_client <= 0:
+            return
+        self._prune_buckets()
+        bucket = self._buckets.get(client_ip)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_client, self.burst_per_client)
+            self._buckets[client_ip] = bucket
+        wait = bucket.try_acquire()
+        if wait > 0:
+            self.rejected["rate_limited"] += 1
+            raise AdmissionRejected("Too many requests from client", wait)
+
+    def _prune_buckets(self) -> None:
+        now = time.monotonic()
+        if now - self._last_prune < _BUCKET_IDLE_SECONDS:
+            return
+        self._last_prune = now
+        idle = [ip for ip, b in self._buckets.items() if now - b.updated > _BUCKET_IDLE_SECONDS]
+        for ip in idle:
+            del self._buckets[ip]
+
+    def _has_capacity(self, blog_id: str) -> bool:
+        return (
+            self._in_flight < self.max_in_flight
+            and self._in_flight_by_blog[blog_id] < self.max_in_flight_per_blog
+        )
+
+    async def acquire(self, blog_id: str) -> None:
+        """실행 슬롯을 얻는다. 대기열 초과 또는 대기 시간 초과 시 AdmissionRejected."""
+        async with self._condition:
+            if not self._has_capacity(blog_id):
+                if self._waiting >= self.max_queue:
+                    self.rejected["queue_full"] += 1
+                    raise AdmissionRejected("Server is busy", self.queue_timeout)
+                self._waiting += 1
+                self.max_queue_depth = max(self.max_queue_depth, self._waiting)
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(lambda: self._has_capacity(blog_id)),
+                        timeout=self.queue_timeout,
+                    )
+                except TimeoutError:
+                    self.rejected["timeout"] += 1
+                    raise AdmissionRejected("Server is busy", self.queue_timeout) from None
+                finally:
+                    self._waiting -= 1
+            self._in_flight += 1
+            self._in_flight_by_blog[blog_id] += 1
+            self.admitted += 1
+
+    async def release(self, blog_id: str) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._in_flight_by_blog[blog_id] -= 1
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, blog_id: str):
+        """acquire/release를 감싸는 컨텍스트 매니저."""
+        await self.acquire(blog_id)
+        try:
+            yield
+        finally:
+            await self.release(blog_id)
+
+    @asynccontextmanager
+    async def admit(self, blog_id: str, client_ip: str):
+        """rate limit 확인 후 실행 슬롯을 얻는다."""
+        self.check_rate(client_ip)
+        async with self.slot(blog_id):
+            yield
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "in_flight_by_blog": {k: v for k, v in self._in_flight_by_blog.items() if v},
+            "queue_depth": self._waiting,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "tracked_clients": len(self._buckets),
+        }
+
+
+def retry_after_header(seconds: float) -> str:
+    """Retry-After 헤더 값 (정수 초, 최소 1)."""
+    return str(max(1, math.ceil(seconds)))
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    settings = get_settings()
+    return AdmissionController(
+        max_in_flight=settings.admission_max_in_flight,
+        max_in_flight_per_blog=settings.admission_max_in_flight_per_blog,
+        max_queue=settings.admission_max_queue,
+        queue_timeout=settings.admission_queue_timeout_seconds,
+        rate_per_client=settings.rate_limit_per_client,
+        burst_per_client=settings.rate_limit_burst,
+    )
@@ -0,0 +1,37 @@
+import time
+
+from langchain_core.documents import Document
+
+# 단계별 최대 예산 비율. 남은 시간이 더 적으면 남은 시간까지만 허용한다.
+DEFAULT_STAGE_SHARES = {"rewrite": 0.2, "retrieval": 0.3, "generation": 1.0}
+
+
+class DeadlineExceeded(Exception):
+    """RAG 체인 단계가 요청 마감 시간 안에 끝나지 않음.
+
+    Attributes:
+        stage: 시간 초과된 단계 ("retrieval" | "generation")
+        context: 시간 초과 전까지 검색된 문서 (degraded 응답의 출처로 사용)
+    """
+
+    def __init__(self, stage: str, context: list[Document] | None = None):
+        super().__init__(f"{stage} deadline exceeded")
+        self.stage = stage
+        self.context = context or []
+
+
+class Deadline:
+    """요청 단위 마감 시간. 체인 입력의 "deadline" 키로 각 단계에 전달된다."""
+
+    def __init__(self, seconds: float, stage_shares: dict[str, float] | None = None):
+        self.seconds = seconds
+        self.stage_shares = stage_shares or DEFAULT_STAGE_SHARES
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def stage_timeout(self, stage: str) -> float:
+        """stage에 허용되는 시간(초): min(전체 예산 × 단계 비율, 남은 시간)."""
+        share = self.stage_shares.get(stage, 1.0)
+        return min(self.seconds * share, self.remaining())
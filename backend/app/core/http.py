@@ -0,0 +1,103 @@
+"""애플리케이션 단위 공유 HTTP 커넥션 풀.
+
+OpenAI(채팅/임베딩) 클라이언트가 같은 httpx 클라이언트를 공유해 keep-alive 커넥션을 재사용한다.
+lifespan에서 init_http_pool()로 생성하고 종료 시 close_http_pool()로 닫는다.
+"""
+
+import importlib.util
+import logging
+
+import httpx
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+http_pool = None
+
+
+class HttpPool:
+    """동기/비동기 httpx 클라이언트 한 쌍. 같은 커넥션 한도와 keep-alive 설정을 사용한다.
+
+    Args:
+        max_connections: 클라이언트별 최대 커넥션 수
+        max_keepalive_connections: 유휴 상태로 유지할 최대 커넥션 수
+        keepalive_expiry: 유휴 커넥션 유지 시간(초)
+        http2: HTTP/2 사용 여부 (httpx[http2] 의존성의 h2 패키지가 없으면 HTTP/1.1로 동작)
+        timeout: 요청 타임아웃(초)
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+        timeout: float = 60.0,
+    ):
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("h2 패키지 미설치 - HTTP/1.1 커넥션 풀 사용")
+            http2 = False
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        timeout_config = httpx.Timeout(timeout, connect=5.0)
+        self.client = httpx.Client(limits=self.limits, http2=http2, timeout=timeout_config)
+        self.async_client = httpx.AsyncClient(
+            limits=self.limits, http2=http2, timeout=timeout_config
+        )
+
+    async def aclose(self) -> None:
+        await self.async_client.aclose()
+        self.client.close()
+
+    def stats(self) -> dict:
+        """커넥션 풀 사용 현황 (활성/유휴 커넥션 수, 한도 대비 사용률)."""
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "sync": _pool_stats(self.client, self.limits),
+            "async": _pool_stats(self.async_client, self.limits),
+        }
+
+
+def _pool_stats(client: httpx.Client | httpx.AsyncClient, limits: httpx.Limits) -> dict:
+    # httpx는 풀 상태를 공개 API로 노출하지 않으므로 transport의 httpcore 풀을 조회한다
+    pool = getattr(client._transport, "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    active = sum(1 for conn in connections if not conn.is_idle())
+    http2 = sum(1 for conn in connections if "HTTP/2" in conn.info())
+    return {
+        "connections": len(connections),
+        "active": active,
+        "idle": len(connections) - active,
+        "http2_connections": http2,
+        "utilization": round(active / limits.max_connections, 4) if limits.max_connections else 0.0,
+    }
+
+
+def init_http_pool(settings: Settings) -> HttpPool:
+    global http_pool
+    http_pool = HttpPool(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        http2=settings.http_http2,
+        timeout=settings.http_timeout_seconds,
+    )
+    return http_pool
+
+
+def get_http_pool() -> HttpPool | None:
+    return http_pool
+
+
+async def close_http_pool() -> None:
+    global http_pool
+    if http_pool:
+        await http_pool.aclose()
+        http_pool = None
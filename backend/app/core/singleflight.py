@@ -0,0 +1,54 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from functools import lru_cache
+from typing import Any
+
+
+class SingleFlight:
+    """동일 키의 동시 실행을 하나로 합친다 (Go singleflight와 같은 방식).
+
+    첫 호출자가 작업을 Task로 시작하고, 완료 전까지 같은 키로 들어온 호출자는
+    그 Task의 결과(또는 예외)를 공유한다. Task는 shield로 감싸므로 어느 호출자가
+    취소되어도 나머지 호출자의 작업은 계속 진행된다.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """fn을 실행하거나 진행 중인 실행에 합류한다.
+
+        Returns:
+            (결과, 다른 호출자의 실행을 공유했는지 여부)
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.executed += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 호출자가 취소된 경우에도 예외가 "never retrieved"로 남지 않도록 소비
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "shared": self.shared,
+        }
+
+
+@lru_cache
+def get_chat_singleflight() -> SingleFlight:
+    return SingleFlight()
@@ -19,9 +19,22 @@ class QueryLog(Base):
     sources: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     response_time_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
     has_results: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    rewrite_path: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    outcome: Mapped[str | None] = mapped_column(String(30), nullable=True)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now(), index=True)
 
 
+class ChatSessionRecord(Base):
+    __tablename__ = "chat_sessions"
+
+    session_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    blog_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now(), index=True
+    )
+
+
 class Feedback(Base):
     __tablename__ = "feedbacks"
 
@@ -3,7 +3,7 @@ import logging
 from sqlalchemy import case, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Feedback, QueryLog
+from app.db.models import ChatSessionRecord, Feedback, QueryLog
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +21,8 @@ class QueryLogRepository:
         sources: list[dict] | None = None,
         response_time_ms: int | None = None,
         has_results: bool | None = None,
+        rewrite_path: str | None = None,
+        outcome: str | None = None,
     ) -> None:
         log = QueryLog(
             message_id=message_id,
@@ -30,6 +32,8 @@ class QueryLogRepository:
             sources=sources,
             response_time_ms=response_time_ms,
             has_results=has_results,
+            rewrite_path=rewrite_path,
+            outcome=outcome,
         )
         self.session.add(log)
         await self.session.commit()
@@ -103,6 +107,37 @@ class QueryLogRepository:
         avg = result.scalar()
         return round(float(avg), 1) if avg else 0.0
 
+    async def get_response_time_by_rewrite_path(self) -> list[dict]:
+        """질문 재작성 경로별 평균 응답 시간 (ms)"""
+        stmt = (
+            select(
+                QueryLog.rewrite_path,
+                func.count().label("count"),
+                func.avg(QueryLog.response_time_ms).label("avg_ms"),
+            )
+            .where(QueryLog.rewrite_path.is_not(None))
+            .group_by(QueryLog.rewrite_path)
+        )
+        result = await self.session.execute(stmt)
+        return [
+            {
+                "rewrite_path": row.rewrite_path,
+                "count": row.count,
+                "avg_response_time": round(float(row.avg_ms), 1) if row.avg_ms else 0.0,
+            }
+            for row in result
+        ]
+
+    async def get_outcome_counts(self) -> list[dict]:
+        """처리 결과(ok, timeout_retrieval, timeout_generation)별 요청 수"""
+        stmt = (
+            select(QueryLog.outcome, func.count().label("count"))
+            .where(QueryLog.outcome.is_not(None))
+            .group_by(QueryLog.outcome)
+        )
+        result = await self.session.execute(stmt)
+        return [{"outcome": row.outcome, "count": row.count} for row in result]
+
     async def get_search_failure_rate(self) -> float:
         """검색 실패율 (has_results=false 비율)"""
         stmt = select(
@@ -114,3 +149,24 @@ class QueryLogRepository:
         total = row.total or 0
         failed = int(row.failed or 0)
         return round(failed / total, 2) if total > 0 else 0.0
+
+
+class ChatSessionRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, session_id: str, ttl_seconds: int) -> dict | None:
+        """ttl_seconds 이내에 갱신된 세션 데이터를 반환한다."""
+        stmt = select(ChatSessionRecord.data).where(
+            ChatSessionRecord.session_id == session_id,
+            ChatSessionRecord.updated_at
+            >= func.date_sub(func.now(), text(f"INTERVAL {int(ttl_seconds)} SECOND")),
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def save(self, session_id: str, blog_id: str, data: dict) -> None:
+        await self.session.merge(
+            ChatSessionRecord(session_id=session_id, blog_id=blog_id, data=data)
+        )
+        await self.session.commit()
@@ -1,14 +1,18 @@
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.routes import router
 from app.config import get_settings
+from app.core.admission import AdmissionRejected, retry_after_header
+from app.core.http import close_http_pool, init_http_pool
 from app.core.logging import init_logger
 from app.db.connection import close_db, init_db
 from app.middleware.request_logging import RequestLoggingMiddleware
+from app.rag.registry import get_rag_registry
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +22,11 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     init_logger(settings.log_level)
     logger.info("Application starting")
+    init_http_pool(settings)
+    if settings.use_hybrid_search:
+        get_rag_registry().load_keyword_indexes()
+    if settings.vector_backend == "local":
+        get_rag_registry().load_vector_indexes()
 
     if settings.mysql_password:
         await init_db(settings.database_url)
@@ -26,6 +35,7 @@ async def lifespan(app: FastAPI):
         logger.warning("MYSQL_PASSWORD 미설정 - DB 기능 비활성화")
     yield
     await close_db()
+    await close_http_pool()
 
 
 app = FastAPI(
@@ -44,4 +54,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.reason},
+        headers={"Retry-After": retry_after_header(exc.retry_after)},
+    )
+
+
 app.include_router(router)
@@ -0,0 +1,35 @@
+"""키워드 검색/컨텍스트 압축용 어휘 분석기.
+
+한국어는 조사가 붙어 어절 단위로는 매칭이 잘 되지 않으므로("goroutine이란", "컨테이너와")
+한글 연속 구간을 음절 bigram으로 나누고, 영문/숫자는 단어 단위로 자른다.
+"goroutine이란" → ["goroutine", "이란"], "컨테이너와" → ["컨테", "테이", "이너", "너와"]
+"""
+
+import re
+from collections.abc import Callable
+
+_LATIN_WORD = re.compile(r"[a-z0-9_]+")
+_HANGUL_RUN = re.compile(r"[가-힣]+")
+_WHITESPACE_TOKEN = re.compile(r"\S+")
+
+Analyzer = Callable[[str], list[str]]
+
+
+def analyze(text: str) -> list[str]:
+    """영문/숫자 단어 + 한글 음절 bigram (한 글자 한글은 그대로). 중복을 유지한다."""
+    lowered = text.lower()
+    tokens = _LATIN_WORD.findall(lowered)
+    for run in _HANGUL_RUN.findall(lowered):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def whitespace(text: str) -> list[str]:
+    """공백 기준 토큰화 (BM25Retriever 기본 동작과 같음, 비교용)."""
+    return _WHITESPACE_TOKEN.findall(text.lower())
+
+
+ANALYZERS: dict[str, Analyzer] = {"ngram": analyze, "whitespace": whitespace}
@@ -0,0 +1,210 @@
+"""blog_id별 BM25 키워드 인덱스.
+
+인덱싱 시점에 청크를 분석기(app.rag.analyzer)로 토큰화해 term × 문서 BM25 가중치 행렬을
+CSR(행 = term) 형태로 만들어 디스크에 저장하고, 서버는 시작 시 한 번 로드해 재사용한다.
+질의 점수는 질의어 행들의 희소 합(= 질의 벡터와 행렬의 sparse dot product)이므로
+비용은 코퍼스 크기가 아니라 질의어 postings 길이에 비례한다.
+"""
+
+import io
+import json
+import logging
+import os
+import time
+import zipfile
+from collections import Counter
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.rag.analyzer import ANALYZERS
+from app.rag.filters import MetadataFilter, MetadataIndex
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+DEFAULT_ANALYZER = "ngram"
+
+
+class BM25Index:
+    """CSR 희소 행렬 기반 Okapi BM25 역색인.
+
+    Args:
+        documents: 인덱싱된 청크 (검색 결과로 그대로 반환된다)
+        vocabulary: term 목록 (행 순서)
+        indptr: term 행 i의 postings는 indices/weights[indptr[i]:indptr[i+1]]
+        indices: 문서 인덱스 (int32)
+        weights: 사전 계산된 BM25 term 가중치 idf × tf(k1+1) / (tf + k1(1 - b + b·len/avg)) (float32)
+        analyzer: 분석기 이름 (app.rag.analyzer.ANALYZERS 키)
+    """
+
+    def __init__(
+        self,
+        documents: list[Document],
+        vocabulary: list[str],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray,
+        analyzer: str = DEFAULT_ANALYZER,
+    ):
+        self.documents = documents
+        self.vocabulary = {term: row for row, term in enumerate(vocabulary)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.analyzer = analyzer
+        self._analyze = ANALYZERS[analyzer]
+        self.metadata_index = MetadataIndex.build(documents)
+
+    @classmethod
+    def build(
+        cls,
+        documents: Sequence[Document],
+        analyzer: str = DEFAULT_ANALYZER,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> "BM25Index":
+        analyze = ANALYZERS[analyzer]
+        vocabulary: dict[str, int] = {}
+        rows, cols, tfs, doc_lengths = [], [], [], []
+        for doc_index, doc in enumerate(documents):
+            tokens = analyze(doc.page_content)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                rows.append(vocabulary.setdefault(term, len(vocabulary)))
+                cols.append(doc_index)
+                tfs.append(tf)
+
+        rows_arr = np.asarray(rows, dtype=np.int64)
+        order = np.argsort(rows_arr, kind="stable")
+        rows_arr = rows_arr[order]
+        indices = np.asarray(cols, dtype=np.int32)[order]
+        tf = np.asarray(tfs, dtype=np.float32)[order]
+
+        n_docs = len(documents)
+        lengths = np.asarray(doc_lengths, dtype=np.float32)
+        avg_length = float(lengths.mean()) if n_docs and lengths.sum() else 1.0
+        df = np.bincount(rows_arr, minlength=len(vocabulary)).astype(np.float32)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        norm = k1 * (1 - b + b * lengths[indices] / avg_length)
+        weights = (idf[rows_arr] * tf * (k1 + 1) / (tf + norm)).astype(np.float32)
+
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(df.astype(np.int64), out=indptr[1:])
+        return cls(list(documents), list(vocabulary), indptr, indices, weights, analyzer)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def nbytes(self) -> int:
+        """CSR 배열이 차지하는 메모리 (문서 본문/어휘 사전 제외)."""
+        return self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes
+
+    def search(
+        self, query: str, k: int, metadata_filter: MetadataFilter | None = None
+    ) -> list[tuple[Document, float]]:
+        """BM25 점수 상위 k개 (문서, 점수). 질의어가 하나도 없는 문서는 제외한다.
+
+        metadata_filter가 있으면 필터에 맞는 문서의 postings만 합산한다.
+        """
+        rows = [self.vocabulary[t] for t in set(self._analyze(query)) if t in self.vocabulary]
+        if not rows or k <= 0:
+            return []
+        slices = [slice(self.indptr[r], self.indptr[r + 1]) for r in rows]
+        doc_ids = np.concatenate([self.indices[s] for s in slices])
+        weights = np.concatenate([self.weights[s] for s in slices])
+        if metadata_filter:
+            allowed = np.isin(doc_ids, self.metadata_index.rows(metadata_filter))
+            doc_ids, weights = doc_ids[allowed], weights[allowed]
+            if not len(doc_ids):
+                return []
+
+        # 질의어가 등장한 문서만 모아 합산하므로 전체 문서 수만큼의 점수 배열을 만들지 않는다
+        candidates, inverse = np.unique(doc_ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.documents[candidates[i]], float(scores[i])) for i in top]
+
+    def save(self, path: Path) -> None:
+        """임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 인덱스를 본다."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        documents = json.dumps(
+            [{"id": d.id, "page_content": d.page_content, "metadata": d.metadata} for d in self.documents],
+            ensure_ascii=False,
+        )
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            version=np.int64(FORMAT_VERSION),
+            analyzer=np.str_(self.analyzer),
+            vocabulary=np.array(list(self.vocabulary), dtype=np.str_),
+            indptr=self.indptr,
+            indices=self.indices,
+            weights=self.weights,
+            documents=np.str_(documents),
+        )
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FORMAT_VERSION:
+                raise ValueError(f"지원하지 않는 BM25 인덱스 버전: {int(data['version'])}")
+            documents = [Document(**doc) for doc in json.loads(str(data["documents"]))]
+            return cls(
+                documents,
+                data["vocabulary"].tolist(),
+                data["indptr"],
+                data["indices"],
+                data["weights"],
+                str(data["analyzer"]),
+            )
+
+
+def index_path(index_dir: str, blog_id: str) -> Path:
+    return Path(index_dir) / f"{blog_id}.bm25.npz"
+
+
+def build_keyword_index(
+    index_dir: str,
+    blog_id: str,
+    documents: Sequence[Document],
+    analyzer: str = DEFAULT_ANALYZER,
+) -> BM25Index:
+    """청크로 BM25 인덱스를 만들어 저장한다 (재인덱싱 시 Chroma 인덱싱과 같은 청크 사용)."""
+    start = time.perf_counter()
+    index = BM25Index.build(documents, analyzer)
+    index.save(index_path(index_dir, blog_id))
+    logger.info("BM25 인덱스 저장", extra={
+        "blog_id": blog_id, "documents": len(index), "terms": len(index.vocabulary),
+        "analyzer": analyzer, "build_ms": int((time.perf_counter() - start) * 1000),
+    })
+    return index
+
+
+def remove_keyword_index(index_dir: str, blog_id: str) -> None:
+    """저장된 BM25 인덱스를 삭제한다. 이후 load_keyword_index()는 None을 반환한다 (시맨틱 검색만 사용)."""
+    path = index_path(index_dir, blog_id)
+    path.unlink(missing_ok=True)
+    logger.info("BM25 인덱스 삭제", extra={"blog_id": blog_id, "path": str(path)})
+
+
+def load_keyword_index(index_dir: str, blog_id: str) -> BM25Index | None:
+    """저장된 BM25 인덱스를 로드한다. 없거나 손상되었으면 None (시맨틱 검색만 사용)."""
+    path = index_path(index_dir, blog_id)
+    if not path.exists():
+        return None
+    try:
+        return BM25Index.load(path)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        logger.exception("BM25 인덱스 로드 실패", extra={"blog_id": blog_id, "path": str(path)})
+        return None
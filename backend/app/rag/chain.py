@@ -1,33 +1,170 @@
-from langchain_classic.chains import create_history_aware_retriever, create_retrieval_chain
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Iterator
+from operator import itemgetter
+
 from langchain_classic.chains.combine_documents import create_stuff_documents_chain
 from langchain_chroma import Chroma
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.retrievers import RetrieverLike
+from langchain_core.runnables import (
+    Runnable,
+    RunnableBranch,
+    RunnableConfig,
+    RunnableGenerator,
+    RunnableLambda,
+    RunnablePassthrough,
+)
 from langchain_openai import ChatOpenAI
 
+from app.core.deadline import DeadlineExceeded
 from app.prompts.templates import INSPIREME_SYSTEM_PROMPT, INSPIREME_SYSTEM_PROMPT_EN, SYSTEM_PROMPT
+from app.rag.context import TokenCounter, create_context_packer, get_token_counter
+from app.rag.quotes import RECOMMEND, format_recommendations
+from app.rag.retriever import retriever_kwargs
+from app.rag.rewrite import REWRITTEN, decide_rewrite
+from app.rag.router import ModelRouter
+
+
+logger = logging.getLogger(__name__)
+
+
+def _with_deadline(runnable: Runnable, stage: str, fallback: Runnable | None = None) -> Runnable:
+    """chain_input["deadline"]이 있으면 stage 예산 안에서 runnable을 실행한다.
+
+    시간 초과 시 fallback이 있으면 그 결과를 사용하고, 없으면 DeadlineExceeded를 던진다.
+    """
+
+    def run(chain_input: dict, config: RunnableConfig):
+        return runnable.invoke(chain_input, config)
+
+    async def arun(chain_input: dict, config: RunnableConfig):
+        deadline = chain_input.get("deadline")
+        if deadline is None:
+            return await runnable.ainvoke(chain_input, config)
+        try:
+            return await asyncio.wait_for(
+                runnable.ainvoke(chain_input, config), deadline.stage_timeout(stage)
+            )
+        except TimeoutError:
+            if fallback is None:
+                raise DeadlineExceeded(stage, chain_input.get("context")) from None
+            logger.warning("단계 시간 초과 - fallback 사용", extra={"stage": stage})
+            return await fallback.ainvoke(chain_input, config)
+
+    return RunnableLambda(run, afunc=arun, name=f"{stage}_with_deadline")
+
+
+def _merge_input(chunks) -> dict:
+    merged: dict = {}
+    for chunk in chunks:
+        merged = {**merged, **chunk}
+    return merged
+
+
+def _stream_with_deadline(runnable: Runnable, stage: str) -> Runnable:
+    """_with_deadline의 스트리밍 버전. 토큰 스트리밍을 유지하면서 청크 사이마다 남은 예산을 확인한다."""
+
+    def transform(inputs: Iterator[dict], config: RunnableConfig) -> Iterator:
+        yield from runnable.stream(_merge_input(inputs), config)
+
+    async def atransform(inputs: AsyncIterator[dict], config: RunnableConfig) -> AsyncIterator:
+        chain_input = _merge_input([chunk async for chunk in inputs])
+        deadline = chain_input.get("deadline")
+        if deadline is None:
+            async for chunk in runnable.astream(chain_input, config):
+                yield chunk
+            return
+
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + deadline.stage_timeout(stage)
+        iterator = aiter(runnable.astream(chain_input, config))
+        while True:
+            try:
+                chunk = await asyncio.wait_for(anext(iterator), max(0.0, expires_at - loop.time()))
+            except StopAsyncIteration:
+                return
+            except TimeoutError:
+                raise DeadlineExceeded(stage, chain_input.get("context")) from None
+            yield chunk
+
+    return RunnableGenerator(transform, atransform, name=f"{stage}_with_deadline")
+
+
+def _retrieve(retriever: RetrieverLike) -> Runnable:
+    """chain_input["query"]로 검색한다. chain_input["metadata_filter"]가 있으면 사전 필터로 넘긴다."""
+
+    def run(chain_input: dict, config: RunnableConfig):
+        kwargs = retriever_kwargs(chain_input.get("metadata_filter"))
+        return retriever.invoke(chain_input["query"], config, **kwargs)
+
+    async def arun(chain_input: dict, config: RunnableConfig):
+        kwargs = retriever_kwargs(chain_input.get("metadata_filter"))
+        return await retriever.ainvoke(chain_input["query"], config, **kwargs)
+
+    return RunnableLambda(run, afunc=arun, name="retrieve")
+
+
+def _rewrite_history(chain_input: dict) -> list[BaseMessage]:
+    """재작성 프롬프트에 넣을 히스토리.
+
+    세션에 직전 턴의 독립 질문(previous_query)이 있으면 그것과 마지막 턴만 넣는다.
+    직전 질문이 이미 이전 맥락을 풀어 쓴 결과이므로 전체 히스토리를 다시 읽을 필요가 없다.
+    """
+    chat_history = chain_input.get("chat_history") or []
+    previous_query = chain_input.get("previous_query")
+    if not previous_query:
+        return chat_history
+    return [SystemMessage(content=f"직전 검색 질문: {previous_query}"), *chat_history[-2:]]
+
+
+def _needs_rewrite(chain_input: dict) -> bool:
+    """재작성 경로 여부. 호출자가 rewrite_path를 넘기지 않으면 기본 정책으로 판단한다."""
+    path = chain_input.get("rewrite_path") or decide_rewrite(
+        chain_input["input"], chain_input.get("chat_history")
+    )
+    return path == REWRITTEN
 
 
 def create_rag_chain(
-    vector_store: Chroma,
+    vector_store: Chroma | None,
     model: str,
     top_k: int = 5,
     retriever: RetrieverLike | None = None,
     blog_id: str | None = None,
     language: str | None = None,
+    llm: BaseChatModel | None = None,
+    context_token_budget: int | None = None,
+    count_tokens: TokenCounter | None = None,
+    compress_context: bool = False,
+    rewrite_llm: BaseChatModel | None = None,
+    model_router: ModelRouter | None = None,
 ):
     """대화 히스토리를 지원하는 RAG 체인을 생성한다.
 
     Args:
-        vector_store: ChromaDB 벡터 저장소
+        vector_store: ChromaDB 벡터 저장소 (retriever를 지정하면 None 가능)
         model: OpenAI 모델 이름
         top_k: 검색 결과 수
         retriever: 커스텀 검색기 (None이면 기본 시맨틱 검색 사용)
         language: 응답 언어 (None이면 한국어 기본)
+        llm: 재사용할 LLM 클라이언트 (None이면 model로 새로 생성)
+        context_token_budget: 컨텍스트 토큰 예산 (None 또는 0이면 검색 결과를 그대로 사용)
+        count_tokens: 토큰 카운터 (None이면 model에 맞는 tiktoken 인코딩 사용)
+        compress_context: 질문과 관련된 문장/코드 블록만 추출해 컨텍스트를 압축할지 여부
+        rewrite_llm: 질문 재작성에 사용할 LLM (None이면 llm 사용)
+        model_router: 답변 모델 티어 라우터 (None이면 llm 하나로 답변)
     """
-    llm = ChatOpenAI(model=model, temperature=0)
+    if llm is None:
+        llm = ChatOpenAI(model=model, temperature=0)
+    count_tokens = count_tokens or get_token_counter(model)
 
     if retriever is None:
+        if vector_store is None:
+            raise ValueError("vector_store 또는 retriever 중 하나는 필요합니다")
         retriever = vector_store.as_retriever(search_kwargs={"k": top_k})
 
     # 대화 히스토리를 고려한 질문 재작성 체인
@@ -35,11 +172,22 @@ def create_rag_chain(
         ("system", "대화 히스토리와 최신 사용자 질문을 고려하여, "
          "대화 히스토리 없이도 이해할 수 있는 독립적인 질문으로 재작성하세요. "
          "질문을 답변하지 마세요. 재작성이 필요 없으면 그대로 반환하세요."),
-        MessagesPlaceholder("chat_history"),
+        MessagesPlaceholder("rewrite_history"),
         ("human", "{input}"),
     ])
-    history_aware_retriever = create_history_aware_retriever(
-        llm, retriever, contextualize_prompt
+    # 재작성이 필요 없는 질문(히스토리 없음, 자체 완결적 질문)은 LLM 호출 없이 바로 검색.
+    # 재작성이 마감 시간을 넘기면 원래 질문으로 검색한다.
+    rewrite = _with_deadline(
+        RunnablePassthrough.assign(rewrite_history=_rewrite_history)
+        | contextualize_prompt | (rewrite_llm or llm) | StrOutputParser(),
+        "rewrite",
+        fallback=RunnableLambda(itemgetter("input")),
+    )
+    search_query = RunnableBranch((_needs_rewrite, rewrite), itemgetter("input")).with_config(
+        run_name="chat_retriever_chain"
+    )
+    retrieve_documents = _with_deadline(_retrieve(retriever), "retrieval").with_config(
+        run_name="retrieve_documents"
     )
 
     # blog_id + language에 따라 프롬프트 분기
@@ -54,6 +202,40 @@ def create_rag_chain(
         MessagesPlaceholder("chat_history"),
         ("human", "{input}"),
     ])
-    question_answer_chain = create_stuff_documents_chain(llm, qa_prompt)
+    if model_router is None:
+        question_answer_chain = create_stuff_documents_chain(llm, qa_prompt)
+    else:
+        # 패킹된 컨텍스트 크기까지 반영해 티어를 고르므로 packer 뒤에서 라우팅한다
+        tier_chains = [create_stuff_documents_chain(tier_llm, qa_prompt) for tier_llm in model_router.llms]
+
+        def route(chain_input: dict) -> Runnable:
+            signals = model_router.signals(chain_input, count_tokens)
+            tier = model_router.select(signals)
+            logger.info("답변 모델 라우팅", extra={
+                "tier": tier, "model": model_router.models[tier], **vars(signals),
+            })
+            return model_router.timed(tier, tier_chains[tier])
+
+        question_answer_chain = RunnableLambda(route, name="route_answer_model")
+    if context_token_budget:
+        # 인접 청크 병합 + 겹침 제거 후 토큰 예산만큼만 프롬프트에 넣는다
+        packer = create_context_packer(context_token_budget, count_tokens, compress=compress_context)
+        question_answer_chain = RunnablePassthrough.assign(context=packer) | question_answer_chain
+    question_answer_chain = _stream_with_deadline(question_answer_chain, "generation")
+    if blog_id == "inspireme":
+        # 명언 추천 모드는 LLM 없이 검색된 명언/저자 문서를 템플릿으로 나열한다
+        recommend = RunnableLambda(
+            lambda chain_input: format_recommendations(chain_input["context"], language),
+            name="format_recommendations",
+        )
+        question_answer_chain = RunnableBranch(
+            (lambda chain_input: chain_input.get("response_mode") == RECOMMEND, recommend),
+            question_answer_chain,
+        )
 
-    return create_retrieval_chain(history_aware_retriever, question_answer_chain)
+    # 결과: input, chat_history, query(검색에 쓴 독립 질문), context(검색 문서), answer
+    return (
+        RunnablePassthrough.assign(query=search_query)
+        .assign(context=retrieve_documents)
+        .assign(answer=question_answer_chain)
+    ).with_config(run_name="retrieval_chain")
@@ -19,6 +19,8 @@ def create_text_splitter(
             " ",       # 공백
         ],
         length_function=len,
+        # 검색 후 인접 청크 병합(context packing)에 사용
+        add_start_index=True,
     )
 
 
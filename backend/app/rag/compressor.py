@@ -0,0 +1,136 @@
+"""질문 기반 추출형 컨텍스트 압축 (LLM 미사용).
+
+청크를 문장, 코드 블록, 표 단위 span으로 나누고 질문과의 어휘 겹침(IDF 가중)과
+청크의 쿼리 임베딩 유사도(검색 단계에서 metadata["relevance"]로 기록)를 곱해 점수를 매긴다.
+토큰 예산 안에서 점수가 높은 span만 남기고 원래 순서대로 다시 이어 붙인다.
+"""
+
+import math
+import re
+from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from langchain_core.documents import Document
+
+from app.rag.analyzer import analyze
+
+# 이보다 점수가 낮은 span은 예산이 남아도 버린다
+DEFAULT_MIN_SCORE = 0.1
+
+_CODE_FENCE = re.compile(r"^\s*(```|~~~)")
+_TABLE_ROW = re.compile(r"^\s*\|")
+_HEADING = re.compile(r"^\s*#{1,6}\s")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+")
+
+
+@dataclass
+class Span:
+    text: str
+    kind: str  # "text" | "code" | "table" | "heading"
+
+
+def split_spans(text: str) -> list[Span]:
+    """마크다운 본문을 코드 블록, 표, 제목, 문장 단위 span으로 나눈다."""
+    spans: list[Span] = []
+    lines = text.split("\n")
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if _CODE_FENCE.match(line):
+            fence = _CODE_FENCE.match(line).group(1)
+            end = i + 1
+            while end < len(lines) and not lines[end].strip().startswith(fence):
+                end += 1
+            spans.append(Span("\n".join(lines[i:end + 1]), "code"))
+            i = end + 1
+        elif _TABLE_ROW.match(line):
+            end = i
+            while end < len(lines) and _TABLE_ROW.match(lines[end]):
+                end += 1
+            spans.append(Span("\n".join(lines[i:end]), "table"))
+            i = end
+        elif _HEADING.match(line):
+            spans.append(Span(line.strip(), "heading"))
+            i += 1
+        else:
+            for sentence in _SENTENCE_END.split(line):
+                if sentence.strip():
+                    spans.append(Span(sentence.strip(), "text"))
+            i += 1
+    return spans
+
+
+def tokenize(text: str) -> set[str]:
+    """어휘 겹침 계산용 토큰 집합. 영문/숫자는 단어, 한글은 조사에 강건하도록 음절 bigram을 쓴다."""
+    return set(analyze(text))
+
+
+def score_spans(query: str, spans: Sequence[Span], relevance: Sequence[float]) -> list[float]:
+    """질문 토큰 중 span이 포함하는 비율(IDF 가중) × 청크 관련도.
+
+    어떤 span에도 나오지 않는 질문 토큰("무엇인가요" 등 질문 어미)은 분모에서 제외한다.
+    """
+    query_tokens = tokenize(query)
+    span_tokens = [tokenize(s.text) for s in spans]
+    if not query_tokens or not spans:
+        return [0.0] * len(spans)
+
+    # 이번 후보 span 집합 기준 IDF: 모든 span에 나오는 흔한 토큰의 비중을 낮춘다
+    df = Counter(t for tokens in span_tokens for t in tokens & query_tokens)
+    idf = {t: math.log(1 + len(spans) / (1 + df[t])) for t in df}
+    total = sum(idf.values())
+    if not total:
+        return [0.0] * len(spans)
+
+    return [
+        sum(idf[t] for t in tokens & query_tokens) / total * rel
+        for tokens, rel in zip(span_tokens, relevance)
+    ]
+
+
+def compress_documents(
+    query: str,
+    documents: Sequence[Document],
+    token_budget: int,
+    count_tokens: Callable[[str], int],
+    min_score: float = DEFAULT_MIN_SCORE,
+) -> tuple[list[Document], int]:
+    """문서들에서 질문과 관련된 span만 골라 토큰 예산 안으로 압축한다.
+
+    Returns:
+        (압축된 문서 목록 - 선택된 span이 없는 문서는 제외, 사용한 토큰 수)
+    """
+    entries: list[tuple[int, Span]] = []
+    relevance: list[float] = []
+    for doc_index, doc in enumerate(documents):
+        # 쿼리-청크 임베딩 유사도가 없으면(검색 방식에 따라) 1로 간주한다
+        doc_relevance = max(float(doc.metadata.get("relevance", 1.0)), 0.0)
+        for span in split_spans(doc.page_content):
+            entries.append((doc_index, span))
+            relevance.append(doc_relevance)
+
+    scores = score_spans(query, [span for _, span in entries], relevance)
+    ranked = sorted(range(len(entries)), key=lambda i: scores[i], reverse=True)
+
+    selected: set[int] = set()
+    used = 0
+    for i in ranked:
+        if scores[i] < min_score:
+            break
+        tokens = count_tokens(entries[i][1].text)
+        if used + tokens > token_budget:
+            continue
+        selected.add(i)
+        used += tokens
+
+    parts: dict[int, list[str]] = {}
+    for i in sorted(selected):
+        doc_index, span = entries[i]
+        parts.setdefault(doc_index, []).append(span.text)
+    compressed = [
+        Document(page_content="\n".join(parts[doc_index]), metadata=doc.metadata)
+        for doc_index, doc in enumerate(documents)
+        if doc_index in parts
+    ]
+    return compressed, used
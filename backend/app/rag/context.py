@@ -0,0 +1,198 @@
+"""검색 결과를 QA 프롬프트에 넣기 전에 토큰 예산에 맞춰 정리(packing)한다.
+
+청크는 chunk_overlap만큼 앞뒤 청크와 텍스트가 겹치므로, 같은 source의 인접 청크를
+하나로 합치면서 겹치는 구간을 제거한 뒤 검색 순위대로 토큰 예산을 채운다.
+압축을 켜면 문서 단위 대신 질문과 관련된 span 단위로 예산을 채운다 (app.rag.compressor).
+"""
+
+import logging
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+
+import tiktoken
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage
+
+from app.rag.compressor import DEFAULT_MIN_SCORE, compress_documents
+
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+# 이보다 짧은 접미/접두 일치는 우연의 일치로 보고 병합하지 않는다
+MIN_OVERLAP_CHARS = 20
+
+# 스플리터가 청크 경계의 공백을 제거하므로, 이 이하의 간격은 이어진 청크로 본다
+_MAX_GAP_CHARS = 2
+
+# 예산을 넘는 첫 문서를 잘라 넣을 때 남길 최소 토큰 수
+_MIN_TRUNCATED_TOKENS = 32
+
+
+@lru_cache
+def get_token_counter(model: str) -> TokenCounter:
+    """모델에 맞는 tiktoken 인코딩으로 토큰 수를 세는 함수를 반환한다.
+
+    인코딩 파일을 받을 수 없는 환경(오프라인 등)에서는 문자 수 기반 추정치로 대체한다.
+    """
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken 인코딩 로드 실패 - 추정치 사용", extra={"model": model, "error": str(e)})
+        return estimate_tokens
+
+    def count(text: str) -> int:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return count
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 보수적 추정치 (한국어는 대략 1~2자당 1토큰)."""
+    return (len(text) + 1) // 2
+
+
+def _overlap_length(left: str, right: str, min_overlap: int = MIN_OVERLAP_CHARS) -> int:
+    """left의 접미사와 right의 접두사가 겹치는 가장 긴 길이 (min_overlap 미만이면 0)."""
+    if len(left) < min_overlap or len(right) < min_overlap:
+        return 0
+    probe = left[-min_overlap:]
+    best = 0
+    start = right.find(probe)
+    while start != -1:
+        length = start + min_overlap
+        if left.endswith(right[:length]):
+            best = length
+        start = right.find(probe, start + 1)
+    return best
+
+
+def _merge_pair(left: Document, right: Document) -> Document | None:
+    """두 청크가 이어지면 겹침을 제거하고 합친 Document를, 아니면 None을 반환한다."""
+    a, b = left.page_content, right.page_content
+    if b in a:
+        return left
+    if a in b:
+        return right
+
+    a_start, b_start = left.metadata.get("start_index"), right.metadata.get("start_index")
+    if isinstance(a_start, int) and isinstance(b_start, int):
+        if a_start > b_start:
+            left, right, a, b, a_start, b_start = right, left, b, a, b_start, a_start
+        overlap = a_start + len(a) - b_start
+        if overlap < -_MAX_GAP_CHARS:
+            return None
+        merged = a + b[overlap:] if overlap >= 0 else a + "\n" + b
+    else:
+        overlap = _overlap_length(a, b)
+        if not overlap:
+            reverse = _overlap_length(b, a)
+            if not reverse:
+                return None
+            left, right, a, b, overlap = right, left, b, a, reverse
+        merged = a + b[overlap:]
+    return Document(page_content=merged, metadata=left.metadata)
+
+
+def merge_overlapping(documents: Sequence[Document]) -> list[Document]:
+    """같은 source의 청크 중 겹치거나 이어지는 것을 합친다. 결과는 검색 순위 순서를 따른다."""
+    merged: list[Document] = []
+    for doc in documents:
+        source = doc.metadata.get("source")
+        if source is None:
+            if all(d.page_content != doc.page_content for d in merged):
+                merged.append(doc)
+            continue
+
+        current = doc
+        position = len(merged)
+        i = 0
+        while i < len(merged):
+            existing = merged[i]
+            combined = (
+                _merge_pair(existing, current)
+                if existing.metadata.get("source") == source
+                else None
+            )
+            if combined is None:
+                i += 1
+                continue
+            # 합친 결과가 다른 청크와 다시 이어질 수 있으므로 처음부터 다시 확인한다
+            merged.pop(i)
+            position = min(position, i)
+            current = combined
+            i = 0
+        merged.insert(min(position, len(merged)), current)
+    return merged
+
+
+def pack_documents(
+    documents: Sequence[Document],
+    token_budget: int,
+    count_tokens: TokenCounter,
+    query: str | None = None,
+    min_score: float = DEFAULT_MIN_SCORE,
+) -> tuple[list[Document], int]:
+    """중복 제거 후 검색 순위대로 토큰 예산 안에 들어가는 문서만 남긴다.
+
+    query를 넘기면 질문과 관련된 span만 추출해 예산을 채운다.
+    관련 span이 하나도 없으면 문서 단위 packing으로 대체한다.
+
+    Returns:
+        (packing된 문서 목록, 사용한 컨텍스트 토큰 수)
+    """
+    merged = merge_overlapping(documents)
+    if query:
+        compressed, used = compress_documents(query, merged, token_budget, count_tokens, min_score)
+        if compressed:
+            return compressed, used
+
+    packed: list[Document] = []
+    used = 0
+    for doc in merged:
+        tokens = count_tokens(doc.page_content)
+        if used + tokens <= token_budget:
+            packed.append(doc)
+            used += tokens
+        elif not packed and token_budget >= _MIN_TRUNCATED_TOKENS:
+            # 1순위 문서 하나가 예산을 넘으면 비율대로 잘라서라도 넣는다
+            keep = int(len(doc.page_content) * token_budget / tokens)
+            text = doc.page_content[:keep]
+            while text and count_tokens(text) > token_budget:
+                text = text[: int(len(text) * 0.9)]
+            packed.append(Document(page_content=text, metadata=doc.metadata))
+            used += count_tokens(text)
+    return packed, used
+
+
+def _history_text(chat_history: Sequence[BaseMessage] | None) -> str:
+    return "\n".join(str(m.content) for m in chat_history or [])
+
+
+def create_context_packer(
+    token_budget: int,
+    count_tokens: TokenCounter,
+    compress: bool = False,
+) -> Callable[[dict], list[Document]]:
+    """RAG 체인 입력(dict)의 context를 packing하고 프롬프트 크기를 로그로 남기는 함수를 만든다."""
+
+    def pack(chain_input: dict) -> list[Document]:
+        documents = chain_input["context"]
+        # 후속 질문은 재작성된 검색 쿼리("query")가 있어야 대명사 없이 관련 span을 고를 수 있다
+        query = (chain_input.get("query") or chain_input["input"]) if compress else None
+        packed, context_tokens = pack_documents(documents, token_budget, count_tokens, query)
+        logger.info("프롬프트 크기", extra={
+            "retrieved_docs": len(documents),
+            "packed_docs": len(packed),
+            "compressed": compress,
+            "context_tokens": context_tokens,
+            "history_tokens": count_tokens(_history_text(chain_input.get("chat_history"))),
+            "question_tokens": count_tokens(chain_input["input"]),
+            "token_budget": token_budget,
+        })
+        return packed
+
+    return pack
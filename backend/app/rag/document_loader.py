@@ -5,6 +5,8 @@ from pathlib import Path
 import yaml
 from langchain_core.documents import Document
 
+from app.rag.filters import DATE_INT_FIELD, date_to_int
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,6 +77,10 @@ def load_blog_documents(contents_dir: str, blog_id: str) -> list[Document]:
             "source": relative_path,
             "url": build_post_url(relative_path, blog_id),
         }
+        # Chroma where 절의 날짜 범위 필터용 (범위 연산자는 숫자만 지원)
+        date_int = date_to_int(doc_metadata["date"])
+        if date_int is not None:
+            doc_metadata[DATE_INT_FIELD] = date_int
         # tags가 비어있지 않은 경우에만 추가 (모두 문자열로 변환)
         if tags:
             doc_metadata["tags"] = [str(tag) for tag in tags]
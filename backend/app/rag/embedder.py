@@ -1,6 +1,153 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import httpx
+
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
 
 
-def create_embeddings(model: str = "text-embedding-3-small") -> OpenAIEmbeddings:
-    """OpenAI 임베딩 모델을 생성한다."""
-    return OpenAIEmbeddings(model=model)
+class _LRU:
+    """스레드 안전한 고정 크기 LRU 저장소. 히트/미스 횟수를 함께 기록한다."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def get(self, key: str) -> list[float] | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: list[float]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 결과를 메모리 LRU에 캐싱하는 Embeddings wrapper.
+
+    키는 모델 이름 + 텍스트 SHA-256 해시다. embed_query는 항상 캐싱하고,
+    embed_documents는 cache_documents=True일 때만 캐싱한다 (인덱싱 시 메모리 절약).
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: str,
+        max_size: int = 2048,
+        cache_documents: bool = False,
+    ):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache_documents = cache_documents
+        self._queries = _LRU(max_size)
+        self._documents = _LRU(max_size) if cache_documents else None
+
+    def _key(self, text: str) -> str:
+        return f"{self.model}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        cached = self._queries.get(key)
+        if cached is None:
+            cached = self.embeddings.embed_query(text)
+            self._queries.put(key, cached)
+        return cached
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self._key(text)
+        cached = self._queries.get(key)
+        if cached is None:
+            cached = await self.embeddings.aembed_query(text)
+            self._queries.put(key, cached)
+        return cached
+
+    async def aembed_queries(self, texts: list[str]) -> None:
+        """캐시에 없는 쿼리들을 한 번의 API 호출로 임베딩하여 쿼리 캐시에 미리 저장한다."""
+        missing = list(dict.fromkeys(t for t in texts if self._key(t) not in self._queries))
+        if not missing:
+            return
+        vectors = await self.embeddings.aembed_documents(missing)
+        for text, vec in zip(missing, vectors):
+            self._queries.put(self._key(text), vec)
+
+    def _split_cached(self, texts: list[str]) -> tuple[list[list[float] | None], list[int]]:
+        """캐시된 결과와 임베딩이 필요한 인덱스 목록을 반환한다."""
+        results = [self._documents.get(self._key(t)) for t in texts]
+        missing = [i for i, r in enumerate(results) if r is None]
+        return results, missing
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self._documents is None:
+            return self.embeddings.embed_documents(texts)
+        results, missing = self._split_cached(texts)
+        if missing:
+            vectors = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vec in zip(missing, vectors):
+                results[i] = vec
+                self._documents.put(self._key(texts[i]), vec)
+        return results
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self._documents is None:
+            return await self.embeddings.aembed_documents(texts)
+        results, missing = self._split_cached(texts)
+        if missing:
+            vectors = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            for i, vec in zip(missing, vectors):
+                results[i] = vec
+                self._documents.put(self._key(texts[i]), vec)
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "query": self._queries.stats(),
+            "documents": self._documents.stats() if self._documents else None,
+        }
+
+
+def create_embeddings(
+    model: str = "text-embedding-3-small",
+    cache_size: int = 2048,
+    cache_documents: bool = False,
+    http_client: httpx.Client | None = None,
+    http_async_client: httpx.AsyncClient | None = None,
+) -> CachedEmbeddings:
+    """OpenAI 임베딩 모델을 쿼리 임베딩 LRU 캐시로 감싸 생성한다.
+
+    http_client/http_async_client를 넘기면 공유 커넥션 풀을 사용한다.
+    """
+    return CachedEmbeddings(
+        OpenAIEmbeddings(
+            model=model, http_client=http_client, http_async_client=http_async_client
+        ),
+        model=model,
+        max_size=cache_size,
+        cache_documents=cache_documents,
+    )
@@ -0,0 +1,181 @@
+"""검색 메타데이터 사전 필터.
+
+블로그 청크는 category, tags, date, inspireme 문서는 type, author, topics로 거른다.
+필드 안의 값은 OR(하나라도 일치), 필드 간에는 AND로 결합하며 날짜 범위는 양 끝을 포함한다.
+
+로컬 벡터 인덱스와 BM25 인덱스는 로드 시 MetadataIndex(필드 값별 정렬된 행 번호 집합 +
+날짜순 행 번호)를 한 번 만들어 두고 필터에 맞는 행만 점수를 계산하므로, 필터가 좁을수록 검색이 빨라진다.
+Chroma 백엔드는 같은 필터를 where 절로 바꿔 서버에서 사전 필터링한다.
+"""
+
+import json
+import re
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass, fields
+
+import numpy as np
+from langchain_core.documents import Document
+
+# 값 목록으로 거르는 필드. tags/topics는 메타데이터가 리스트이고 나머지는 문자열이다
+VALUE_FIELDS = ("category", "tags", "type", "author", "topics")
+LIST_FIELDS = frozenset({"tags", "topics"})
+# Chroma의 범위 연산자는 숫자만 지원하므로 인덱싱 시 date를 YYYYMMDD 정수로도 저장한다
+DATE_INT_FIELD = "date_int"
+
+_DATE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
+
+
+def date_to_int(value) -> int | None:
+    """"2024-01-15"(또는 "2024-01-15 10:00:00") → 20240115. 날짜가 아니면 None."""
+    match = _DATE.match(str(value or ""))
+    if match is None:
+        return None
+    year, month, day = (int(part) for part in match.groups())
+    return year * 10000 + month * 100 + day
+
+
+def _metadata_date(metadata: dict) -> int | None:
+    # date_int 없이 저장된 이전 인덱스는 date 문자열에서 계산한다
+    value = metadata.get(DATE_INT_FIELD)
+    return value if isinstance(value, int) else date_to_int(metadata.get("date"))
+
+
+def _metadata_values(metadata: dict, field: str) -> list[str]:
+    value = metadata.get(field)
+    if value is None or value == "":
+        return []
+    return [str(v) for v in value] if isinstance(value, list) else [str(value)]
+
+
+@dataclass(frozen=True)
+class MetadataFilter:
+    """검색 사전 필터. 빈 필드는 조건 없음. 날짜는 YYYYMMDD 정수."""
+
+    category: tuple[str, ...] = ()
+    tags: tuple[str, ...] = ()
+    type: tuple[str, ...] = ()
+    author: tuple[str, ...] = ()
+    topics: tuple[str, ...] = ()
+    date_from: int | None = None
+    date_to: int | None = None
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, f.name) not in ((), None) for f in fields(self))
+
+    @property
+    def has_date(self) -> bool:
+        return self.date_from is not None or self.date_to is not None
+
+    def cache_key(self) -> str:
+        """응답 캐시 키에 넣을 정규화된 문자열 (값 순서/중복 무관)."""
+        conditions = {
+            f.name: sorted(set(value)) if isinstance(value, tuple) else value
+            for f in fields(self)
+            if (value := getattr(self, f.name)) not in ((), None)
+        }
+        return json.dumps(conditions, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+    def matches(self, metadata: dict) -> bool:
+        for field in VALUE_FIELDS:
+            wanted = getattr(self, field)
+            if wanted and not set(wanted).intersection(_metadata_values(metadata, field)):
+                return False
+        if self.has_date:
+            date = _metadata_date(metadata)
+            if date is None:
+                return False
+            if self.date_from is not None and date < self.date_from:
+                return False
+            if self.date_to is not None and date > self.date_to:
+                return False
+        return True
+
+    def to_chroma_where(self) -> dict | None:
+        """Chroma where 절. 조건이 없으면 None."""
+        conditions = []
+        for field in VALUE_FIELDS:
+            wanted = list(dict.fromkeys(getattr(self, field)))
+            if not wanted:
+                continue
+            if field in LIST_FIELDS:
+                contains = [{field: {"$contains": value}} for value in wanted]
+                conditions.append(contains[0] if len(contains) == 1 else {"$or": contains})
+            else:
+                conditions.append({field: {"$in": wanted}})
+        if self.date_from is not None:
+            conditions.append({DATE_INT_FIELD: {"$gte": self.date_from}})
+        if self.date_to is not None:
+            conditions.append({DATE_INT_FIELD: {"$lte": self.date_to}})
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+class MetadataIndex:
+    """문서 목록의 필드 값별 행 번호 집합(정렬된 int32 배열)과 날짜순 행 번호.
+
+    rows()는 필드 안에서는 합집합, 필드 간에는 교집합을 구하므로 비용이 전체 문서 수가 아니라
+    조건에 걸린 행 번호 수에 비례한다.
+    """
+
+    def __init__(
+        self,
+        postings: dict[str, dict[str, np.ndarray]],
+        dated_rows: np.ndarray,
+        dates: np.ndarray,
+    ):
+        self.postings = postings
+        self.dated_rows = dated_rows  # 날짜가 있는 행 (날짜 오름차순)
+        self.dates = dates  # dated_rows 순서의 YYYYMMDD
+
+    @classmethod
+    def build(cls, documents: Sequence[Document]) -> "MetadataIndex":
+        rows: dict[str, dict[str, list[int]]] = {field: defaultdict(list) for field in VALUE_FIELDS}
+        dated: list[tuple[int, int]] = []
+        for row, doc in enumerate(documents):
+            for field in VALUE_FIELDS:
+                for value in dict.fromkeys(_metadata_values(doc.metadata, field)):
+                    rows[field][value].append(row)
+            date = _metadata_date(doc.metadata)
+            if date is not None:
+                dated.append((date, row))
+        dated.sort()
+        postings = {
+            field: {value: np.asarray(ids, dtype=np.int32) for value, ids in values.items()}
+            for field, values in rows.items()
+        }
+        return cls(
+            postings,
+            np.asarray([row for _, row in dated], dtype=np.int32),
+            np.asarray([date for date, _ in dated], dtype=np.int64),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ids.nbytes for values in self.postings.values() for ids in values.values()) + (
+            self.dated_rows.nbytes + self.dates.nbytes
+        )
+
+    def rows(self, metadata_filter: MetadataFilter) -> np.ndarray:
+        """필터에 맞는 행 번호 (오름차순 int64)."""
+        selected: np.ndarray | None = None
+        for field in VALUE_FIELDS:
+            wanted = getattr(metadata_filter, field)
+            if not wanted:
+                continue
+            postings = [self.postings[field][v] for v in set(wanted) if v in self.postings[field]]
+            ids = np.unique(np.concatenate(postings)) if postings else np.zeros(0, dtype=np.int32)
+            selected = ids if selected is None else np.intersect1d(selected, ids, assume_unique=True)
+        if metadata_filter.has_date:
+            lo = 0 if metadata_filter.date_from is None else np.searchsorted(
+                self.dates, metadata_filter.date_from, side="left"
+            )
+            hi = len(self.dates) if metadata_filter.date_to is None else np.searchsorted(
+                self.dates, metadata_filter.date_to, side="right"
+            )
+            ids = np.sort(self.dated_rows[lo:hi])
+            selected = ids if selected is None else np.intersect1d(selected, ids, assume_unique=True)
+        if selected is None:
+            raise ValueError("조건이 없는 필터입니다")
+        return selected.astype(np.int64)
@@ -0,0 +1,164 @@
+"""대화 히스토리 길이 제한 (rolling summarization).
+
+최근 max_turns개 턴은 원문 그대로 토큰 예산 안에서 유지하고,
+그보다 오래된 턴은 요약 하나로 접어서 재작성/QA 프롬프트의 크기를 일정하게 유지한다.
+요약은 오래된 메시지 prefix의 해시로 캐싱하며, 다음 턴에는 직전 요약에
+새로 밀려난 메시지만 접어 넣으므로 턴마다 요약 비용이 늘어나지 않는다.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.rag.context import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "이전 대화 요약:\n"
+
+_SUMMARIZE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "당신은 대화 요약기입니다. 기존 요약과 이어지는 대화를 합쳐 "
+     "이후 질문을 이해하는 데 필요한 주제, 고유 명사, 사용자의 관심사만 남긴 "
+     "간결한 한국어 요약을 작성하세요. 5문장을 넘기지 마세요."),
+    ("human", "기존 요약:\n{summary}\n\n이어지는 대화:\n{conversation}"),
+])
+
+
+def _role(message: BaseMessage) -> str:
+    return "사용자" if isinstance(message, HumanMessage) else "AI"
+
+
+def _prefix_hashes(messages: Sequence[BaseMessage]) -> list[str]:
+    """각 prefix(messages[:i+1])의 누적 해시 목록."""
+    hashes = []
+    digest = b""
+    for message in messages:
+        digest = hashlib.sha256(
+            digest + f"{message.type}\x00{message.content}".encode("utf-8")
+        ).digest()
+        hashes.append(digest.hex())
+    return hashes
+
+
+class HistoryManager:
+    """chat_history를 최근 턴 + 이전 대화 요약으로 제한한다.
+
+    Args:
+        llm: 요약에 사용할 LLM (None이면 오래된 턴을 요약 없이 버린다)
+        count_tokens: 토큰 카운터
+        max_turns: 원문으로 유지할 최근 턴 수 (한 턴 = 사용자 질문 + AI 답변)
+        token_budget: 원문으로 유지할 최근 턴의 토큰 예산
+        cache_size: 캐싱할 요약 수
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel | None,
+        count_tokens: TokenCounter,
+        max_turns: int = 3,
+        token_budget: int = 1500,
+        cache_size: int = 1000,
+    ):
+        self.llm = llm
+        self.count_tokens = count_tokens
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.cache_size = cache_size
+        self._summaries: OrderedDict[str, str] = OrderedDict()
+        self._chain = _SUMMARIZE_PROMPT | llm | StrOutputParser() if llm is not None else None
+        self._pending: set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    def split(self, messages: Sequence[BaseMessage]) -> int:
+        """원문으로 유지할 최근 메시지의 시작 인덱스를 반환한다."""
+        start = max(0, len(messages) - self.max_turns * 2)
+        used = sum(self.count_tokens(str(m.content)) for m in messages[start:])
+        # 예산을 넘으면 오래된 메시지부터 제외하되 마지막 메시지는 남긴다
+        while used > self.token_budget and start < len(messages) - 1:
+            used -= self.count_tokens(str(messages[start].content))
+            start += 1
+        # 최근 구간이 AI 답변으로 시작하지 않도록 턴 경계에 맞춘다
+        while start < len(messages) - 1 and isinstance(messages[start], AIMessage):
+            start += 1
+        return start
+
+    async def abound(self, messages: Sequence[BaseMessage]) -> list[BaseMessage]:
+        """요약 메시지(필요 시) + 최근 메시지로 구성된 제한된 히스토리를 반환한다."""
+        start = self.split(messages)
+        recent = list(messages[start:])
+        if start == 0:
+            return recent
+        summary = await self._summarize(messages[:start])
+        if not summary:
+            return recent
+        return [SystemMessage(content=SUMMARY_PREFIX + summary), *recent]
+
+    async def abound_within(self, messages: Sequence[BaseMessage], timeout: float) -> list[BaseMessage]:
+        """abound()를 timeout 안에서 실행한다. 시간 초과 시 요약 없이 최근 메시지만 반환한다.
+
+        요약 호출은 취소하지 않고 끝까지 실행해 캐시에 남기므로 다음 턴에는 캐시 히트가 된다.
+        """
+        task = asyncio.ensure_future(self.abound(messages))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except TimeoutError:
+            self.timeouts += 1
+            logger.warning("대화 요약 시간 초과 - 요약 없이 최근 턴만 사용", extra={"messages": len(messages)})
+            return list(messages[self.split(messages):])
+
+    async def _summarize(self, older: Sequence[BaseMessage]) -> str | None:
+        hashes = _prefix_hashes(older)
+        cached_at, summary = -1, ""
+        for i in range(len(hashes) - 1, -1, -1):
+            cached = self._summaries.get(hashes[i])
+            if cached is not None:
+                self._summaries.move_to_end(hashes[i])
+                cached_at, summary = i, cached
+                break
+
+        if cached_at == len(older) - 1:
+            self.hits += 1
+            return summary
+        self.misses += 1
+        if self._chain is None:
+            return None
+
+        # 직전 요약에 새로 밀려난 메시지만 접어 넣는다
+        conversation = "\n".join(f"{_role(m)}: {m.content}" for m in older[cached_at + 1:])
+        try:
+            summary = await self._chain.ainvoke({
+                "summary": summary or "(없음)",
+                "conversation": conversation,
+            })
+        except Exception:
+            self.failures += 1
+            logger.exception("대화 요약 실패", extra={"messages": len(older)})
+            return None
+
+        self._summaries[hashes[-1]] = summary
+        while len(self._summaries) > self.cache_size:
+            self._summaries.popitem(last=False)
+        return summary
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._summaries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
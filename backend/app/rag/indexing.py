@@ -0,0 +1,54 @@
+"""Chroma 인덱싱과 함께 디스크에 저장되는 검색 인덱스(BM25, 로컬 벡터 인덱스) 관리.
+
+/index/{blog_id} API와 scripts/index_documents.py가 같은 함수를 사용하므로
+두 인덱싱 경로가 디스크에 남기는 인덱스는 항상 같다.
+Collection을 다시 만들기 전에 이전 인덱스를 지우고, 새 청크로 다시 만들다가 실패하면
+지운 상태로 두므로 서버는 Chroma와 다른 청크를 담은 인덱스를 로드하지 않는다 (없으면 시맨틱 검색만 사용).
+"""
+
+import logging
+from collections.abc import Sequence
+
+from langchain_core.documents import Document
+
+from app.config import Settings
+from app.rag.bm25 import build_keyword_index, remove_keyword_index
+from app.rag.local_index import export_vector_index, remove_vector_index
+from app.rag.vector_store import VectorStoreManager
+
+logger = logging.getLogger(__name__)
+
+
+def remove_search_indexes(settings: Settings, blog_id: str) -> None:
+    """blog_id의 저장된 검색 인덱스를 삭제한다 (Collection 삭제 직후 호출)."""
+    remove_keyword_index(settings.keyword_index_dir, blog_id)
+    remove_vector_index(settings.local_vector_dir, blog_id)
+
+
+def build_search_indexes(
+    settings: Settings,
+    manager: VectorStoreManager,
+    blog_id: str,
+    chunks: Sequence[Document],
+) -> None:
+    """Chroma에 인덱싱한 것과 같은 청크로 검색 인덱스를 다시 만든다.
+
+    BM25 인덱스는 use_hybrid_search와 무관하게 항상 만든다 (/search의 hybrid 요청이 사용).
+    로컬 벡터 인덱스는 vector_backend가 "local"일 때만 Chroma 임베딩을 내보내 만들고 (임베딩 재호출 없음),
+    아니면 비활성화한다 (나중에 local로 바꾸면 재인덱싱 전까지 Chroma 사용).
+    저장에 실패하면 로그를 남기고 인덱스를 삭제한 상태로 둔다 (인덱싱 자체는 성공으로 처리).
+    """
+    try:
+        build_keyword_index(settings.keyword_index_dir, blog_id, chunks)
+    except Exception:
+        logger.exception("BM25 인덱스 저장 실패 - 시맨틱 검색만 사용", extra={"blog_id": blog_id})
+        remove_keyword_index(settings.keyword_index_dir, blog_id)
+
+    if settings.vector_backend != "local":
+        remove_vector_index(settings.local_vector_dir, blog_id)
+        return
+    try:
+        export_vector_index(manager, settings.local_vector_dir, blog_id)
+    except Exception:
+        logger.exception("로컬 벡터 인덱스 내보내기 실패 - Chroma 사용", extra={"blog_id": blog_id})
+        remove_vector_index(settings.local_vector_dir, blog_id)
@@ -0,0 +1,378 @@
+"""프로세스 내 메모리 맵 벡터 인덱스 (Chroma 대체 백엔드).
+
+재인덱싱 시 Chroma Collection의 임베딩/청크를 그대로 내보내 blog_id별 디렉토리에 저장한다
+(임베딩 API 재호출 없음). 임베딩은 행 정규화된 float32 (n, d) 행렬(.npy)로 저장해
+np.load(mmap_mode="r")로 로드하므로 페이지 캐시를 프로세스 간에 공유하고,
+top-k는 행렬 × 쿼리 벡터 한 번과 argpartition으로 계산한다 (네트워크 왕복 없음).
+
+디렉토리 구조:
+    {root}/{blog_id}/CURRENT      현재 버전 이름
+    {root}/{blog_id}/v{n}/embeddings.npy
+    {root}/{blog_id}/v{n}/embeddings.int8.npy, scales.npy
+    {root}/{blog_id}/v{n}/documents.json
+
+새 버전을 모두 쓴 뒤 CURRENT를 os.replace로 교체하므로 읽는 쪽은 항상 완전한 버전을 본다.
+
+quantization="int8"이면 후보 검색은 차원별 스칼라 양자화된 int8 행렬(float32의 1/4)로 하고,
+상위 rescore_k개 후보만 float32 행렬에서 정확한 점수로 다시 계산한다.
+float32 행렬은 메모리 맵이므로 후보 행만 읽히고, 전수 검색이 훑는 작업 집합은 int8 행렬뿐이다.
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever, RetrieverLike
+from pydantic import ConfigDict
+
+from app.rag.filters import MetadataFilter, MetadataIndex
+from app.rag.retriever import mmr_select
+from app.rag.vector_store import VectorStoreManager
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+EMBEDDINGS_FILE = "embeddings.npy"
+CODES_FILE = "embeddings.int8.npy"
+SCALES_FILE = "scales.npy"
+DOCUMENTS_FILE = "documents.json"
+# 교체 직후 이전 버전을 읽고 있을 수 있는 요청을 위해 남겨둘 버전 수 (현재 포함)
+KEEP_VERSIONS = 2
+QUANTIZATIONS = ("none", "int8")
+DEFAULT_RESCORE_K = 100
+# int8 → float32 변환 임시 블록 크기. 캐시에 머무는 크기여야 변환 비용이 float32 행렬을 훑는 비용보다 작다
+_BLOCK_BYTES = 1 << 20
+
+
+def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개 인덱스 (점수 내림차순)."""
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class Int8Matrix:
+    """차원별 대칭 스칼라 양자화 행렬. x[i, j] ≈ codes[i, j] × scales[j].
+
+    내적 q·x[i] ≈ codes[i] · (q ⊙ scales)이므로 쿼리 쪽에 scale을 곱해 한 번의 행렬곱으로 근사 점수를 얻는다.
+    """
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def quantize(cls, matrix: np.ndarray) -> "Int8Matrix":
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if not len(matrix):
+            return cls(np.zeros(matrix.shape, dtype=np.int8), np.ones(matrix.shape[1:], dtype=np.float32))
+        scales = np.maximum(np.abs(matrix).max(axis=0), 1e-12) / 127
+        codes = np.rint(matrix / scales).clip(-127, 127).astype(np.int8)
+        return cls(codes, scales.astype(np.float32))
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.scales.nbytes)
+
+    def scores(self, query: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        """query와의 근사 내적. rows가 주어지면 그 행들만 계산한다 (len(rows),)."""
+        codes = self.codes if rows is None else self.codes[rows]
+        scaled = query * self.scales
+        scores = np.empty(len(codes), dtype=np.float32)
+        block_rows = max(1, _BLOCK_BYTES // (4 * max(len(scaled), 1)))
+        for start in range(0, len(codes), block_rows):
+            block = codes[start:start + block_rows]
+            scores[start:start + len(block)] = block.astype(np.float32) @ scaled
+        return scores
+
+
+class LocalVectorIndex:
+    """행 정규화된 임베딩 행렬에 대한 전수(brute-force) 코사인 유사도 검색.
+
+    Args:
+        documents: 청크 (행 순서)
+        embeddings: (n, d) float32 행렬. 행은 L2 정규화되어 있어야 한다 (memmap 가능)
+        version: 로드한 버전 이름 (통계용)
+        quantized: 주어지면 후보 검색에 사용할 int8 행렬 (embeddings는 재계산에만 사용)
+        rescore_k: quantized 사용 시 float32로 다시 계산할 후보 수 (k보다 작으면 k)
+    """
+
+    def __init__(
+        self,
+        documents: list[Document],
+        embeddings: np.ndarray,
+        version: str = "",
+        quantized: Int8Matrix | None = None,
+        rescore_k: int = DEFAULT_RESCORE_K,
+    ):
+        if len(documents) != len(embeddings):
+            raise ValueError(f"청크 수({len(documents)})와 임베딩 수({len(embeddings)})가 다릅니다")
+        self.documents = documents
+        self.embeddings = embeddings
+        self.version = version
+        self.quantized = quantized
+        self.rescore_k = rescore_k
+        self.metadata_index = MetadataIndex.build(documents)
+
+    @classmethod
+    def build(cls, documents: Sequence[Document], embeddings) -> "LocalVectorIndex":
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(documents), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return cls(list(documents), matrix / np.maximum(norms, 1e-12))
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def dimension(self) -> int:
+        return int(self.embeddings.shape[1]) if self.embeddings.ndim == 2 else 0
+
+    @property
+    def quantization(self) -> str:
+        return "none" if self.quantized is None else "int8"
+
+    @property
+    def nbytes(self) -> int:
+        """전수 검색이 훑는 행렬 크기 (memmap이면 상주 메모리가 아니라 매핑된 크기)."""
+        if self.quantized is not None:
+            return self.quantized.nbytes
+        return int(self.embeddings.nbytes)
+
+    def top_k(
+        self, query_embedding, k: int, rows: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """코사인 유사도 상위 k개 행 인덱스와 점수 (점수 내림차순).
+
+        rows가 주어지면 그 행(오름차순)만 점수를 계산한다 (메타데이터 사전 필터).
+        quantized가 있으면 int8 근사 점수 상위 rescore_k개 후보만 float32로 다시 계산하므로
+        반환 점수는 항상 정확한 코사인 유사도다. 후보가 rescore_k개 이하이면 바로 float32로 계산한다.
+        """
+        if k <= 0 or not len(self) or (rows is not None and not len(rows)):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        candidates = rows
+        rescore_k = max(k, self.rescore_k)
+        if self.quantized is not None and (rows is None or len(rows) > rescore_k):
+            top = _top_indices(self.quantized.scores(query, rows), rescore_k)
+            candidates = top if rows is None else rows[top]
+            # 메모리 맵에서 순차적으로 읽도록 행 번호 순으로 정렬한다
+            candidates.sort()
+        if candidates is None:
+            scores = self.embeddings @ query
+            top = _top_indices(scores, k)
+            return top, scores[top]
+        scores = self.embeddings[candidates] @ query
+        top = _top_indices(scores, k)
+        return candidates[top], scores[top]
+
+    def search(
+        self,
+        query_embedding,
+        k: int,
+        fetch_k: int = 0,
+        lambda_mult: float = 0.5,
+        metadata_filter: MetadataFilter | None = None,
+    ) -> list[tuple[Document, float]]:
+        """상위 k개 (문서, 코사인 유사도). fetch_k > k이면 fetch_k개 후보에서 MMR로 k개를 고른다.
+
+        metadata_filter가 있으면 사전 계산된 메타데이터 인덱스로 고른 행 안에서만 검색한다.
+        """
+        rows = self.metadata_index.rows(metadata_filter) if metadata_filter else None
+        rows, scores = self.top_k(query_embedding, max(k, fetch_k), rows)
+        if fetch_k > k and len(rows) > k:
+            selected = mmr_select(query_embedding, self.embeddings[rows], k, lambda_mult)
+            rows, scores = rows[selected], scores[selected]
+        return [(self._document(row, score), float(score)) for row, score in zip(rows, scores)]
+
+    def _document(self, row: int, score: float) -> Document:
+        # 캐싱된 원본의 메타데이터를 요청마다 바꾸지 않도록 복사본을 반환한다
+        doc = self.documents[row]
+        metadata = {**doc.metadata, "relevance": round(float(score), 4)}
+        return Document(page_content=doc.page_content, metadata=metadata, id=doc.id)
+
+    def save(self, directory: Path) -> str:
+        """새 버전 디렉토리에 저장한 뒤 CURRENT를 교체한다. 저장된 버전 이름을 반환한다."""
+        directory.mkdir(parents=True, exist_ok=True)
+        version = f"v{time.time_ns()}"
+        version_dir = directory / version
+        version_dir.mkdir()
+        embeddings = np.ascontiguousarray(self.embeddings, dtype=np.float32)
+        quantized = self.quantized or Int8Matrix.quantize(embeddings)
+        np.save(version_dir / EMBEDDINGS_FILE, embeddings)
+        np.save(version_dir / CODES_FILE, quantized.codes)
+        np.save(version_dir / SCALES_FILE, quantized.scales)
+        (version_dir / DOCUMENTS_FILE).write_text(
+            json.dumps(
+                [{"id": d.id, "page_content": d.page_content, "metadata": d.metadata} for d in self.documents],
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        tmp_path = directory / f"{CURRENT_FILE}.tmp"
+        tmp_path.write_text(version, encoding="utf-8")
+        os.replace(tmp_path, directory / CURRENT_FILE)
+        self.version = version
+        _remove_old_versions(directory, version)
+        return version
+
+    @classmethod
+    def load(
+        cls,
+        directory: Path,
+        quantization: str = "none",
+        rescore_k: int = DEFAULT_RESCORE_K,
+    ) -> "LocalVectorIndex":
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"지원하지 않는 양자화 방식: {quantization}")
+        version = (directory / CURRENT_FILE).read_text(encoding="utf-8").strip()
+        version_dir = directory / version
+        embeddings = np.load(version_dir / EMBEDDINGS_FILE, mmap_mode="r", allow_pickle=False)
+        quantized = None
+        if quantization == "int8":
+            if (version_dir / CODES_FILE).exists():
+                quantized = Int8Matrix(
+                    np.load(version_dir / CODES_FILE, mmap_mode="r", allow_pickle=False),
+                    np.load(version_dir / SCALES_FILE, allow_pickle=False),
+                )
+            else:
+                # int8 행렬 없이 저장된 이전 버전은 로드 시 양자화한다
+                quantized = Int8Matrix.quantize(embeddings)
+        documents = [
+            Document(**doc)
+            for doc in json.loads((version_dir / DOCUMENTS_FILE).read_text(encoding="utf-8"))
+        ]
+        return cls(documents, embeddings, version, quantized, rescore_k)
+
+
+def _remove_old_versions(directory: Path, current: str) -> None:
+    # 이름이 v{time_ns}이므로 길이 → 사전순 정렬이 생성 순서와 같다
+    versions = sorted(
+        (p for p in directory.iterdir() if p.is_dir() and p.name.startswith("v")),
+        key=lambda p: (len(p.name), p.name),
+    )
+    for path in versions[:-KEEP_VERSIONS]:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def index_dir(root: str, blog_id: str) -> Path:
+    return Path(root) / blog_id
+
+
+def save_vector_index(
+    root: str,
+    blog_id: str,
+    documents: Sequence[Document],
+    embeddings,
+) -> LocalVectorIndex:
+    """청크와 임베딩으로 로컬 벡터 인덱스를 만들어 새 버전으로 저장한다."""
+    index = LocalVectorIndex.build(documents, embeddings)
+    index.save(index_dir(root, blog_id))
+    return index
+
+
+def export_vector_index(manager: VectorStoreManager, root: str, blog_id: str) -> LocalVectorIndex:
+    """Chroma Collection에 저장된 임베딩을 로컬 벡터 인덱스로 내보낸다 (재인덱싱 직후 호출)."""
+    start = time.perf_counter()
+    documents, embeddings = manager.export_collection(blog_id)
+    index = save_vector_index(root, blog_id, documents, embeddings)
+    logger.info("로컬 벡터 인덱스 저장", extra={
+        "blog_id": blog_id, "documents": len(index), "dimension": index.dimension,
+        "version": index.version, "export_ms": int((time.perf_counter() - start) * 1000),
+    })
+    return index
+
+
+def remove_vector_index(root: str, blog_id: str) -> None:
+    """CURRENT 포인터를 삭제해 저장된 버전을 비활성화한다. 이후 load_vector_index()는 None (Chroma 사용).
+
+    버전 디렉토리는 이전 버전을 읽고 있을 수 있는 요청을 위해 남겨두고, 다음 저장 시 정리된다.
+    """
+    path = index_dir(root, blog_id) / CURRENT_FILE
+    path.unlink(missing_ok=True)
+    logger.info("로컬 벡터 인덱스 비활성화", extra={"blog_id": blog_id, "path": str(path)})
+
+
+def load_vector_index(
+    root: str,
+    blog_id: str,
+    quantization: str = "none",
+    rescore_k: int = DEFAULT_RESCORE_K,
+) -> LocalVectorIndex | None:
+    """저장된 로컬 벡터 인덱스를 로드한다. 없거나 손상되었으면 None (Chroma 사용)."""
+    directory = index_dir(root, blog_id)
+    if not (directory / CURRENT_FILE).exists():
+        return None
+    try:
+        return LocalVectorIndex.load(directory, quantization, rescore_k)
+    except (OSError, ValueError, TypeError):
+        logger.exception("로컬 벡터 인덱스 로드 실패", extra={"blog_id": blog_id, "path": str(directory)})
+        return None
+
+
+class LocalVectorRetriever(BaseRetriever):
+    """LocalVectorIndex로 검색하는 시맨틱 검색기.
+
+    쿼리 임베딩은 VectorStoreManager와 같은 (캐싱된) 임베딩 클라이언트를 사용한다.
+    fetch_k가 top_k보다 크면 MMR로 재정렬한다 (AsyncChromaRetriever와 같은 동작).
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: LocalVectorIndex
+    embeddings: Embeddings
+    top_k: int = 5
+    fetch_k: int = 0
+    lambda_mult: float = 0.5
+
+    def _search(self, embedding, metadata_filter: MetadataFilter | None) -> list[Document]:
+        return [
+            doc for doc, _ in self.index.search(
+                embedding, self.top_k, self.fetch_k, self.lambda_mult, metadata_filter
+            )
+        ]
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+        metadata_filter: MetadataFilter | None = None,
+    ) -> list[Document]:
+        return self._search(self.embeddings.embed_query(query), metadata_filter)
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: AsyncCallbackManagerForRetrieverRun,
+        metadata_filter: MetadataFilter | None = None,
+    ) -> list[Document]:
+        return self._search(await self.embeddings.aembed_query(query), metadata_filter)
+
+
+def create_local_retriever(
+    index: LocalVectorIndex,
+    embeddings: Embeddings,
+    top_k: int = 5,
+    fetch_k: int = 0,
+    lambda_mult: float = 0.5,
+) -> RetrieverLike:
+    """로컬 메모리 맵 벡터 인덱스 기반 시맨틱 검색기를 생성한다."""
+    return LocalVectorRetriever(
+        index=index, embeddings=embeddings, top_k=top_k, fetch_k=fetch_k, lambda_mult=lambda_mult,
+    )
@@ -0,0 +1,105 @@
+"""inspireme 명언 추천 fast path.
+
+"X에 관한 명언 추천해줘" 같은 요청은 검색된 명언/저자 문서를 템플릿으로 나열하면 충분하므로
+LLM 답변 생성을 생략한다 (응답 지연 = 검색 시간). 의도 판단은 로컬 키워드 휴리스틱만 사용한다.
+"""
+
+import re
+from collections.abc import Sequence
+from typing import Literal
+
+from langchain_core.documents import Document
+
+ResponseMode = Literal["generate", "recommend"]
+
+GENERATE: ResponseMode = "generate"
+RECOMMEND: ResponseMode = "recommend"
+
+# 추천 목록이면 충분한 요청
+_RECOMMEND_PATTERN = re.compile(
+    r"명언|글귀|좋은 말|한마디|격언|문구|\bquotes?\b|\bsayings?\b|\bproverbs?\b",
+    re.IGNORECASE,
+)
+# 설명이나 대화가 필요한 요청 (저자 소개, 의미 해석, 비교 등)
+_EXPLAIN_PATTERN = re.compile(
+    r"누구|누가|의미|뜻|해석|설명|왜|차이|비교|어떻게|"
+    r"\bwho\b|\bwhy\b|\bmeaning\b|\bmean\b|\bexplain\b|\bcompare\b|\bdifference\b",
+    re.IGNORECASE,
+)
+_HANGUL = re.compile(r"[가-힣]")
+
+MAX_RECOMMENDATIONS = 3
+_BIO_CHARS = 120
+
+_TEMPLATES = {
+    "ko": {"intro": "추천 명언입니다.", "authors": "관련 인물", "empty": "관련 명언을 찾지 못했습니다."},
+    "en": {"intro": "Here are some quotes for you.", "authors": "Related people",
+           "empty": "No related quotes were found."},
+}
+
+
+def is_recommendation_request(question: str) -> bool:
+    """명언 목록만으로 답할 수 있는 요청인지 키워드로 판단한다."""
+    return bool(_RECOMMEND_PATTERN.search(question)) and not _EXPLAIN_PATTERN.search(question)
+
+
+def decide_response_mode(
+    blog_id: str,
+    question: str,
+    chat_history: Sequence | None,
+    requested: ResponseMode | None = None,
+    auto: bool = True,
+) -> ResponseMode:
+    """응답 모드를 결정한다.
+
+    요청에 mode가 지정되면 그대로 따르고(inspireme만 recommend 가능), 아니면 auto=True일 때
+    히스토리가 없는 inspireme 추천 요청만 recommend로 보낸다 (후속 질문은 LLM이 맥락을 이어받아야 한다).
+    """
+    if blog_id != "inspireme":
+        return GENERATE
+    if requested is not None:
+        return requested
+    if auto and not chat_history and is_recommendation_request(question):
+        return RECOMMEND
+    return GENERATE
+
+
+def _quote_lines(document: Document, language: str) -> list[str]:
+    lines = [line for line in document.page_content.split("\n") if line.startswith('"')]
+    if language == "en":
+        english = [line for line in lines if not _HANGUL.search(line)]
+        return english[:1] or lines[:1]
+    return lines
+
+
+def _author_summary(document: Document, language: str) -> str:
+    lines = document.page_content.split("\n")
+    prefix = "Bio: " if language == "en" else "소개: "
+    bio = next((line[len(prefix):] for line in lines if line.startswith(prefix)), "")
+    if len(bio) > _BIO_CHARS:
+        bio = bio[:_BIO_CHARS].rstrip() + "…"
+    return f"{lines[0]} — {bio}" if bio else lines[0]
+
+
+def format_recommendations(
+    documents: Sequence[Document],
+    language: str | None = None,
+    limit: int = MAX_RECOMMENDATIONS,
+) -> str:
+    """검색된 명언/저자 문서를 순위대로 템플릿 답변으로 만든다."""
+    language = "en" if language == "en" else "ko"
+    template = _TEMPLATES[language]
+    quotes = [d for d in documents if d.metadata.get("type") == "quote"][:limit]
+    authors = [d for d in documents if d.metadata.get("type") == "author"][:limit]
+    if not quotes and not authors:
+        return template["empty"]
+
+    parts = [template["intro"]] if quotes else []
+    for rank, doc in enumerate(quotes, start=1):
+        text = "\n   ".join(_quote_lines(doc, language))
+        parts.append(f"{rank}. {text}\n   — {doc.metadata.get('author', 'Unknown')}")
+    if authors:
+        parts.append(f"{template['authors']}:\n" + "\n".join(
+            f"- {_author_summary(doc, language)}" for doc in authors
+        ))
+    return "\n\n".join(parts)
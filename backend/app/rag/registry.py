@@ -0,0 +1,257 @@
+import logging
+import threading
+from functools import lru_cache
+
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+
+from app.config import Settings, get_settings
+from app.core.http import HttpPool, get_http_pool
+from app.rag.chain import create_rag_chain
+from app.rag.bm25 import BM25Index, load_keyword_index
+from app.rag.context import get_token_counter
+from app.rag.embedder import CachedEmbeddings, create_embeddings
+from app.rag.history import HistoryManager
+from app.rag.local_index import LocalVectorIndex, create_local_retriever, load_vector_index
+from app.rag.retriever import create_async_retriever, create_hybrid_retriever
+from app.rag.router import ModelRouter
+from app.rag.vector_store import VectorStoreManager
+
+logger = logging.getLogger(__name__)
+
+ChainKey = tuple[str, str | None, str, int]
+
+
+class RagRegistry:
+    """프로세스 단위로 RAG 구성요소를 캐싱하는 레지스트리.
+
+    임베딩 클라이언트, VectorStoreManager(Chroma wrapper 포함), LLM 클라이언트,
+    대화 히스토리 관리자, RAG 체인을 한 번만 생성하고 요청 간에 재사용한다.
+    체인은 (blog_id, language, model, top_k) 키로 캐싱되며,
+    재인덱싱 시 invalidate()로 해당 blog_id의 항목을 폐기한다.
+    http_pool이 주어지면 OpenAI 클라이언트(LLM, 임베딩)는 모두 그 커넥션 풀을 공유한다.
+    """
+
+    def __init__(self, settings: Settings, http_pool: HttpPool | None = None):
+        self._settings = settings
+        self._http_pool = http_pool
+        self._lock = threading.Lock()
+        self._manager: VectorStoreManager | None = None
+        self._history_manager: HistoryManager | None = None
+        self._model_router: ModelRouter | None = None
+        self._keyword_indexes: dict[str, BM25Index | None] = {}
+        self._vector_indexes: dict[str, LocalVectorIndex | None] = {}
+        self._llms: dict[str, ChatOpenAI] = {}
+        self._chains: dict[ChainKey, Runnable] = {}
+        self._index_versions: dict[str, int] = {}
+
+    @property
+    def manager(self) -> VectorStoreManager:
+        """VectorStoreManager를 lazy 초기화한다."""
+        if self._manager is None:
+            with self._lock:
+                if self._manager is None:
+                    embeddings = create_embeddings(
+                        self._settings.embedding_model,
+                        cache_size=self._settings.embedding_cache_size,
+                        cache_documents=self._settings.embedding_cache_documents,
+                        **self._http_clients(),
+                    )
+                    self._manager = VectorStoreManager(
+                        self._settings.chroma_host, self._settings.chroma_port, embeddings,
+                        max_connections=self._settings.http_max_connections,
+                        keepalive_expiry=self._settings.http_keepalive_expiry_seconds,
+                    )
+        return self._manager
+
+    @property
+    def history_manager(self) -> HistoryManager:
+        """대화 히스토리 요약에 사용하는 HistoryManager를 lazy 초기화한다."""
+        if self._history_manager is None:
+            model = self._settings.openai_model
+            llm = self.get_llm(model)
+            with self._lock:
+                if self._history_manager is None:
+                    self._history_manager = HistoryManager(
+                        llm,
+                        get_token_counter(model),
+                        max_turns=self._settings.history_max_turns,
+                        token_budget=self._settings.history_token_budget,
+                        cache_size=self._settings.history_summary_cache_size,
+                    )
+        return self._history_manager
+
+    @property
+    def model_router(self) -> ModelRouter | None:
+        """model_routing_tiers가 설정된 경우 모든 체인이 공유하는 ModelRouter를 lazy 초기화한다."""
+        tiers = self._settings.model_routing_tiers
+        if tiers and self._model_router is None:
+            llms = [(model, self.get_llm(model)) for model in tiers]
+            with self._lock:
+                if self._model_router is None:
+                    self._model_router = ModelRouter(
+                        llms,
+                        question_tokens=self._settings.routing_question_tokens,
+                        context_tokens=self._settings.routing_context_tokens,
+                        history_messages=self._settings.routing_history_messages,
+                    )
+        return self._model_router
+
+    def keyword_index(self, blog_id: str) -> BM25Index | None:
+        """blog_id의 BM25 인덱스를 반환한다 (디스크에서 한 번만 로드, 없으면 None)."""
+        if blog_id not in self._keyword_indexes:
+            index = load_keyword_index(self._settings.keyword_index_dir, blog_id)
+            with self._lock:
+                self._keyword_indexes.setdefault(blog_id, index)
+            if index is None:
+                logger.warning("BM25 인덱스 없음 - 시맨틱 검색만 사용", extra={"blog_id": blog_id})
+        return self._keyword_indexes[blog_id]
+
+    def load_keyword_indexes(self) -> None:
+        """서버 시작 시 모든 blog_id의 BM25 인덱스를 미리 로드한다."""
+        for blog_id in self._settings.blog_collections:
+            self.keyword_index(blog_id)
+
+    def vector_index(self, blog_id: str) -> LocalVectorIndex | None:
+        """blog_id의 로컬 벡터 인덱스를 반환한다 (디스크에서 한 번만 메모리 맵, 없으면 None)."""
+        if blog_id not in self._vector_indexes:
+            index = load_vector_index(
+                self._settings.local_vector_dir, blog_id,
+                quantization=self._settings.local_vector_quantization,
+                rescore_k=self._settings.local_vector_rescore_k,
+            )
+            with self._lock:
+                self._vector_indexes.setdefault(blog_id, index)
+            if index is None:
+                logger.warning("로컬 벡터 인덱스 없음 - Chroma 사용", extra={"blog_id": blog_id})
+        return self._vector_indexes[blog_id]
+
+    def local_vector_index(self, blog_id: str) -> LocalVectorIndex | None:
+        """vector_backend가 "local"일 때 사용할 로컬 벡터 인덱스 (아니면 None)."""
+        if self._settings.vector_backend != "local":
+            return None
+        return self.vector_index(blog_id)
+
+    def load_vector_indexes(self) -> None:
+        """서버 시작 시 모든 blog_id의 로컬 벡터 인덱스를 미리 로드한다."""
+        for blog_id in self._settings.blog_collections:
+            self.vector_index(blog_id)
+
+    def _http_clients(self) -> dict:
+        if self._http_pool is None:
+            return {}
+        return {
+            "http_client": self._http_pool.client,
+            "http_async_client": self._http_pool.async_client,
+        }
+
+    def get_llm(self, model: str) -> ChatOpenAI:
+        """모델별 LLM 클라이언트를 반환한다."""
+        llm = self._llms.get(model)
+        if llm is None:
+            with self._lock:
+                llm = self._llms.get(model)
+                if llm is None:
+                    llm = ChatOpenAI(model=model, temperature=0, **self._http_clients())
+                    self._llms[model] = llm
+        return llm
+
+    def get_chain(
+        self,
+        blog_id: str,
+        language: str | None = None,
+        model: str | None = None,
+        top_k: int | None = None,
+    ) -> Runnable:
+        """(blog_id, language, model, top_k)에 해당하는 RAG 체인을 반환한다."""
+        model = model or self._settings.openai_model
+        top_k = top_k or self._settings.top_k
+        key: ChainKey = (blog_id, language, model, top_k)
+
+        chain = self._chains.get(key)
+        if chain is not None:
+            return chain
+
+        fetch_k = self._settings.mmr_fetch_k if self._settings.mmr_enabled else 0
+        vector_index = self.local_vector_index(blog_id)
+        if vector_index is not None:
+            retriever = create_local_retriever(
+                vector_index, self.manager.embeddings, top_k,
+                fetch_k=fetch_k, lambda_mult=self._settings.mmr_lambda,
+            )
+        else:
+            retriever = create_async_retriever(
+                self.manager, blog_id, top_k, fetch_k=fetch_k, lambda_mult=self._settings.mmr_lambda,
+            )
+        keyword_index = self.keyword_index(blog_id) if self._settings.use_hybrid_search else None
+        if keyword_index is not None:
+            retriever = create_hybrid_retriever(
+                retriever, keyword_index, top_k,
+                keyword_k=self._settings.hybrid_keyword_k,
+                rrf_k=self._settings.hybrid_rrf_k,
+                semantic_weight=self._settings.hybrid_semantic_weight,
+                keyword_weight=self._settings.hybrid_keyword_weight,
+            )
+        llm = self.get_llm(model)
+        rewrite_llm = self.get_llm(self._settings.rewrite_model or model)
+        model_router = self.model_router
+        with self._lock:
+            chain = self._chains.get(key)
+            if chain is None:
+                chain = create_rag_chain(
+                    None, model, top_k, retriever=retriever,
+                    blog_id=blog_id, language=language, llm=llm,
+                    context_token_budget=self._settings.context_token_budget,
+                    compress_context=self._settings.context_compression_enabled,
+                    rewrite_llm=rewrite_llm, model_router=model_router,
+                )
+                self._chains[key] = chain
+                logger.info("RAG 체인 생성", extra={
+                    "blog_id": blog_id, "language": language, "model": model, "top_k": top_k,
+                })
+        return chain
+
+    def index_version(self, blog_id: str) -> int:
+        """blog_id 인덱스 버전. invalidate()마다 1씩 증가하며 응답 캐시 키에 사용된다."""
+        return self._index_versions.get(blog_id, 0)
+
+    def invalidate(self, blog_id: str) -> None:
+        """blog_id에 해당하는 Chroma wrapper와 체인을 폐기하고 인덱스 버전을 올린다 (재인덱싱 후 호출)."""
+        with self._lock:
+            self._index_versions[blog_id] = self._index_versions.get(blog_id, 0) + 1
+            for key in [k for k in self._chains if k[0] == blog_id]:
+                del self._chains[key]
+            # 재인덱싱으로 새로 저장된 BM25 인덱스를 다음 조회 시 다시 로드한다
+            self._keyword_indexes.pop(blog_id, None)
+            self._vector_indexes.pop(blog_id, None)
+            if self._manager is not None:
+                self._manager.evict_store(blog_id)
+        logger.info("RAG 레지스트리 무효화", extra={"blog_id": blog_id})
+
+    def stats(self) -> dict:
+        """캐싱된 구성요소 현황을 반환한다."""
+        embedding_cache = None
+        if self._manager is not None and isinstance(self._manager.embeddings, CachedEmbeddings):
+            embedding_cache = self._manager.embeddings.stats()
+        return {
+            "chains": len(self._chains),
+            "llms": len(self._llms),
+            "embedding_cache": embedding_cache,
+            "history_summaries": self._history_manager.stats() if self._history_manager else None,
+            "model_routing": self._model_router.stats() if self._model_router else None,
+            "keyword_indexes": {
+                blog_id: len(index) for blog_id, index in self._keyword_indexes.items() if index
+            },
+            "vector_indexes": {
+                blog_id: {
+                    "documents": len(index), "version": index.version,
+                    "quantization": index.quantization, "matrix_bytes": index.nbytes,
+                }
+                for blog_id, index in self._vector_indexes.items() if index
+            },
+        }
+
+
+@lru_cache
+def get_rag_registry() -> RagRegistry:
+    return RagRegistry(get_settings(), get_http_pool())
@@ -1,8 +1,161 @@
+from collections.abc import Sequence
+
+import numpy as np
 from langchain_chroma import Chroma
-from langchain_classic.retrievers import MergerRetriever
-from langchain_community.retrievers import BM25Retriever
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
 from langchain_core.documents import Document
-from langchain_core.retrievers import RetrieverLike
+from langchain_core.retrievers import BaseRetriever, RetrieverLike
+from pydantic import ConfigDict
+
+from app.rag.bm25 import BM25Index
+from app.rag.filters import MetadataFilter
+from app.rag.vector_store import VectorStoreManager
+
+# RRF 순위 상수. 클수록 하위 순위의 기여가 상위 순위와 비슷해진다
+DEFAULT_RRF_K = 60
+
+
+def query_results_to_documents(results: dict) -> list[Document]:
+    """Chroma query 결과(첫 번째 쿼리)를 Document 리스트로 변환한다."""
+    return [
+        Document(page_content=content, metadata=metadata or {}, id=doc_id)
+        for content, metadata, doc_id in zip(
+            results["documents"][0],
+            results["metadatas"][0],
+            results["ids"][0],
+        )
+        if content is not None
+    ]
+
+
+def cosine_similarities(query_embedding, candidate_embeddings) -> np.ndarray:
+    """쿼리와 각 후보 임베딩의 코사인 유사도 (n,)."""
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    if candidates.ndim != 2 or len(candidates) == 0:
+        return np.zeros(0, dtype=np.float32)
+    query = np.asarray(query_embedding, dtype=np.float32)
+    norms = np.linalg.norm(candidates, axis=1) * max(float(np.linalg.norm(query)), 1e-12)
+    return (candidates @ query) / np.maximum(norms, 1e-12)
+
+
+def mmr_select(
+    query_embedding,
+    candidate_embeddings,
+    k: int,
+    lambda_mult: float = 0.5,
+) -> list[int]:
+    """Maximal Marginal Relevance로 다양성을 고려해 k개 후보의 인덱스를 선택한다.
+
+    후보 간 코사인 유사도 행렬을 한 번에 계산하고, 선택된 후보와의 최대 유사도를
+    벡터로 갱신하므로 선택 비용은 O(n·k)다.
+
+    Args:
+        query_embedding: 쿼리 임베딩 (d,)
+        candidate_embeddings: 후보 임베딩 (n, d), 관련도 순
+        k: 선택할 개수
+        lambda_mult: 1이면 관련도만, 0이면 다양성만 고려
+    """
+    candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+    if candidates.ndim != 2 or len(candidates) == 0 or k <= 0:
+        return []
+    query = np.asarray(query_embedding, dtype=np.float32)
+
+    candidates = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < min(k, len(candidates)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+    return selected
+
+
+class AsyncChromaRetriever(BaseRetriever):
+    """ChromaDB 비동기 HTTP 클라이언트로 검색하는 시맨틱 검색기.
+
+    ainvoke 경로에서는 임베딩(aembed_query)과 Collection 조회를 모두 await하므로
+    이벤트 루프를 블로킹하지 않는다. invoke 경로는 동기 Chroma wrapper를 사용한다.
+    fetch_k가 top_k보다 크면 fetch_k개 후보를 저장된 임베딩과 함께 가져와
+    MMR로 top_k개를 고른다 (추가 임베딩 호출 없음).
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    manager: VectorStoreManager
+    blog_id: str
+    top_k: int = 5
+    fetch_k: int = 0
+    lambda_mult: float = 0.5
+
+    @property
+    def use_mmr(self) -> bool:
+        return self.fetch_k > self.top_k
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+        metadata_filter: MetadataFilter | None = None,
+    ) -> list[Document]:
+        store = self.manager.get_store(self.blog_id)
+        where = metadata_filter.to_chroma_where() if metadata_filter else None
+        if self.use_mmr:
+            return store.max_marginal_relevance_search(
+                query, k=self.top_k, fetch_k=self.fetch_k, lambda_mult=self.lambda_mult, filter=where
+            )
+        return store.similarity_search(query, k=self.top_k, filter=where)
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: AsyncCallbackManagerForRetrieverRun,
+        metadata_filter: MetadataFilter | None = None,
+    ) -> list[Document]:
+        embedding = await self.manager.embeddings.aembed_query(query)
+        collection = await self.manager.aget_collection(self.blog_id)
+        # 메타데이터 필터는 Chroma where 절로 서버에서 사전 필터링한다
+        where = metadata_filter.to_chroma_where() if metadata_filter else None
+        if not self.use_mmr:
+            results = await collection.query(
+                query_embeddings=[embedding],
+                n_results=self.top_k,
+                where=where,
+                include=["documents", "metadatas"],
+            )
+            return query_results_to_documents(results)
+
+        results = await collection.query(
+            query_embeddings=[embedding],
+            n_results=self.fetch_k,
+            where=where,
+            include=["documents", "metadatas", "embeddings"],
+        )
+        documents = query_results_to_documents(results)
+        embeddings = [
+            e for content, e in zip(results["documents"][0], results["embeddings"][0])
+            if content is not None
+        ]
+        selected = mmr_select(embedding, embeddings, self.top_k, self.lambda_mult)
+        relevance = cosine_similarities(embedding, [embeddings[i] for i in selected])
+        # 쿼리-청크 유사도는 컨텍스트 압축 단계에서 청크 가중치로 사용한다
+        for i, score in zip(selected, relevance):
+            documents[i].metadata["relevance"] = round(float(score), 4)
+        return [documents[i] for i in selected]
 
 
 def create_retriever(vector_store: Chroma, top_k: int = 5) -> RetrieverLike:
@@ -10,20 +163,101 @@ def create_retriever(vector_store: Chroma, top_k: int = 5) -> RetrieverLike:
     return vector_store.as_retriever(search_kwargs={"k": top_k})
 
 
-def create_hybrid_retriever(
-    vector_store: Chroma,
-    documents: list[Document],
+def create_async_retriever(
+    manager: VectorStoreManager,
+    blog_id: str,
     top_k: int = 5,
+    fetch_k: int = 0,
+    lambda_mult: float = 0.5,
 ) -> RetrieverLike:
-    """Hybrid Search 검색기를 생성한다 (BM25 키워드 + 시맨틱 벡터 검색).
+    """비동기 Chroma 클라이언트 기반 시맨틱 검색기를 생성한다.
+
+    fetch_k > top_k이면 MMR로 다양성을 고려해 재정렬한다.
+    """
+    return AsyncChromaRetriever(
+        manager=manager, blog_id=blog_id, top_k=top_k, fetch_k=fetch_k, lambda_mult=lambda_mult,
+    )
+
+
+def retriever_kwargs(metadata_filter: MetadataFilter | None) -> dict:
+    """검색기 invoke 인자. 필터가 없으면 넘기지 않는다 (필터를 모르는 RetrieverLike 호환)."""
+    return {"metadata_filter": metadata_filter} if metadata_filter else {}
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[Document]],
+    weights: Sequence[float],
+    k: int = DEFAULT_RRF_K,
+) -> list[tuple[Document, float]]:
+    """여러 순위 목록을 Σ weight / (k + rank)로 융합한다.
 
-    MergerRetriever로 두 검색기 결과를 병합한다.
+    같은 청크는 본문으로 식별하며, 먼저 나온 목록의 Document(메타데이터 포함)를 유지한다.
     """
-    # 시맨틱 검색기
-    semantic_retriever = vector_store.as_retriever(search_kwargs={"k": top_k})
+    fused: dict[str, tuple[Document, float]] = {}
+    for documents, weight in zip(ranked_lists, weights):
+        for rank, doc in enumerate(documents, start=1):
+            key = doc.page_content
+            first, score = fused.get(key, (doc, 0.0))
+            fused[key] = (first, score + weight / (k + rank))
+    return sorted(fused.values(), key=lambda item: item[1], reverse=True)
 
-    # BM25 키워드 검색기
-    bm25_retriever = BM25Retriever.from_documents(documents, k=top_k)
 
-    # 두 검색기 결과 병합
-    return MergerRetriever(retrievers=[semantic_retriever, bm25_retriever])
+class HybridRetriever(BaseRetriever):
+    """시맨틱 검색기 + 사전 구축된 BM25 인덱스를 RRF로 융합하는 검색기."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    semantic: RetrieverLike
+    keyword_index: BM25Index
+    top_k: int = 5
+    keyword_k: int = 20
+    rrf_k: int = DEFAULT_RRF_K
+    semantic_weight: float = 1.0
+    keyword_weight: float = 1.0
+
+    def _fuse(
+        self, query: str, semantic_docs: list[Document], metadata_filter: MetadataFilter | None
+    ) -> list[Document]:
+        keyword_docs = [
+            doc for doc, _ in self.keyword_index.search(query, self.keyword_k, metadata_filter)
+        ]
+        fused = reciprocal_rank_fusion(
+            [semantic_docs, keyword_docs], [self.semantic_weight, self.keyword_weight], self.rrf_k
+        )
+        return [doc for doc, _ in fused[:self.top_k]]
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+        metadata_filter: MetadataFilter | None = None,
+    ) -> list[Document]:
+        semantic_docs = self.semantic.invoke(query, **retriever_kwargs(metadata_filter))
+        return self._fuse(query, semantic_docs, metadata_filter)
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: AsyncCallbackManagerForRetrieverRun,
+        metadata_filter: MetadataFilter | None = None,
+    ) -> list[Document]:
+        semantic_docs = await self.semantic.ainvoke(query, **retriever_kwargs(metadata_filter))
+        return self._fuse(query, semantic_docs, metadata_filter)
+
+
+def create_hybrid_retriever(
+    semantic: RetrieverLike,
+    keyword_index: BM25Index,
+    top_k: int = 5,
+    keyword_k: int = 20,
+    rrf_k: int = DEFAULT_RRF_K,
+    semantic_weight: float = 1.0,
+    keyword_weight: float = 1.0,
+) -> RetrieverLike:
+    """Hybrid Search 검색기를 생성한다 (BM25 키워드 + 시맨틱 벡터 검색, RRF 융합)."""
+    return HybridRetriever(
+        semantic=semantic, keyword_index=keyword_index, top_k=top_k, keyword_k=keyword_k,
+        rrf_k=rrf_k, semantic_weight=semantic_weight, keyword_weight=keyword_weight,
+    )
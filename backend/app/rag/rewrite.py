@@ -0,0 +1,67 @@
+"""질문 재작성(contextualize) 정책.
+
+대화 히스토리가 있어도 질문이 그 자체로 완결적이면 재작성 LLM 호출을 생략한다.
+판단은 로컬 휴리스틱(지시어/접속어, 질문 길이)만 사용하므로 비용이 거의 없다.
+"""
+
+import re
+from collections.abc import Sequence
+from typing import Literal
+
+RewritePath = Literal["no_history", "self_contained", "rewritten"]
+
+NO_HISTORY: RewritePath = "no_history"
+SELF_CONTAINED: RewritePath = "self_contained"
+REWRITTEN: RewritePath = "rewritten"
+
+# 이전 대화를 가리키는 한국어 표현 (조사가 붙으므로 어절 접두어로 비교)
+_KO_REFERENCE_PREFIXES = (
+    "그거", "그것", "그건", "그게", "그걸", "그런", "그렇", "그럼", "그러면", "그래서", "그리고",
+    "이거", "이것", "이건", "이게", "이걸", "이런", "이렇",
+    "저거", "저것", "저건",
+    "위의", "위에서", "앞의", "앞에서", "방금", "아까", "다른", "자세히", "예시", "예제",
+)
+_KO_REFERENCE_WORDS = {"그", "이", "저", "더", "또"}
+
+_EN_REFERENCE_PATTERN = re.compile(
+    r"\b(it|its|that|this|these|those|they|them|their|he|she|his|her|"
+    r"more|also|else|above|previous|same|example|what about|how about)\b",
+    re.IGNORECASE,
+)
+
+_TOKEN_PATTERN = re.compile(r"[^\s?!.,]+")
+
+# 이보다 짧은 질문("왜요?", "예시는?")은 히스토리 없이 의미가 불분명하다고 본다
+MIN_SELF_CONTAINED_LENGTH = 6
+
+
+def is_self_contained(question: str) -> bool:
+    """질문이 대화 히스토리 없이도 이해 가능한지 휴리스틱으로 판단한다."""
+    stripped = question.strip()
+    if len(stripped) < MIN_SELF_CONTAINED_LENGTH:
+        return False
+    if _EN_REFERENCE_PATTERN.search(stripped):
+        return False
+    for token in _TOKEN_PATTERN.findall(stripped):
+        if token in _KO_REFERENCE_WORDS or token.startswith(_KO_REFERENCE_PREFIXES):
+            return False
+    return True
+
+
+def decide_rewrite(
+    question: str,
+    chat_history: Sequence | None,
+    policy: str = "auto",
+) -> RewritePath:
+    """질문 재작성 경로를 결정한다.
+
+    Args:
+        question: 사용자 질문
+        chat_history: 대화 히스토리
+        policy: "auto"(휴리스틱 적용) 또는 "always"(히스토리가 있으면 항상 재작성)
+    """
+    if not chat_history:
+        return NO_HISTORY
+    if policy == "auto" and is_self_contained(question):
+        return SELF_CONTAINED
+    return REWRITTEN
@@ -0,0 +1,118 @@
+"""답변 생성 모델 라우팅.
+
+질문 길이, 패킹된 컨텍스트 크기, 히스토리 깊이 같은 로컬 신호만으로 답변 모델 티어를 고른다.
+임계값을 넘는 신호 수만큼 상위(비싼) 티어로 올라가며, 티어별 호출 수와 지연 시간을 기록한다.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableGenerator
+
+from app.rag.context import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RoutingSignals:
+    question_tokens: int
+    context_tokens: int
+    history_messages: int
+
+
+class ModelRouter:
+    """신호 기반 모델 티어 선택기.
+
+    Args:
+        tiers: (모델 이름, LLM) 목록. 저렴한 모델부터 순서대로
+        question_tokens: 질문 토큰 수 임계값
+        context_tokens: 패킹된 컨텍스트 토큰 수 임계값
+        history_messages: 히스토리 메시지 수 임계값
+    """
+
+    def __init__(
+        self,
+        tiers: Sequence[tuple[str, BaseChatModel]],
+        question_tokens: int = 40,
+        context_tokens: int = 2500,
+        history_messages: int = 4,
+    ):
+        if not tiers:
+            raise ValueError("모델 티어가 하나 이상 필요합니다")
+        self.tiers = list(tiers)
+        self.question_tokens = question_tokens
+        self.context_tokens = context_tokens
+        self.history_messages = history_messages
+        self._lock = threading.Lock()
+        self._calls = [0] * len(self.tiers)
+        self._latency = [0.0] * len(self.tiers)
+
+    @property
+    def models(self) -> list[str]:
+        return [model for model, _ in self.tiers]
+
+    @property
+    def llms(self) -> list[BaseChatModel]:
+        return [llm for _, llm in self.tiers]
+
+    def signals(self, chain_input: dict, count_tokens: TokenCounter) -> RoutingSignals:
+        return RoutingSignals(
+            question_tokens=count_tokens(chain_input["input"]),
+            context_tokens=sum(count_tokens(d.page_content) for d in chain_input.get("context", [])),
+            history_messages=len(chain_input.get("chat_history") or []),
+        )
+
+    def select(self, signals: RoutingSignals) -> int:
+        """임계값을 넘은 신호 수를 티어 인덱스로 사용한다 (최상위 티어에서 멈춘다)."""
+        exceeded = sum([
+            signals.question_tokens > self.question_tokens,
+            signals.context_tokens > self.context_tokens,
+            signals.history_messages >= self.history_messages,
+        ])
+        return min(exceeded, len(self.tiers) - 1)
+
+    def record(self, tier: int, seconds: float) -> None:
+        with self._lock:
+            self._calls[tier] += 1
+            self._latency[tier] += seconds
+
+    def timed(self, tier: int, runnable: Runnable) -> Runnable:
+        """runnable 실행(스트리밍 포함) 시간을 tier의 지연 시간으로 기록한다."""
+        model = self.tiers[tier][0]
+
+        def finish(start: float) -> None:
+            elapsed = time.perf_counter() - start
+            self.record(tier, elapsed)
+            logger.info("답변 생성 완료", extra={
+                "tier": tier, "model": model, "latency_ms": int(elapsed * 1000),
+            })
+
+        def transform(inputs: Iterator[dict], config: RunnableConfig) -> Iterator:
+            start = time.perf_counter()
+            for chain_input in inputs:
+                yield from runnable.stream(chain_input, config)
+            finish(start)
+
+        async def atransform(inputs: AsyncIterator[dict], config: RunnableConfig) -> AsyncIterator:
+            start = time.perf_counter()
+            async for chain_input in inputs:
+                async for chunk in runnable.astream(chain_input, config):
+                    yield chunk
+            finish(start)
+
+        return RunnableGenerator(transform, atransform, name=f"answer_tier_{tier}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                model: {
+                    "calls": calls,
+                    "avg_latency_ms": int(latency / calls * 1000) if calls else 0,
+                }
+                for (model, _), calls, latency in zip(self.tiers, self._calls, self._latency)
+            }
@@ -0,0 +1,125 @@
+"""LLM 없이 검색기만 실행하는 게시글 검색 (/search).
+
+쿼리 임베딩은 RAG 체인과 같은 CachedEmbeddings를 사용하므로 입력 중 반복되는 질의는 캐시 히트가 된다.
+청크 단위 결과를 url별로 묶어 게시글 단위로 순위를 매긴다.
+로컬 벡터 인덱스를 넘기면 Chroma 대신 그 인덱스로 검색한다 (점수는 같은 코사인 유사도).
+BM25 인덱스를 넘기면 키워드 검색 결과와 RRF로 융합하며, 이때 점수는 코사인 유사도 대신 RRF 점수다.
+metadata_filter는 세 검색 경로 모두에 사전 필터로 적용된다.
+"""
+
+from dataclasses import dataclass
+
+from chromadb.api.models.AsyncCollection import AsyncCollection
+from langchain_core.documents import Document
+
+from app.rag.bm25 import BM25Index
+from app.rag.filters import MetadataFilter
+from app.rag.local_index import LocalVectorIndex
+from app.rag.retriever import DEFAULT_RRF_K, query_results_to_documents, reciprocal_rank_fusion
+from app.rag.vector_store import VectorStoreManager
+
+SNIPPET_CHARS = 200
+
+
+@dataclass
+class PostHit:
+    url: str
+    title: str
+    score: float  # 게시글 청크 중 최고 유사도
+    snippet: str  # 최고 유사도 청크의 앞부분
+    chunks: int  # 검색된 청크 수
+
+
+def collection_space(collection: AsyncCollection) -> str:
+    """Collection의 거리 함수 ("l2" | "cosine" | "ip")."""
+    configuration = getattr(collection, "configuration_json", None) or {}
+    space = (configuration.get("hnsw") or {}).get("space")
+    return space or (collection.metadata or {}).get("hnsw:space", "l2")
+
+
+def distance_to_similarity(distance: float, space: str) -> float:
+    """Chroma 거리를 코사인 유사도로 변환한다 (정규화된 임베딩 기준)."""
+    if space == "l2":
+        # Chroma의 l2는 제곱 거리: ||a - b||² = 2 - 2cos
+        return 1.0 - distance / 2
+    return 1.0 - distance
+
+
+def snippet(text: str, max_chars: int = SNIPPET_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+
+
+def group_by_post(documents: list[Document], scores: list[float], limit: int) -> list[PostHit]:
+    """청크를 url별로 묶어 최고 점수 순으로 최대 limit개 게시글을 반환한다."""
+    posts: dict[str, PostHit] = {}
+    for doc, score in zip(documents, scores):
+        url = doc.metadata.get("url", "")
+        if not url:
+            continue
+        post = posts.get(url)
+        if post is None:
+            posts[url] = PostHit(
+                url=url,
+                title=doc.metadata.get("title", ""),
+                score=round(score, 6),
+                snippet=snippet(doc.page_content),
+                chunks=1,
+            )
+            continue
+        post.chunks += 1
+        if score > post.score:
+            post.score = round(score, 6)
+            post.snippet = snippet(doc.page_content)
+    return sorted(posts.values(), key=lambda p: p.score, reverse=True)[:limit]
+
+
+async def search_posts(
+    manager: VectorStoreManager,
+    blog_id: str,
+    query: str,
+    limit: int = 5,
+    fetch_k: int = 20,
+    keyword_index: BM25Index | None = None,
+    rrf_k: int = DEFAULT_RRF_K,
+    weights: tuple[float, float] = (1.0, 1.0),
+    vector_index: LocalVectorIndex | None = None,
+    metadata_filter: MetadataFilter | None = None,
+) -> list[PostHit]:
+    """query와 유사한 청크 fetch_k개를 검색해 게시글 단위로 묶는다."""
+    embedding = await manager.embeddings.aembed_query(query)
+    if vector_index is not None:
+        hits = vector_index.search(embedding, fetch_k, metadata_filter=metadata_filter)
+        documents = [doc for doc, _ in hits]
+        scores = [score for _, score in hits]
+    else:
+        documents, scores = await _chroma_search(manager, blog_id, embedding, fetch_k, metadata_filter)
+    if keyword_index is not None:
+        keyword_docs = [doc for doc, _ in keyword_index.search(query, fetch_k, metadata_filter)]
+        fused = reciprocal_rank_fusion([documents, keyword_docs], weights, rrf_k)
+        documents = [doc for doc, _ in fused]
+        scores = [score for _, score in fused]
+    return group_by_post(documents, scores, limit)
+
+
+async def _chroma_search(
+    manager: VectorStoreManager,
+    blog_id: str,
+    embedding: list[float],
+    fetch_k: int,
+    metadata_filter: MetadataFilter | None = None,
+) -> tuple[list[Document], list[float]]:
+    collection = await manager.aget_collection(blog_id)
+    results = await collection.query(
+        query_embeddings=[embedding],
+        n_results=fetch_k,
+        where=metadata_filter.to_chroma_where() if metadata_filter else None,
+        include=["documents", "metadatas", "distances"],
+    )
+    space = collection_space(collection)
+    scores = [
+        distance_to_similarity(distance, space)
+        for content, distance in zip(results["documents"][0], results["distances"][0])
+        if content is not None
+    ]
+    return query_results_to_documents(results), scores
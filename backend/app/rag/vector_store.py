@@ -1,36 +1,88 @@
 import logging
 
 import chromadb
+from chromadb.api import AsyncClientAPI
+from chromadb.api.models.AsyncCollection import AsyncCollection
+from chromadb.config import Settings as ChromaSettings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.embeddings import Embeddings
 
 logger = logging.getLogger(__name__)
 
 
 class VectorStoreManager:
-    """ChromaDB 기반 벡터 저장소 관리자. blog_id별 Collection을 분리 관리한다."""
+    """ChromaDB 기반 벡터 저장소 관리자. blog_id별 Collection을 분리 관리한다.
 
-    def __init__(self, host: str, port: int, embeddings: OpenAIEmbeddings):
+    Chroma 클라이언트는 외부 httpx 클라이언트를 주입받지 못하므로,
+    max_connections/keepalive_expiry를 넘기면 Chroma 클라이언트 설정으로 같은 풀 한도를 적용한다.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        embeddings: Embeddings,
+        max_connections: int | None = None,
+        keepalive_expiry: float | None = None,
+    ):
         self._host = host
         self._port = port
         self.embeddings = embeddings
+        self._chroma_settings = ChromaSettings(
+            chroma_http_max_connections=max_connections,
+            chroma_http_keepalive_secs=keepalive_expiry,
+        )
         self._client: chromadb.HttpClient | None = None
+        self._stores: dict[str, Chroma] = {}
+        self._async_client: AsyncClientAPI | None = None
+        self._async_collections: dict[str, AsyncCollection] = {}
 
     @property
     def client(self) -> chromadb.HttpClient:
         """ChromaDB 클라이언트를 lazy 초기화한다."""
         if self._client is None:
-            self._client = chromadb.HttpClient(host=self._host, port=self._port)
+            self._client = chromadb.HttpClient(
+                host=self._host, port=self._port, settings=self._chroma_settings
+            )
         return self._client
 
+    async def get_async_client(self) -> AsyncClientAPI:
+        """ChromaDB 비동기 클라이언트를 lazy 초기화한다."""
+        if self._async_client is None:
+            self._async_client = await chromadb.AsyncHttpClient(
+                host=self._host, port=self._port, settings=self._chroma_settings
+            )
+        return self._async_client
+
+    async def aget_collection(self, blog_id: str) -> AsyncCollection:
+        """blog_id에 해당하는 Collection을 비동기 클라이언트로 조회한다 (blog_id별 캐싱)."""
+        collection = self._async_collections.get(blog_id)
+        if collection is None:
+            client = await self.get_async_client()
+            collection = await client.get_or_create_collection(name=blog_id)
+            self._async_collections[blog_id] = collection
+        return collection
+
     def get_store(self, blog_id: str) -> Chroma:
-        """blog_id에 해당하는 Collection을 Chroma wrapper로 반환한다."""
-        return Chroma(
-            client=self.client,
-            collection_name=blog_id,
-            embedding_function=self.embeddings,
-        )
+        """blog_id에 해당하는 Collection을 Chroma wrapper로 반환한다.
+
+        wrapper 생성 시 get_or_create_collection 호출이 발생하므로 blog_id별로 캐싱한다.
+        """
+        store = self._stores.get(blog_id)
+        if store is None:
+            store = Chroma(
+                client=self.client,
+                collection_name=blog_id,
+                embedding_function=self.embeddings,
+            )
+            self._stores[blog_id] = store
+        return store
+
+    def evict_store(self, blog_id: str) -> None:
+        """캐싱된 Chroma wrapper와 비동기 Collection 핸들을 제거한다. 다음 조회 시 새로 생성된다."""
+        self._stores.pop(blog_id, None)
+        self._async_collections.pop(blog_id, None)
 
     def index_documents(self, blog_id: str, documents: list[Document]) -> int:
         """문서를 해당 Collection에 인덱싱한다. 인덱싱된 청크 수를 반환한다."""
@@ -40,11 +92,34 @@ class VectorStoreManager:
 
     def delete_collection(self, blog_id: str) -> None:
         """Collection을 삭제한다 (재인덱싱 시 사용)."""
+        # 삭제된 Collection을 가리키는 wrapper가 재사용되지 않도록 먼저 제거
+        self.evict_store(blog_id)
         try:
             self.client.delete_collection(name=blog_id)
         except Exception:
             logger.debug("Collection 삭제 스킵 (존재하지 않음)", extra={"blog_id": blog_id})
 
+    def export_collection(
+        self, blog_id: str, batch_size: int = 1000
+    ) -> tuple[list[Document], list[list[float]]]:
+        """Collection의 모든 청크와 저장된 임베딩을 페이지 단위로 읽어 반환한다."""
+        collection = self.client.get_collection(name=blog_id)
+        documents: list[Document] = []
+        embeddings: list[list[float]] = []
+        offset = 0
+        while True:
+            batch = collection.get(
+                limit=batch_size, offset=offset, include=["documents", "metadatas", "embeddings"]
+            )
+            for doc_id, content, metadata, embedding in zip(
+                batch["ids"], batch["documents"], batch["metadatas"], batch["embeddings"]
+            ):
+                documents.append(Document(page_content=content or "", metadata=metadata or {}, id=doc_id))
+                embeddings.append(embedding)
+            if len(batch["ids"]) < batch_size:
+                return documents, embeddings
+            offset += batch_size
+
     def list_collections(self) -> list[str]:
         """사용 가능한 Collection 목록을 반환한다."""
         collections = self.client.list_collections()
@@ -0,0 +1,7 @@
+-- liquibase formatted sql
+-- changeset kenshin579:add-rewrite-path-to-query-logs
+
+ALTER TABLE query_logs
+    ADD COLUMN rewrite_path VARCHAR(20) NULL AFTER has_results;
+
+--rollback ALTER TABLE query_logs DROP COLUMN rewrite_path;
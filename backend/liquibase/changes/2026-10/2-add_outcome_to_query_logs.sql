@@ -0,0 +1,7 @@
+-- liquibase formatted sql
+-- changeset kenshin579:add-outcome-to-query-logs
+
+ALTER TABLE query_logs
+    ADD COLUMN outcome VARCHAR(30) NULL AFTER rewrite_path;
+
+--rollback ALTER TABLE query_logs DROP COLUMN outcome;
@@ -0,0 +1,12 @@
+-- liquibase formatted sql
+-- changeset kenshin579:create-chat-sessions
+
+CREATE TABLE chat_sessions (
+    session_id VARCHAR(36) PRIMARY KEY,
+    blog_id VARCHAR(100) NOT NULL,
+    data JSON NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_updated_at (updated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+--rollback DROP TABLE chat_sessions;
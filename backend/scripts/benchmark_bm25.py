@@ -0,0 +1,158 @@
+"""BM25 키워드 인덱스 벤치마크.
+
+블로그 contents 디렉토리의 실제 청크로 분석기별(공백 토큰화 vs 한글 n-gram) BM25 인덱스의
+빌드 시간, 디스크 크기, 로드 시간과 메모리, 질의 지연 시간(평균/p95), EVAL_DATASET recall@k를 비교한다.
+recall의 정답은 질문의 영문 키워드(goroutine, iota, Docker 등)를 모두 포함하는 청크로 근사한다.
+
+--sizes를 지정하면 합성 청크로 코퍼스 크기별 질의 지연 시간을 측정한다 (코퍼스 증가 대비 지연 증가율 확인).
+
+사용 예시:
+    uv run python scripts/benchmark_bm25.py --blog-id blog-v2 --contents-dir ../blog-v2/contents
+    uv run python scripts/benchmark_bm25.py --sizes 1000 4000 16000 64000
+"""
+
+import argparse
+import logging
+import math
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import get_settings
+from app.core.logging import init_logger
+from app.evaluation.dataset import EVAL_DATASET
+from app.rag.analyzer import ANALYZERS
+from app.rag.bm25 import BM25Index, build_keyword_index, index_path, load_keyword_index
+from app.rag.chunker import split_documents
+from app.rag.document_loader import load_blog_documents
+
+logger = logging.getLogger(__name__)
+
+_KEYWORD = re.compile(r"[A-Za-z][A-Za-z0-9]+")
+
+
+def keyword_pattern(question: str) -> list[re.Pattern]:
+    return [
+        re.compile(rf"(?<![a-z0-9]){re.escape(word.lower())}(?![a-z0-9])", re.IGNORECASE)
+        for word in _KEYWORD.findall(question)
+    ]
+
+
+def recall_at_k(index: BM25Index, chunks: list[Document], items: list[dict], k: int) -> float:
+    """질문별 (상위 k개 중 정답 청크 수 / min(k, 전체 정답 수))의 평균."""
+    recalls = []
+    for item in items:
+        patterns = keyword_pattern(item["question"])
+        if not patterns:
+            continue
+        relevant = {
+            id(chunk) for chunk in chunks if all(p.search(chunk.page_content) for p in patterns)
+        }
+        if not relevant:
+            continue
+        hits = sum(1 for doc, _ in index.search(item["question"], k) if id(doc) in relevant)
+        recalls.append(hits / min(k, len(relevant)))
+    return statistics.mean(recalls) if recalls else 0.0
+
+
+def latency(index: BM25Index, queries: list[str], k: int, repeat: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, k)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.mean(timings), timings[math.ceil(len(timings) * 0.95) - 1]
+
+
+def measure_load(index_dir: str, blog_id: str) -> tuple[BM25Index, float, float]:
+    """로드 시간(ms)과 로드된 인덱스의 메모리(MB, tracemalloc 기준)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = load_keyword_index(index_dir, blog_id)
+    elapsed = (time.perf_counter() - start) * 1000
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return index, elapsed, current / 1024 / 1024
+
+
+def compare_analyzers(chunks: list[Document], blog_id: str, k: int, repeat: int) -> None:
+    items = [item for item in EVAL_DATASET if item["blog_id"] == blog_id]
+    queries = [item["question"] for item in items]
+    for analyzer in ANALYZERS:
+        with tempfile.TemporaryDirectory() as index_dir:
+            start = time.perf_counter()
+            build_keyword_index(index_dir, blog_id, chunks, analyzer)
+            build_ms = (time.perf_counter() - start) * 1000
+            size_mb = index_path(index_dir, blog_id).stat().st_size / 1024 / 1024
+            index, load_ms, memory_mb = measure_load(index_dir, blog_id)
+        mean_ms, p95_ms = latency(index, queries, k, repeat)
+        recall = recall_at_k(index, index.documents, items, k)
+        logger.info("분석기별 BM25 벤치마크 결과", extra={
+            "analyzer": analyzer,
+            "chunks": len(chunks),
+            "queries": len(queries),
+            "k": k,
+            "build_ms": round(build_ms, 1),
+            "load_ms": round(load_ms, 1),
+            "disk_mb": round(size_mb, 2),
+            "memory_mb": round(memory_mb, 2),
+            "mean_ms": round(mean_ms, 3),
+            "p95_ms": round(p95_ms, 3),
+            "recall_at_k": round(recall, 3),
+        })
+
+
+def synthetic_chunks(n: int, seed: int = 0) -> list[Document]:
+    """질문 어휘와 임의 단어를 Zipf 분포에 가깝게(순위는 무작위) 섞은 합성 청크."""
+    rng = random.Random(seed)
+    vocabulary = [w for item in EVAL_DATASET for w in item["question"].split()]
+    vocabulary += [f"word{i}" for i in range(20000)]
+    rng.shuffle(vocabulary)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return [
+        Document(page_content=" ".join(rng.choices(vocabulary, weights, k=150)))
+        for _ in range(n)
+    ]
+
+
+def scaling(sizes: list[int], k: int, repeat: int) -> None:
+    queries = [item["question"] for item in EVAL_DATASET]
+    for size in sizes:
+        index = BM25Index.build(synthetic_chunks(size))
+        mean_ms, p95_ms = latency(index, queries, k, repeat)
+        logger.info("코퍼스 크기별 BM25 벤치마크 결과", extra={
+            "chunks": size, "k": k, "mean_ms": round(mean_ms, 3), "p95_ms": round(p95_ms, 3),
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BM25 키워드 인덱스 벤치마크")
+    parser.add_argument("--blog-id", default="blog-v2")
+    parser.add_argument("--contents-dir", default=None, help="블로그 contents/ 디렉토리 경로")
+    parser.add_argument("--sizes", type=int, nargs="*", default=None, help="합성 코퍼스 크기 목록")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    init_logger()
+    if args.contents_dir:
+        settings = get_settings()
+        documents = load_blog_documents(args.contents_dir, args.blog_id)
+        chunks = split_documents(documents, settings.chunk_size, settings.chunk_overlap)
+        compare_analyzers(chunks, args.blog_id, args.top_k, args.repeat)
+    scaling(args.sizes or [1000, 4000, 16000], args.top_k, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
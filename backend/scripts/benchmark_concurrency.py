@@ -0,0 +1,128 @@
+"""/chat 동시성 벤치마크 스크립트.
+
+실행 중인 API 서버(단일 uvicorn worker 권장)에 동시 요청을 보내
+동시성 수준별 처리량(req/s)과 지연 시간(p50/p95)을 측정한다.
+체인이 이벤트 루프를 블로킹하면 동시성을 올려도 처리량이 늘지 않고,
+ainvoke 기반 비동기 경로에서는 처리량이 동시성에 비례해 증가한다.
+
+캐시 히트가 섞이면 체인 실행 비용이 측정되지 않으므로, 모든 요청의 질문 끝에 실행/요청별
+고유 번호를 붙이고 응답/시맨틱 캐시를 끈 서버에서 측정한다. 측정 후 /admin/cache의 히트 수가
+늘었으면 경고를 남긴다. 클라이언트별 rate limit은 기본값(비활성화)으로 둔다.
+
+사용 예시:
+    RESPONSE_CACHE_ENABLED=false SEMANTIC_CACHE_ENABLED=false \\
+        uv run uvicorn app.main:app --port 8080 --workers 1
+    uv run python scripts/benchmark_concurrency.py --url http://localhost:8080 --concurrency 1 10 50 100
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.logging import init_logger
+from app.evaluation.dataset import EVAL_DATASET
+
+logger = logging.getLogger(__name__)
+
+
+async def _send(client: httpx.AsyncClient, blog_id: str, question: str) -> tuple[float, bool]:
+    start = time.perf_counter()
+    try:
+        resp = await client.post("/chat", json={"blog_id": blog_id, "question": question})
+        ok = resp.status_code == 200
+    except httpx.HTTPError:
+        ok = False
+    return (time.perf_counter() - start) * 1000, ok
+
+
+async def _cache_hits(client: httpx.AsyncClient) -> int | None:
+    """서버의 응답/시맨틱 캐시 히트 합계. 조회할 수 없으면 None."""
+    try:
+        resp = await client.get("/admin/cache")
+        resp.raise_for_status()
+        stats = resp.json()
+    except (httpx.HTTPError, ValueError):
+        return None
+    return stats["response"]["hits"] + stats["semantic"]["hits"]
+
+
+async def run_level(url: str, blog_id: str, concurrency: int, total: int) -> dict:
+    """동시성 수준 하나에 대해 total개의 요청을 보내고 결과를 집계한다."""
+    questions = [item["question"] for item in EVAL_DATASET if item["blog_id"] == blog_id]
+    questions = questions or ["테스트 질문"]
+    # 같은 질문이 반복되면 정확 일치 캐시/single-flight/임베딩 캐시가 체인 실행을 건너뛰므로
+    # 실행과 요청마다 고유한 질문을 만든다
+    run_id = uuid.uuid4().hex[:8]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=url,
+        timeout=120.0,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    ) as client:
+
+        async def bounded(i: int) -> tuple[float, bool]:
+            question = f"{questions[i % len(questions)]} ({run_id}-{i})"
+            async with semaphore:
+                return await _send(client, blog_id, question)
+
+        hits_before = await _cache_hits(client)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+        hits_after = await _cache_hits(client)
+
+    latencies = sorted(ms for ms, _ in results)
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": sum(1 for _, ok in results if not ok),
+        "throughput_rps": round(total / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[math.ceil(len(latencies) * 0.95) - 1], 1),
+        "cache_hits": None if hits_before is None or hits_after is None else hits_after - hits_before,
+    }
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    for level in args.concurrency:
+        total = max(args.requests, level)
+        result = await run_level(args.url, args.blog_id, level, total)
+        logger.info("동시성 벤치마크 결과", extra=result)
+        if result["cache_hits"]:
+            logger.warning(
+                "측정 중 캐시 히트 발생 - 캐시를 끈 서버에서 다시 측정하세요",
+                extra={"concurrency": level, "cache_hits": result["cache_hits"]},
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/chat 동시성 벤치마크")
+    parser.add_argument("--url", default="http://localhost:8080", help="API 서버 URL")
+    parser.add_argument("--blog-id", default="blog-v2", help="질문할 블로그 ID")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 10, 50, 100],
+        help="측정할 동시성 수준 목록",
+    )
+    parser.add_argument("--requests", type=int, default=100, help="수준별 요청 수")
+    args = parser.parse_args()
+
+    init_logger()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
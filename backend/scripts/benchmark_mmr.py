@@ -0,0 +1,66 @@
+"""MMR 재정렬 마이크로벤치마크.
+
+외부 서비스 없이 임의의 정규분포 임베딩으로 mmr_select 한 번의 비용을 측정한다.
+후보 수(fetch_k)와 임베딩 차원별로 반복 실행하여 평균/p95 지연 시간을 로그로 남긴다.
+
+사용 예시:
+    uv run python scripts/benchmark_mmr.py
+    uv run python scripts/benchmark_mmr.py --fetch-k 20 50 100 --dim 1536 --top-k 5
+"""
+
+import argparse
+import logging
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.logging import init_logger
+from app.rag.retriever import mmr_select
+
+logger = logging.getLogger(__name__)
+
+
+def run(fetch_k: int, dim: int, top_k: int, repeat: int, seed: int = 0) -> dict:
+    """fetch_k개 후보에서 top_k개를 고르는 MMR을 repeat번 실행하고 지연 시간을 집계한다."""
+    rng = np.random.default_rng(seed)
+    query = rng.standard_normal(dim).astype(np.float32)
+    # Chroma가 돌려주는 형태(리스트의 리스트)와 같은 입력으로 변환 비용까지 포함해 측정
+    candidates = rng.standard_normal((fetch_k, dim)).astype(np.float32).tolist()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        mmr_select(query, candidates, top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        "fetch_k": fetch_k,
+        "dim": dim,
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p95_ms": round(timings[math.ceil(len(timings) * 0.95) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MMR 재정렬 마이크로벤치마크")
+    parser.add_argument("--fetch-k", type=int, nargs="+", default=[20, 50, 100, 200])
+    parser.add_argument("--dim", type=int, nargs="+", default=[1536])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    init_logger()
+    for dim in args.dim:
+        for fetch_k in args.fetch_k:
+            logger.info("MMR 벤치마크 결과", extra=run(fetch_k, dim, args.top_k, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
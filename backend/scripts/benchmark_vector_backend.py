@@ -0,0 +1,212 @@
+"""시맨틱 검색 백엔드 벤치마크 (Chroma HTTP vs 로컬 메모리 맵 인덱스).
+
+--blog-id를 지정하면 Chroma Collection의 임베딩을 로컬 인덱스로 내보낸 뒤, 같은 쿼리 벡터로
+두 백엔드의 top-k 질의 지연 시간(평균/p95)과 로컬(전수 검색) 대비 Chroma(HNSW) top-k 일치율을 비교한다.
+쿼리 벡터는 임베딩 API 호출 없이 저장된 청크 임베딩에 노이즈를 더해 만든다.
+
+--sizes를 지정하면 합성 임베딩으로 코퍼스 크기별 로컬 인덱스의 로드 시간과 질의 지연 시간을 측정한다.
+
+두 모드 모두 float32 전수 검색 대비 int8 양자화 검색(rescore_k별 float32 재계산)의
+검색 행렬 크기, 지연 시간, recall@k를 함께 로그로 남긴다. rescore_k = k는 재계산 없는 순수 int8 순위와 같다.
+합성 모드는 청크에 10개 category를 고르게 배정해 category 사전 필터(선택률 10%) 적용 시 지연 시간도 측정한다.
+
+사용 예시:
+    uv run python scripts/benchmark_vector_backend.py --blog-id blog-v2
+    uv run python scripts/benchmark_vector_backend.py --sizes 1000 10000 100000
+    uv run python scripts/benchmark_vector_backend.py --sizes 50000 --rescore-k 20 50 100 200
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import get_settings
+from app.core.logging import init_logger
+from app.rag.filters import MetadataFilter
+from app.rag.local_index import LocalVectorIndex, export_vector_index, load_vector_index, save_vector_index
+from app.rag.vector_store import VectorStoreManager
+
+logger = logging.getLogger(__name__)
+
+
+def sample_queries(index: LocalVectorIndex, n: int, noise: float = 0.05, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(index), size=min(n, len(index)), replace=False)
+    queries = np.asarray(index.embeddings[rows], dtype=np.float32)
+    return queries + rng.normal(0, noise, queries.shape).astype(np.float32)
+
+
+def percentiles(timings: list[float]) -> tuple[float, float]:
+    timings = sorted(timings)
+    return statistics.mean(timings), timings[math.ceil(len(timings) * 0.95) - 1]
+
+
+def local_latency(
+    index: LocalVectorIndex,
+    queries: np.ndarray,
+    k: int,
+    repeat: int,
+    metadata_filter: MetadataFilter | None = None,
+) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, k, metadata_filter=metadata_filter)
+            timings.append((time.perf_counter() - start) * 1000)
+    return percentiles(timings)
+
+
+async def chroma_latency(
+    manager: VectorStoreManager, blog_id: str, queries: np.ndarray, k: int, repeat: int
+) -> tuple[float, float, list[list[str]]]:
+    collection = await manager.aget_collection(blog_id)
+    timings, ids = [], []
+    for round_ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            results = await collection.query(
+                query_embeddings=[query.tolist()], n_results=k, include=["documents", "metadatas"],
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+            if round_ == 0:
+                ids.append(results["ids"][0])
+    mean_ms, p95_ms = percentiles(timings)
+    return mean_ms, p95_ms, ids
+
+
+def timed(fn: Callable):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def compare_quantization(
+    root: str, blog_id: str, queries: np.ndarray, k: int, repeat: int, rescore_ks: list[int]
+) -> None:
+    exact = load_vector_index(root, blog_id)
+    truth = [set(exact.top_k(query, k)[0].tolist()) for query in queries]
+    for label, index in [("float32", exact)] + [
+        (f"int8 rescore={n}", load_vector_index(root, blog_id, "int8", n)) for n in rescore_ks
+    ]:
+        mean_ms, p95_ms = local_latency(index, queries, k, repeat)
+        recall = statistics.mean(
+            len(set(index.top_k(query, k)[0].tolist()) & expected) / len(expected)
+            for query, expected in zip(queries, truth)
+        )
+        logger.info("양자화별 로컬 검색 결과", extra={
+            "mode": label,
+            "chunks": len(index),
+            "k": k,
+            "matrix_mb": round(index.nbytes / 1024 / 1024, 2),
+            "mean_ms": round(mean_ms, 3),
+            "p95_ms": round(p95_ms, 3),
+            "recall_at_k": round(recall, 3),
+        })
+
+
+def compare_backends(blog_id: str, n_queries: int, k: int, repeat: int, rescore_ks: list[int]) -> None:
+    settings = get_settings()
+    # 쿼리를 직접 벡터로 넘기므로 임베딩 클라이언트는 사용하지 않는다
+    manager = VectorStoreManager(settings.chroma_host, settings.chroma_port, embeddings=None)
+    with tempfile.TemporaryDirectory() as root:
+        _, export_ms = timed(lambda: export_vector_index(manager, root, blog_id))
+        index, load_ms = timed(lambda: load_vector_index(root, blog_id))
+        queries = sample_queries(index, n_queries)
+
+        local_mean, local_p95 = local_latency(index, queries, k, repeat)
+        chroma_mean, chroma_p95, chroma_ids = asyncio.run(
+            chroma_latency(manager, blog_id, queries, k, repeat)
+        )
+        overlap = statistics.mean(
+            len({doc.id for doc, _ in index.search(query, k)} & set(ids)) / max(len(ids), 1)
+            for query, ids in zip(queries, chroma_ids)
+        )
+        logger.info("백엔드 비교 결과", extra={
+            "blog_id": blog_id,
+            "chunks": len(index),
+            "dimension": index.dimension,
+            "queries": len(queries),
+            "k": k,
+            "export_ms": round(export_ms),
+            "load_ms": round(load_ms, 1),
+            "matrix_mb": round(index.nbytes / 1024 / 1024, 1),
+            "chroma_mean_ms": round(chroma_mean, 3),
+            "chroma_p95_ms": round(chroma_p95, 3),
+            "local_mean_ms": round(local_mean, 3),
+            "local_p95_ms": round(local_p95, 3),
+            # Chroma(HNSW) top-k 중 로컬 전수 검색 top-k와 겹치는 비율
+            "top_k_overlap": round(overlap, 3),
+        })
+        compare_quantization(root, blog_id, queries, k, repeat, rescore_ks)
+
+
+def synthetic_embeddings(size: int, dimension: int, rng: np.random.Generator) -> np.ndarray:
+    """주제 중심 주변에 모인 임베딩 (균일 난수는 이웃 구분이 없어 recall 비교에 부적합)."""
+    centers = rng.normal(size=(max(size // 50, 1), dimension)).astype(np.float32)
+    noise = rng.normal(scale=0.8, size=(size, dimension)).astype(np.float32)
+    return centers[rng.integers(0, len(centers), size)] + noise
+
+
+def scaling(
+    sizes: list[int], dimension: int, n_queries: int, k: int, repeat: int, rescore_ks: list[int]
+) -> None:
+    rng = np.random.default_rng(0)
+    for size in sizes:
+        embeddings = synthetic_embeddings(size, dimension, rng)
+        documents = [
+            Document(page_content=str(i), metadata={"category": f"c{i % 10}"}, id=str(i))
+            for i in range(size)
+        ]
+        with tempfile.TemporaryDirectory() as root:
+            save_vector_index(root, "bench", documents, embeddings)
+            index, load_ms = timed(lambda: load_vector_index(root, "bench"))
+            logger.info("합성 로컬 인덱스 로드", extra={
+                "chunks": size, "dimension": dimension, "load_ms": round(load_ms, 1),
+            })
+            queries = sample_queries(index, n_queries)
+            compare_quantization(root, "bench", queries, k, repeat, rescore_ks)
+            for label, metadata_filter in [("unfiltered", None), ("category 10%", MetadataFilter(category=("c0",)))]:
+                mean_ms, p95_ms = local_latency(index, queries, k, repeat, metadata_filter)
+                logger.info("필터별 로컬 검색 결과", extra={
+                    "filter": label, "chunks": size, "k": k,
+                    "mean_ms": round(mean_ms, 3), "p95_ms": round(p95_ms, 3),
+                })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시맨틱 검색 백엔드 벤치마크")
+    parser.add_argument("--blog-id", default=None, help="Chroma와 비교할 blog_id (Chroma 서버 필요)")
+    parser.add_argument("--sizes", type=int, nargs="*", default=None, help="합성 코퍼스 크기 목록")
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rescore-k", type=int, nargs="*", default=[20, 50, 100, 200],
+                        help="int8 검색 후 float32로 재계산할 후보 수 목록")
+    args = parser.parse_args()
+
+    init_logger()
+    if args.blog_id:
+        compare_backends(args.blog_id, args.queries, args.top_k, args.repeat, args.rescore_k)
+    if args.sizes or not args.blog_id:
+        scaling(
+            args.sizes or [1000, 10000, 50000], args.dimension, args.queries, args.top_k, args.repeat,
+            args.rescore_k,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -53,7 +53,10 @@ def main():
     logger.info("평가 시작", extra={"blog_id": args.blog_id, "question_count": len(eval_items)})
 
     # RAG 체인으로 각 질문에 대한 답변 생성
-    chain = create_rag_chain(store, settings.openai_model, settings.top_k)
+    chain = create_rag_chain(
+        store, settings.openai_model, settings.top_k,
+        context_token_budget=settings.context_token_budget,
+    )
 
     questions = []
     answers = []
@@ -0,0 +1,136 @@
+"""컨텍스트 압축 효과 평가 스크립트.
+
+EVAL_DATASET 질문마다 같은 검색 결과에 대해 문서 단위 packing(baseline)과
+질문 기반 추출형 압축(compressed)의 컨텍스트 토큰 수를 비교한다.
+--ragas를 지정하면 두 방식으로 각각 답변을 생성해 RAGAS 점수도 함께 비교한다.
+
+사용 예시:
+    uv run python scripts/evaluate_compression.py --blog-id blog-v2
+    uv run python scripts/evaluate_compression.py --blog-id blog-v2 --ragas --output compression.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+from langchain_core.runnables import RunnableLambda
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import get_settings
+from app.core.logging import init_logger
+from app.evaluation.dataset import EVAL_DATASET
+from app.rag.chain import create_rag_chain
+from app.rag.context import get_token_counter, pack_documents
+from app.rag.embedder import create_embeddings
+from app.rag.retriever import create_async_retriever
+from app.rag.vector_store import VectorStoreManager
+
+logger = logging.getLogger(__name__)
+
+
+async def main_async(args: argparse.Namespace) -> tuple[dict | None, list[dict]]:
+    """질문별 컨텍스트 토큰 수를 비교하고, --ragas이면 두 방식의 답변까지 생성한다."""
+    settings = get_settings()
+    eval_items = [item for item in EVAL_DATASET if item["blog_id"] == args.blog_id]
+    if not eval_items:
+        logger.info("평가 데이터 없음", extra={"blog_id": args.blog_id})
+        return None, eval_items
+
+    embeddings = create_embeddings(settings.embedding_model)
+    manager = VectorStoreManager(settings.chroma_host, settings.chroma_port, embeddings)
+    retriever = create_async_retriever(
+        manager, args.blog_id, settings.top_k,
+        fetch_k=settings.mmr_fetch_k if settings.mmr_enabled else 0,
+        lambda_mult=settings.mmr_lambda,
+    )
+    count_tokens = get_token_counter(settings.openai_model)
+    budget = settings.context_token_budget
+
+    retrieved = {}
+    contexts = {"baseline": [], "compressed": []}
+    total_base = total_comp = 0
+    for item in eval_items:
+        question = item["question"]
+        docs = await retriever.ainvoke(question)
+        retrieved[question] = docs
+        baseline, base_tokens = pack_documents(docs, budget, count_tokens)
+        compressed, comp_tokens = pack_documents(docs, budget, count_tokens, query=question)
+        contexts["baseline"].append([d.page_content for d in baseline])
+        contexts["compressed"].append([d.page_content for d in compressed])
+        total_base += base_tokens
+        total_comp += comp_tokens
+        reduction = 1 - comp_tokens / base_tokens if base_tokens else 0.0
+        logger.info("질문별 컨텍스트 토큰", extra={
+            "question": question,
+            "baseline_tokens": base_tokens,
+            "compressed_tokens": comp_tokens,
+            "token_reduction": round(reduction, 4),
+        })
+
+    overall = 1 - total_comp / total_base if total_base else 0.0
+    report = {
+        "blog_id": args.blog_id,
+        "token_budget": budget,
+        "baseline_tokens": total_base,
+        "compressed_tokens": total_comp,
+        "token_reduction": round(overall, 4),
+    }
+    logger.info("컨텍스트 토큰 합계", extra=report)
+
+    if args.ragas:
+        # 같은 검색 결과로 두 방식의 답변을 생성한다 (RAGAS는 이벤트 루프 밖에서 실행)
+        fixed_retriever = RunnableLambda(lambda query: retrieved.get(query, []))
+        questions = [item["question"] for item in eval_items]
+        for variant, compress in (("baseline", False), ("compressed", True)):
+            chain = create_rag_chain(
+                None, settings.openai_model, settings.top_k, retriever=fixed_retriever,
+                blog_id=args.blog_id, context_token_budget=budget, compress_context=compress,
+            )
+            answers = [
+                (await chain.ainvoke({"input": q, "chat_history": []}))["answer"] for q in questions
+            ]
+            report[variant] = {"answers": answers, "contexts": contexts[variant]}
+
+    return report, eval_items
+
+
+def run_ragas(report: dict, eval_items: list[dict]) -> None:
+    """baseline/compressed 답변을 RAGAS로 평가해 report의 점수로 바꾼다."""
+    # ragas는 eval extra 의존성이므로 필요할 때만 import
+    from app.evaluation.evaluator import run_evaluation
+
+    questions = [item["question"] for item in eval_items]
+    ground_truths = [item["ground_truth"] for item in eval_items]
+    for variant in ("baseline", "compressed"):
+        generated = report[variant]
+        scores = run_evaluation(questions, generated["answers"], generated["contexts"], ground_truths)
+        report[variant] = {k: round(v, 4) for k, v in scores.items() if isinstance(v, (int, float))}
+        logger.info("평가 결과", extra={"variant": variant, **report[variant]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="컨텍스트 압축 효과 평가")
+    parser.add_argument("--blog-id", default="blog-v2", choices=["blog-v2", "investment"])
+    parser.add_argument("--ragas", action="store_true", help="RAGAS 답변 품질 평가도 실행")
+    parser.add_argument("--output", default=None, help="결과 저장 경로 (JSON)")
+    args = parser.parse_args()
+
+    init_logger()
+    report, eval_items = asyncio.run(main_async(args))
+    if report is None:
+        return
+    if args.ragas:
+        run_ragas(report, eval_items)
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        logger.info("결과 저장 완료", extra={"path": str(output_path)})
+
+
+if __name__ == "__main__":
+    main()
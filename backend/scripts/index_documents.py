@@ -23,6 +23,7 @@ from app.core.logging import init_logger
 from app.rag.chunker import split_documents
 from app.rag.document_loader import load_blog_documents
 from app.rag.embedder import create_embeddings
+from app.rag.indexing import build_search_indexes, remove_search_indexes
 from app.rag.vector_store import VectorStoreManager
 
 logger = logging.getLogger(__name__)
@@ -66,11 +67,15 @@ def main():
     if args.reindex:
         logger.info("기존 Collection 삭제", extra={"blog_id": args.blog_id})
         manager.delete_collection(args.blog_id)
+        remove_search_indexes(settings, args.blog_id)
 
     logger.info("[4/4] 인덱싱 시작", extra={"blog_id": args.blog_id})
     indexed = manager.index_documents(args.blog_id, chunks)
     logger.info("인덱싱 완료", extra={"blog_id": args.blog_id, "indexed_chunks": indexed})
 
+    # /index API와 같은 규칙으로 BM25/로컬 벡터 인덱스를 다시 만든다 (실패 시 이전 인덱스 삭제)
+    build_search_indexes(settings, manager, args.blog_id, chunks)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,6 @@
+"""여러 테스트 모듈이 함께 쓰는 헬퍼."""
+
+
+def char_count(text: str) -> int:
+    """글자 수를 토큰 수로 보는 테스트용 토큰 카운터."""
+    return len(text)
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.admission import AdmissionController, AdmissionRejected, TokenBucket
+
+
+class TestTokenBucket:
+    def test_burst_then_refill(self, monkeypatch):
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        bucket = TokenBucket(rate=2.0, burst=2)
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == pytest.approx(0.5)
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 0.5)
+        assert bucket.try_acquire() == 0
+
+
+class TestAdmissionController:
+    def test_rate_limit_per_client(self):
+        controller = AdmissionController(rate_per_client=0.1, burst_per_client=1)
+        controller.check_rate("1.1.1.1")
+        controller.check_rate("2.2.2.2")
+        with pytest.raises(AdmissionRejected) as exc:
+            controller.check_rate("1.1.1.1")
+        assert exc.value.retry_after > 0
+
+    def test_rate_limit_disabled(self):
+        controller = AdmissionController(rate_per_client=0)
+        for _ in range(100):
+            controller.check_rate("1.1.1.1")
+
+    def test_rate_limit_disabled_by_default(self):
+        controller = AdmissionController()
+        for _ in range(100):
+            controller.check_rate("10.0.0.1")
+        assert controller.rejected["rate_limited"] == 0
+
+    async def test_waiter_admitted_after_release(self):
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1.0)
+        await controller.acquire("blog-v2")
+        waiter = asyncio.ensure_future(controller.acquire("blog-v2"))
+        await asyncio.sleep(0)
+        assert controller.stats()["queue_depth"] == 1
+
+        await controller.release("blog-v2")
+        await waiter
+        assert controller.stats()["in_flight"] == 1
+        assert controller.stats()["queue_depth"] == 0
+
+    async def test_queue_full_rejected(self):
+        controller = AdmissionController(max_in_flight=1, max_queue=0)
+        await controller.acquire("blog-v2")
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("blog-v2")
+        assert controller.stats()["rejected"]["queue_full"] == 1
+
+    async def test_queue_timeout_rejected(self):
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.01)
+        await controller.acquire("blog-v2")
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("blog-v2")
+        assert controller.stats()["rejected"]["timeout"] == 1
+        assert controller.stats()["queue_depth"] == 0
+
+    async def test_per_blog_cap_does_not_block_other_blogs(self):
+        controller = AdmissionController(max_in_flight=10, max_in_flight_per_blog=1, queue_timeout=0.01)
+        async with controller.slot("blog-v2"):
+            async with controller.slot("investment"):
+                with pytest.raises(AdmissionRejected):
+                    await controller.acquire("blog-v2")
+        assert controller.stats()["in_flight"] == 0
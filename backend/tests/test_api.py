@@ -1,7 +1,121 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
+from langchain_core.documents import Document
 
+from app.cache.response import ResponseCache, get_response_cache
+from app.cache.semantic import SemanticCache, get_semantic_cache
+from app.cache.session import SessionStore, get_session_store
+from app.config import Settings, get_settings
+from app.core.admission import AdmissionController, get_admission_controller
+from app.core.deadline import DeadlineExceeded
+import app.api.chat_service as chat_service_module
+import app.api.routes as routes_module
+import app.rag.indexing as indexing_module
+from app.api.models import ChatResponse
+from app.api.routes import verify_index_token
 from app.main import app
+from app.rag.bm25 import BM25Index, build_keyword_index, load_keyword_index
+from app.rag.context import estimate_tokens
+from app.rag.filters import MetadataFilter
+from app.rag.history import HistoryManager
+from app.rag.local_index import load_vector_index, save_vector_index
+from app.rag.registry import get_rag_registry
+
+CONTEXT = [
+    Document(page_content="goroutine", metadata={"title": "Go 동시성", "url": "https://a"}),
+    Document(page_content="goroutine 2", metadata={"title": "Go 동시성", "url": "https://a"}),
+]
+
+
+class FakeChain:
+    calls = 0
+    inputs = []
+    timeout_stage = None
+    error = False
+
+    async def ainvoke(self, chain_input):
+        FakeChain.calls += 1
+        FakeChain.inputs.append(chain_input)
+        if FakeChain.error:
+            raise RuntimeError("LLM connection reset")
+        if FakeChain.timeout_stage:
+            context = CONTEXT if FakeChain.timeout_stage == "generation" else []
+            raise DeadlineExceeded(FakeChain.timeout_stage, context)
+        return {"answer": "경량 스레드입니다.", "context": CONTEXT, "query": chain_input["input"]}
+
+    async def astream(self, chain_input):
+        FakeChain.calls += 1
+        yield {"input": chain_input["input"]}
+        yield {"context": CONTEXT}
+        for token in ["경량 ", "스레드", "입니다."]:
+            if FakeChain.error:
+                raise RuntimeError("LLM connection reset")
+            yield {"answer": token}
+
+
+class FakeEmbeddings:
+    async def aembed_query(self, text):
+        return [1.0, 0.0] if "goroutine" in text else [0.0, 1.0]
+
+
+class FakeCollection:
+    metadata = None
+    configuration_json = {"hnsw": {"space": "cosine"}}
+
+    async def query(self, query_embeddings, n_results, include, where=None):
+        return {
+            "ids": [["1", "2", "3"]],
+            "documents": [["goroutine 소개", "goroutine 스케줄러", "채널"]],
+            "metadatas": [[
+                {"title": "Go 동시성", "url": "https://a"},
+                {"title": "Go 동시성", "url": "https://a"},
+                {"title": "Go 채널", "url": "https://b"},
+            ]],
+            "distances": [[0.2, 0.1, 0.4]],
+        }
+
+
+class FakeManager:
+    embeddings = FakeEmbeddings()
+
+    def delete_collection(self, blog_id):
+        pass
+
+    def index_documents(self, blog_id, documents):
+        return len(documents)
+
+    async def aget_collection(self, blog_id):
+        return FakeCollection()
+
+
+class FakeRegistry:
+    manager = FakeManager()
+    invalidated = []
+    history_manager = HistoryManager(None, estimate_tokens, max_turns=2)
+
+    def index_version(self, blog_id):
+        return 0
+
+    def stats(self):
+        return {}
+
+    def get_chain(self, blog_id, language=None, model=None, top_k=None):
+        return FakeChain()
+
+    def keyword_index(self, blog_id):
+        return None
+
+    def invalidate(self, blog_id):
+        FakeRegistry.invalidated.append(blog_id)
+
+    def local_vector_index(self, blog_id):
+        return None
+
+
+async def fake_inspireme_documents(api_url):
+    return [Document(page_content="명언", metadata={"type": "quote"})]
 
 
 @pytest.fixture
@@ -9,6 +123,34 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def fake_registry():
+    cache = SemanticCache(threshold=0.9)
+    FakeChain.calls = 0
+    FakeChain.inputs = []
+    FakeChain.timeout_stage = None
+    FakeChain.error = False
+    FakeRegistry.invalidated = []
+    app.dependency_overrides[get_rag_registry] = FakeRegistry
+    app.dependency_overrides[get_semantic_cache] = lambda: cache
+    response_cache = ResponseCache()
+    admission = AdmissionController()
+    app.dependency_overrides[get_response_cache] = lambda: response_cache
+    app.dependency_overrides[get_admission_controller] = lambda: admission
+    sessions = SessionStore()
+    app.dependency_overrides[get_session_store] = lambda: sessions
+    yield cache
+    app.dependency_overrides.clear()
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
 class TestHealthEndpoint:
     def test_health_returns_ok(self, client):
         response = client.get("/health")
@@ -35,6 +177,322 @@ class TestChatEndpoint:
         )
         assert response.status_code == 422
 
+    def test_answer_with_deduplicated_sources(self, client, fake_registry):
+        response = client.post(
+            "/chat",
+            json={"blog_id": "blog-v2", "question": "goroutine이란?"},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["answer"] == "경량 스레드입니다."
+        assert body["sources"] == [{"title": "Go 동시성", "url": "https://a"}]
+        assert body["message_id"]
+
+    def test_similar_question_served_from_semantic_cache(self, client, fake_registry):
+        first = client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?"})
+        second = client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이 뭐야?"})
+        assert FakeChain.calls == 1
+        assert second.json()["answer"] == first.json()["answer"]
+        assert second.json()["message_id"] != first.json()["message_id"]
+        assert fake_registry.stats()["hits"] == 1
+
+    def test_exact_repeat_served_from_response_cache(self, client, fake_registry):
+        client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?"})
+        client.post("/chat", json={"blog_id": "blog-v2", "question": "  Goroutine이란 "})
+        stats = client.get("/admin/cache").json()
+        assert FakeChain.calls == 1
+        assert stats["response"]["hits"] == 1
+        assert stats["semantic"]["hits"] == 0
+
+    def test_filters_reach_chain_and_separate_cache_entries(self, client, fake_registry):
+        filters = {"category": ["go"], "date_from": "2024-01-01"}
+        client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?"})
+        client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?", "filters": filters})
+        client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?", "filters": filters})
+        assert FakeChain.calls == 2
+        assert FakeChain.inputs[0]["metadata_filter"] is None
+        assert FakeChain.inputs[1]["metadata_filter"] == MetadataFilter(category=("go",), date_from=20240101)
+
+    def test_follow_up_question_bypasses_semantic_cache(self, client, fake_registry):
+        client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?"})
+        client.post("/chat", json={
+            "blog_id": "blog-v2",
+            "question": "goroutine 예시",
+            "chat_history": [{"role": "human", "content": "안녕"}],
+        })
+        assert FakeChain.calls == 2
+
+    def test_long_history_bounded_before_chain(self, client, fake_registry):
+        history = [
+            {"role": "human" if i % 2 == 0 else "ai", "content": f"메시지 {i}"}
+            for i in range(10)
+        ]
+        client.post("/chat", json={
+            "blog_id": "blog-v2", "question": "그거 예시", "chat_history": history,
+        })
+        chain_history = FakeChain.inputs[0]["chat_history"]
+        assert [m.content for m in chain_history] == [f"메시지 {i}" for i in range(6, 10)]
+
+
+class TestChatSession:
+    def test_follow_up_uses_server_side_history(self, client, fake_registry):
+        first = client.post("/chat", json={
+            "blog_id": "blog-v2", "question": "goroutine이란?", "new_session": True,
+        })
+        session_id = first.json()["session_id"]
+        assert session_id
+
+        second = client.post("/chat", json={
+            "blog_id": "blog-v2", "question": "그럼 채널은?", "session_id": session_id,
+        })
+
+        assert second.json()["session_id"] == session_id
+        chain_input = FakeChain.inputs[-1]
+        assert [m.content for m in chain_input["chat_history"]] == ["goroutine이란?", "경량 스레드입니다."]
+        assert chain_input["previous_query"] == "goroutine이란?"
+
+    def test_empty_chat_history_keeps_session_history(self, client, fake_registry):
+        first = client.post("/chat", json={
+            "blog_id": "blog-v2", "question": "goroutine이란?", "new_session": True,
+        })
+        client.post("/chat", json={
+            "blog_id": "blog-v2", "question": "그럼 채널은?",
+            "session_id": first.json()["session_id"], "chat_history": [],
+        })
+        chain_input = FakeChain.inputs[-1]
+        assert [m.content for m in chain_input["chat_history"]] == ["goroutine이란?", "경량 스레드입니다."]
+
+    def test_unknown_session_starts_new_one(self, client, fake_registry):
+        response = client.post("/chat", json={
+            "blog_id": "blog-v2", "question": "goroutine이란?", "session_id": "missing",
+        })
+        assert response.json()["session_id"] not in (None, "missing")
+        assert FakeChain.inputs[-1]["chat_history"] == []
+
+    def test_no_session_without_opt_in(self, client, fake_registry):
+        response = client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?"})
+        assert response.json()["session_id"] is None
+        assert app.dependency_overrides[get_session_store]().stats()["created"] == 0
+
+    def test_batch_items_never_create_sessions(self, client, fake_registry):
+        response = client.post("/chat/batch", json={"requests": [
+            {"blog_id": "blog-v2", "question": "goroutine이란?", "new_session": True},
+            {"blog_id": "blog-v2", "question": "채널이란?", "session_id": "missing"},
+        ]})
+        results = response.json()["results"]
+        assert [r["response"]["session_id"] for r in results] == [None, None]
+        assert app.dependency_overrides[get_session_store]().stats()["created"] == 0
+
+
+class TestChatErrors:
+    def test_failed_answer_is_logged_with_error_outcome(self, client, fake_registry, monkeypatch):
+        logged = []
+
+        async def fake_save_query_log(*args):
+            logged.append(args)
+
+        monkeypatch.setattr(chat_service_module, "save_query_log", fake_save_query_log)
+        FakeChain.error = True
+
+        with pytest.raises(RuntimeError):
+            client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?"})
+
+        assert len(logged) == 1
+        assert logged[0][-1] == "error"
+
+
+class TestChatDeadline:
+    def test_generation_timeout_returns_degraded_sources(self, client, fake_registry):
+        FakeChain.timeout_stage = "generation"
+        body = {"blog_id": "blog-v2", "question": "goroutine이란?"}
+
+        data = client.post("/chat", json=body).json()
+        assert data["degraded"] is True
+        assert data["sources"] == [{"title": "Go 동시성", "url": "https://a"}]
+        assert FakeChain.inputs[0]["deadline"] is not None
+
+        # degraded 응답은 캐싱하지 않는다
+        FakeChain.timeout_stage = None
+        assert client.post("/chat", json=body).json()["degraded"] is False
+        assert FakeChain.calls == 2
+
+    def test_retrieval_timeout_returns_retry_message(self, client, fake_registry):
+        FakeChain.timeout_stage = "retrieval"
+        data = client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?"}).json()
+        assert data["degraded"] is True
+        assert data["sources"] == []
+
+
+class TestChatAdmission:
+    def test_rate_limited_client_gets_429_with_retry_after(self, client, fake_registry):
+        admission = AdmissionController(rate_per_client=0.01, burst_per_client=1)
+        app.dependency_overrides[get_admission_controller] = lambda: admission
+
+        first = client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?"})
+        second = client.post("/chat", json={"blog_id": "blog-v2", "question": "goroutine이란?"})
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert int(second.headers["Retry-After"]) >= 1
+        assert client.get("/admin/admission").json()["rejected"]["rate_limited"] == 1
+
+    def test_stream_releases_slot(self, client, fake_registry):
+        admission = AdmissionController()
+        app.dependency_overrides[get_admission_controller] = lambda: admission
+        client.post("/chat/stream", json={"blog_id": "blog-v2", "question": "goroutine이란?"})
+        assert admission.stats()["in_flight"] == 0
+        assert admission.stats()["admitted"] == 1
+
+
+class TestSearchEndpoint:
+    def test_posts_grouped_by_url_without_llm(self, client, fake_registry):
+        response = client.post("/search", json={"blog_id": "blog-v2", "query": "goroutine"})
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [(r["url"], r["chunks"]) for r in results] == [("https://a", 2), ("https://b", 1)]
+        assert results[0]["score"] == pytest.approx(0.9)
+        assert results[0]["snippet"] == "goroutine 스케줄러"
+        assert FakeChain.calls == 0
+
+    def test_invalid_blog_id_returns_400(self, client):
+        response = client.post("/search", json={"blog_id": "invalid-blog", "query": "q"})
+        assert response.status_code == 400
+
+    def test_hybrid_without_keyword_index_returns_400(self, client, fake_registry):
+        response = client.post("/search", json={"blog_id": "blog-v2", "query": "goroutine", "hybrid": True})
+        assert response.status_code == 400
+        assert "Keyword index" in response.json()["detail"]
+
+    def test_hybrid_override_uses_current_keyword_index(self, client, fake_registry, monkeypatch):
+        calls = []
+
+        async def fake_search_posts(manager, blog_id, query, **kwargs):
+            calls.append(kwargs)
+            return []
+
+        keyword_index = BM25Index.build([Document(page_content="goroutine")])
+        monkeypatch.setattr(routes_module, "search_posts", fake_search_posts)
+        monkeypatch.setattr(FakeRegistry, "keyword_index", lambda self, blog_id: keyword_index)
+        app.dependency_overrides[get_settings] = lambda: Settings(use_hybrid_search=False)
+
+        response = client.post("/search", json={"blog_id": "blog-v2", "query": "goroutine", "hybrid": True})
+
+        assert response.status_code == 200
+        assert calls[0]["keyword_index"] is keyword_index
+
+    def test_limit_clamped_before_fetch_k(self, client, fake_registry, monkeypatch):
+        calls = []
+
+        async def fake_search_posts(manager, blog_id, query, **kwargs):
+            calls.append(kwargs)
+            return []
+
+        monkeypatch.setattr(routes_module, "search_posts", fake_search_posts)
+        settings = Settings(search_max_results=10, search_fetch_k=30)
+        app.dependency_overrides[get_settings] = lambda: settings
+
+        response = client.post("/search", json={"blog_id": "blog-v2", "query": "q", "limit": 1_000_000})
+
+        assert response.status_code == 200
+        assert calls[0]["limit"] == 10
+        assert calls[0]["fetch_k"] == 30
+
+    def test_rate_limited_client_gets_429(self, client, fake_registry):
+        admission = AdmissionController(rate_per_client=0.01, burst_per_client=1)
+        app.dependency_overrides[get_admission_controller] = lambda: admission
+
+        first = client.post("/search", json={"blog_id": "blog-v2", "query": "goroutine"})
+        second = client.post("/search", json={"blog_id": "blog-v2", "query": "goroutine"})
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert admission.stats()["admitted"] == 0
+
+
+class TestChatBatchEndpoint:
+    def test_results_in_order_with_per_item_errors(self, client, fake_registry):
+        response = client.post("/chat/batch", json={"requests": [
+            {"blog_id": "blog-v2", "question": "goroutine이란?"},
+            {"blog_id": "invalid-blog", "question": "테스트 질문"},
+            {"blog_id": "investment", "question": "ETF란?"},
+        ]})
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert len(results) == 3
+        assert results[0]["response"]["answer"] == "경량 스레드입니다."
+        assert results[1]["response"] is None
+        assert "Unknown blog_id" in results[1]["error"]
+        assert results[2]["error"] is None
+
+    def test_too_many_items_returns_400(self, client, fake_registry):
+        settings = Settings(batch_max_items=1)
+        app.dependency_overrides[get_settings] = lambda: settings
+        response = client.post("/chat/batch", json={"requests": [
+            {"blog_id": "blog-v2", "question": "q1"},
+            {"blog_id": "blog-v2", "question": "q2"},
+        ]})
+        assert response.status_code == 400
+
+    def test_empty_batch_returns_422(self, client):
+        response = client.post("/chat/batch", json={"requests": []})
+        assert response.status_code == 422
+
+
+class TestChatStreamEndpoint:
+    def test_invalid_blog_id_returns_400(self, client):
+        response = client.post(
+            "/chat/stream",
+            json={"blog_id": "invalid-blog", "question": "테스트 질문"},
+        )
+        assert response.status_code == 400
+
+    def test_streams_tokens_then_done_event(self, client, fake_registry):
+        response = client.post(
+            "/chat/stream",
+            json={"blog_id": "blog-v2", "question": "goroutine이란?", "new_session": True},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = parse_sse(response.text)
+        tokens = [data["token"] for event, data in events if event == "token"]
+        assert "".join(tokens) == "경량 스레드입니다."
+
+        event, data = events[-1]
+        assert event == "done"
+        assert data["sources"] == [{"title": "Go 동시성", "url": "https://a"}]
+        assert data["message_id"]
+        assert data["session_id"]
+
+
+    def test_cache_hit_done_event_has_same_keys(self, client, fake_registry):
+        body = {"blog_id": "blog-v2", "question": "goroutine이란?"}
+        miss = parse_sse(client.post("/chat/stream", json=body).text)[-1]
+        hit = parse_sse(client.post("/chat/stream", json=body).text)[-1]
+
+        assert FakeChain.calls == 1
+        assert hit[0] == miss[0] == "done"
+        assert hit[1].keys() == miss[1].keys()
+        assert hit[1]["degraded"] is False
+
+    def test_stream_error_is_logged_with_error_outcome(self, client, fake_registry, monkeypatch):
+        logged = []
+
+        async def fake_save_query_log(*args):
+            logged.append(args)
+
+        monkeypatch.setattr(chat_service_module, "save_query_log", fake_save_query_log)
+        FakeChain.error = True
+
+        response = client.post("/chat/stream", json={"blog_id": "blog-v2", "question": "goroutine이란?"})
+
+        assert parse_sse(response.text)[-1][0] == "error"
+        assert len(logged) == 1
+        message_id, request, answer, sources, _, _, outcome = logged[0]
+        assert outcome == "error"
+        assert answer == ""
+        assert [s.url for s in sources] == ["https://a"]
+
 
 class TestIndexEndpoint:
     def test_no_auth_returns_401(self, client):
@@ -47,3 +505,69 @@ class TestIndexEndpoint:
             headers={"Authorization": "Bearer wrong-token"},
         )
         assert response.status_code in (401, 500)  # 500 if token not configured
+
+    def test_failed_keyword_index_still_invalidates(self, client, fake_registry, monkeypatch, tmp_path):
+        def fail(*args, **kwargs):
+            raise OSError("read-only file system")
+
+        settings = Settings(
+            use_hybrid_search=True, keyword_index_dir=str(tmp_path), local_vector_dir=str(tmp_path)
+        )
+        build_keyword_index(settings.keyword_index_dir, "inspireme", [Document(page_content="이전 명언")])
+        monkeypatch.setattr(routes_module, "load_inspireme_documents", fake_inspireme_documents)
+        monkeypatch.setattr(indexing_module, "build_keyword_index", fail)
+        monkeypatch.setattr(indexing_module, "export_vector_index", lambda *args: None)
+        app.dependency_overrides[verify_index_token] = lambda: "token"
+        app.dependency_overrides[get_settings] = lambda: settings
+        fake_registry.store("inspireme", None, "명언", [1.0, 0.0], ChatResponse(answer="old", sources=[]))
+
+        response = client.post("/index/inspireme")
+
+        assert response.status_code == 200
+        assert response.json()["indexed_chunks"] == 1
+        assert FakeRegistry.invalidated == ["inspireme"]
+        assert fake_registry.lookup("inspireme", None, [1.0, 0.0]) is None
+        # 이전 청크를 담은 BM25 인덱스가 남지 않는다
+        assert load_keyword_index(settings.keyword_index_dir, "inspireme") is None
+
+    def test_vector_export_only_for_local_backend(self, client, fake_registry, monkeypatch, tmp_path):
+        exported = []
+
+        monkeypatch.setattr(routes_module, "load_inspireme_documents", fake_inspireme_documents)
+        monkeypatch.setattr(indexing_module, "export_vector_index", lambda *args: exported.append(args[2]))
+        app.dependency_overrides[verify_index_token] = lambda: "token"
+        app.dependency_overrides[get_settings] = lambda: Settings(
+            use_hybrid_search=False, keyword_index_dir=str(tmp_path),
+            local_vector_dir=str(tmp_path),
+        )
+
+        assert client.post("/index/inspireme").status_code == 200
+        assert exported == []
+
+        app.dependency_overrides[get_settings] = lambda: Settings(
+            use_hybrid_search=False, vector_backend="local", keyword_index_dir=str(tmp_path),
+            local_vector_dir=str(tmp_path),
+        )
+        assert client.post("/index/inspireme").status_code == 200
+        assert exported == ["inspireme"]
+
+    def test_failed_vector_export_still_invalidates(self, client, fake_registry, monkeypatch, tmp_path):
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(routes_module, "load_inspireme_documents", fake_inspireme_documents)
+        monkeypatch.setattr(indexing_module, "export_vector_index", fail)
+        app.dependency_overrides[verify_index_token] = lambda: "token"
+        app.dependency_overrides[get_settings] = lambda: Settings(
+            use_hybrid_search=False, vector_backend="local", keyword_index_dir=str(tmp_path),
+            local_vector_dir=str(tmp_path),
+        )
+
+        save_vector_index(str(tmp_path), "inspireme", [Document(page_content="이전 명언")], [[1.0, 0.0]])
+
+        response = client.post("/index/inspireme")
+
+        assert response.status_code == 200
+        assert FakeRegistry.invalidated == ["inspireme"]
+        # 이전 버전이 다시 메모리 맵되지 않고 Chroma를 사용한다
+        assert load_vector_index(str(tmp_path), "inspireme") is None
@@ -0,0 +1,61 @@
+from langchain_core.documents import Document
+
+from app.rag.bm25 import BM25Index, build_keyword_index, load_keyword_index
+from app.rag.filters import MetadataFilter
+
+DOCS = [
+    Document(page_content="goroutine은 경량 스레드입니다", metadata={"url": "https://a"}, id="1"),
+    Document(page_content="channel 은 goroutine 간 통신 수단", metadata={"url": "https://b"}, id="2"),
+    Document(page_content="ETF 투자 전략", metadata={"url": "https://c"}, id="3"),
+]
+
+
+class TestBM25Index:
+    def test_ranks_matching_documents(self):
+        index = BM25Index.build(DOCS)
+        results = index.search("channel goroutine", k=5)
+        assert [doc.metadata["url"] for doc, _ in results] == ["https://b", "https://a"]
+
+    def test_korean_particles_still_match(self):
+        index = BM25Index.build(DOCS)
+        results = index.search("goroutine이란 무엇인가요?", k=5)
+        assert {doc.metadata["url"] for doc, _ in results} == {"https://a", "https://b"}
+        assert index.search("스레드가", k=1)[0][0].metadata["url"] == "https://a"
+
+    def test_whitespace_analyzer_misses_attached_particles(self):
+        index = BM25Index.build(DOCS, analyzer="whitespace")
+        assert [d.metadata["url"] for d, _ in index.search("goroutine이란", k=5)] == []
+
+    def test_top_k_is_sorted(self):
+        docs = [Document(page_content="go " * n) for n in range(1, 30)]
+        results = BM25Index.build(docs).search("go", k=3)
+        scores = [score for _, score in results]
+        assert len(results) == 3
+        assert scores == sorted(scores, reverse=True)
+        assert results[0][0].page_content == "go " * 29
+
+    def test_metadata_filter_restricts_candidates(self):
+        index = BM25Index.build(DOCS)
+        results = index.search("goroutine", k=5, metadata_filter=MetadataFilter(category=("go",)))
+        assert results == []
+        index = BM25Index.build([
+            Document(page_content=d.page_content, metadata={**d.metadata, "category": c})
+            for d, c in zip(DOCS, ["go", "java", "etf"])
+        ])
+        results = index.search("goroutine", k=5, metadata_filter=MetadataFilter(category=("go",)))
+        assert [doc.metadata["url"] for doc, _ in results] == ["https://a"]
+
+    def test_no_match_returns_empty(self):
+        assert BM25Index.build(DOCS).search("kubernetes", k=5) == []
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        built = build_keyword_index(str(tmp_path), "blog-v2", DOCS)
+        loaded = load_keyword_index(str(tmp_path), "blog-v2")
+        assert len(loaded) == 3
+        assert loaded.search("ETF", k=1) == built.search("ETF", k=1)
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_missing_or_corrupt_index_is_none(self, tmp_path):
+        assert load_keyword_index(str(tmp_path), "blog-v2") is None
+        (tmp_path / "blog-v2.bm25.npz").write_bytes(b"PK\x03\x04broken")
+        assert load_keyword_index(str(tmp_path), "blog-v2") is None
@@ -0,0 +1,65 @@
+from langchain_core.documents import Document
+
+from app.rag.compressor import compress_documents, split_spans, tokenize
+from app.rag.context import pack_documents
+from tests.helpers import char_count
+
+POST = """## goroutine 소개
+goroutine은 Go 런타임이 관리하는 경량 스레드이다. 이 글은 2019년에 작성되었다.
+```go
+go func() {
+    fmt.Println("goroutine 실행")
+}()
+```
+| 항목 | 값 |
+|------|----|
+| 작성자 | 홍길동 |
+댓글과 구독은 블로그 하단에서 할 수 있다."""
+
+
+class TestSplitSpans:
+    def test_code_table_heading_and_sentences(self):
+        kinds = [s.kind for s in split_spans(POST)]
+        assert kinds == ["heading", "text", "text", "code", "table", "text"]
+
+    def test_unterminated_code_fence_kept_as_one_span(self):
+        spans = split_spans("설명\n```python\nprint(1)")
+        assert [s.kind for s in spans] == ["text", "code"]
+
+
+class TestTokenize:
+    def test_hangul_bigrams_robust_to_particles(self):
+        assert tokenize("goroutine은") & tokenize("goroutine이란")
+        assert "스레" in tokenize("경량 스레드를")
+
+
+class TestCompressDocuments:
+    def test_keeps_relevant_spans_in_original_order(self):
+        doc = Document(page_content=POST, metadata={"source": "go.md"})
+        compressed, used = compress_documents("goroutine이란 무엇인가요?", [doc], 1000, char_count)
+
+        text = compressed[0].page_content
+        assert "경량 스레드" in text
+        assert "go func()" in text
+        assert "작성자" not in text
+        assert "댓글과 구독" not in text
+        assert text.index("경량 스레드") < text.index("go func()")
+        assert used <= char_count(text)
+
+    def test_respects_budget(self):
+        doc = Document(page_content=POST, metadata={"source": "go.md"})
+        _, used = compress_documents("goroutine 실행", [doc], 40, char_count)
+        assert 0 < used <= 40
+
+    def test_chunk_relevance_weights_spans(self):
+        low = Document(page_content="goroutine 설명 문장.", metadata={"relevance": 0.2})
+        high = Document(page_content="goroutine 예제 문장.", metadata={"relevance": 0.9})
+        compressed, _ = compress_documents("goroutine", [low, high], 16, char_count)
+        assert [d.page_content for d in compressed] == ["goroutine 예제 문장."]
+
+
+class TestPackWithCompression:
+    def test_falls_back_to_document_packing_without_matches(self):
+        doc = Document(page_content="전혀 관련 없는 내용.", metadata={"source": "a.md"})
+        packed, _ = pack_documents([doc], 1000, char_count, query="kubernetes")
+        assert packed == [doc]
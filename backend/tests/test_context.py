@@ -0,0 +1,120 @@
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+import app.rag.context as context_module
+from app.rag.chain import create_rag_chain
+from app.rag.chunker import split_documents
+from app.rag.context import create_context_packer, merge_overlapping, pack_documents
+from tests.helpers import char_count
+
+
+def _chunks(text: str, size: int, overlap: int, source: str, with_start: bool = False) -> list[Document]:
+    docs = []
+    start = 0
+    while start < len(text):
+        metadata = {"source": source}
+        if with_start:
+            metadata["start_index"] = start
+        docs.append(Document(page_content=text[start:start + size], metadata=metadata))
+        start += size - overlap
+    return docs
+
+
+BODY = "".join(f"{i:03d} goroutine은 경량 스레드이다. " for i in range(20))
+
+
+class TestMergeOverlapping:
+    def test_merges_adjacent_chunks_by_text_overlap(self):
+        chunks = _chunks(BODY, 120, 40, "go/goroutine.md")
+        merged = merge_overlapping([chunks[2], chunks[0], chunks[1]])
+        assert len(merged) == 1
+        assert merged[0].page_content == BODY[:len(chunks[0].page_content) + 80 * 2]
+
+    def test_merges_by_start_index(self):
+        chunks = _chunks(BODY, 120, 40, "go/goroutine.md", with_start=True)
+        merged = merge_overlapping([chunks[1], chunks[0]])
+        assert merged[0].page_content == BODY[:200]
+        assert merged[0].metadata["start_index"] == 0
+
+    def test_keeps_other_sources_and_rank_order(self):
+        a = _chunks(BODY, 120, 40, "a.md")
+        other = Document(page_content="전혀 다른 문서 내용입니다.", metadata={"source": "b.md"})
+        merged = merge_overlapping([other, a[0], a[1]])
+        assert [d.metadata["source"] for d in merged] == ["b.md", "a.md"]
+
+    def test_non_adjacent_chunks_not_merged(self):
+        chunks = _chunks(BODY, 120, 40, "a.md")
+        assert len(merge_overlapping([chunks[0], chunks[4]])) == 2
+
+    def test_exact_duplicates_removed(self):
+        doc = Document(page_content="같은 내용의 청크", metadata={"source": "a.md"})
+        assert len(merge_overlapping([doc, doc.model_copy()])) == 1
+
+    def test_splitter_chunks_round_trip(self):
+        text = "".join(f"{i:03d} channel은 goroutine 간 통신 수단이다. " for i in range(60))
+        doc = Document(page_content=text, metadata={"source": "a.md"})
+        chunks = split_documents([doc], chunk_size=300, chunk_overlap=60)
+        merged = merge_overlapping(chunks)
+        assert len(merged) == 1
+        assert merged[0].page_content.split() == doc.page_content.split()
+
+
+class TestPackDocuments:
+    def test_fills_budget_in_rank_order(self):
+        docs = [
+            Document(page_content="a" * 50, metadata={"source": "a.md"}),
+            Document(page_content="b" * 80, metadata={"source": "b.md"}),
+            Document(page_content="c" * 30, metadata={"source": "c.md"}),
+        ]
+        packed, used = pack_documents(docs, 100, char_count)
+        assert [d.metadata["source"] for d in packed] == ["a.md", "c.md"]
+        assert used == 80
+
+    def test_truncates_oversized_first_document(self):
+        docs = [Document(page_content="a" * 500, metadata={"source": "a.md"})]
+        packed, used = pack_documents(docs, 100, char_count)
+        assert len(packed) == 1
+        assert used <= 100
+
+    def test_packer_reads_chain_input(self):
+        chunks = _chunks(BODY, 120, 40, "a.md")
+        pack = create_context_packer(1000, char_count)
+        packed = pack({"input": "질문", "chat_history": [AIMessage(content="답변")], "context": chunks[:2]})
+        assert len(packed) == 1
+
+    def test_compression_uses_rewritten_query(self, monkeypatch):
+        queries = []
+
+        def fake_pack(documents, token_budget, count_tokens, query=None):
+            queries.append(query)
+            return list(documents), 0
+
+        monkeypatch.setattr(context_module, "pack_documents", fake_pack)
+        pack = create_context_packer(1000, char_count, compress=True)
+        pack({"input": "그건 왜 가벼워?", "query": "goroutine 경량 스레드 이유", "context": []})
+        pack({"input": "goroutine이란?", "context": []})
+        assert queries == ["goroutine 경량 스레드 이유", "goroutine이란?"]
+
+
+class TestChainPacking:
+    def test_chain_keeps_sources_and_packs_prompt_context(self):
+        chunks = _chunks(BODY, 120, 40, "a.md")
+        prompts = []
+
+        def record(prompt_value):
+            prompts.append(prompt_value.to_string())
+            return prompt_value
+
+        llm = RunnableLambda(record) | FakeListChatModel(responses=["답변"])
+        chain = create_rag_chain(
+            None, "fake", retriever=RunnableLambda(lambda _: chunks[:3]), llm=llm,
+            context_token_budget=1000, count_tokens=char_count,
+        )
+        result = chain.invoke({"input": "goroutine이란?", "chat_history": []})
+
+        assert len(result["context"]) == 3
+        assert result["answer"] == "답변"
+        assert BODY[:280] in prompts[0]
+        assert prompts[0].count(BODY[80:120]) == 1
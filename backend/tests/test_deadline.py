@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.rag.chain import create_rag_chain
+from app.rag.rewrite import REWRITTEN
+
+DOCS = [Document(page_content="goroutine 본문", metadata={"url": "https://a", "title": "Go"})]
+
+
+def retriever(delay: float = 0.0):
+    queries = []
+
+    async def search(query):
+        queries.append(query)
+        await asyncio.sleep(delay)
+        return DOCS
+
+    runnable = RunnableLambda(search)
+    runnable.queries = queries
+    return runnable
+
+
+class TestDeadline:
+    def test_stage_timeout_capped_by_share_and_remaining(self):
+        deadline = Deadline(10, {"rewrite": 0.2})
+        assert deadline.stage_timeout("rewrite") == pytest.approx(2, abs=0.01)
+        assert deadline.stage_timeout("generation") == pytest.approx(10, abs=0.01)
+        deadline.expires_at -= 9
+        assert deadline.stage_timeout("generation") == pytest.approx(1, abs=0.01)
+
+
+class TestChainDeadline:
+    async def test_within_deadline_answers_normally(self):
+        chain = create_rag_chain(
+            None, "fake", retriever=retriever(), llm=FakeListChatModel(responses=["답변"])
+        )
+        result = await chain.ainvoke({"input": "질문", "chat_history": [], "deadline": Deadline(5)})
+        assert result["answer"] == "답변"
+        assert result["context"] == DOCS
+
+    async def test_slow_retrieval_raises_without_context(self):
+        chain = create_rag_chain(
+            None, "fake", retriever=retriever(delay=1.0), llm=FakeListChatModel(responses=["답변"])
+        )
+        with pytest.raises(DeadlineExceeded) as exc:
+            await chain.ainvoke({"input": "질문", "chat_history": [], "deadline": Deadline(0.3)})
+        assert exc.value.stage == "retrieval"
+        assert exc.value.context == []
+
+    async def test_slow_generation_keeps_retrieved_context(self):
+        llm = FakeListChatModel(responses=["아주 긴 답변입니다"], sleep=0.1)
+        chain = create_rag_chain(None, "fake", retriever=retriever(), llm=llm)
+        with pytest.raises(DeadlineExceeded) as exc:
+            await chain.ainvoke({"input": "질문", "chat_history": [], "deadline": Deadline(0.3)})
+        assert exc.value.stage == "generation"
+        assert exc.value.context == DOCS
+
+    async def test_slow_rewrite_falls_back_to_original_question(self):
+        search = retriever()
+
+        async def slow_then_answer(prompt):
+            if search.queries:
+                return AIMessage(content="답변")
+            await asyncio.sleep(1.0)
+            return AIMessage(content="재작성된 질문")
+
+        chain = create_rag_chain(None, "fake", retriever=search, llm=RunnableLambda(slow_then_answer))
+        result = await chain.ainvoke({
+            "input": "그거 예시",
+            "chat_history": [HumanMessage(content="goroutine?"), AIMessage(content="경량 스레드")],
+            "rewrite_path": REWRITTEN,
+            "deadline": Deadline(2, {"rewrite": 0.1}),
+        })
+        assert search.queries == ["그거 예시"]
+        assert result["answer"] == "답변"
@@ -57,6 +57,7 @@ class TestLoadBlogDocuments:
             assert docs[0].metadata["title"] == "테스트 포스트"
             assert docs[0].metadata["blog_id"] == "blog-v2"
             assert docs[0].metadata["category"] == "go"
+            assert docs[0].metadata["date_int"] == 20240115
             assert "본문 내용입니다." in docs[0].page_content
 
     def test_load_nonexistent_dir(self):
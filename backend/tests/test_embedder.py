@@ -0,0 +1,79 @@
+from langchain_core.embeddings import Embeddings
+
+from app.rag.embedder import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.query_calls = 0
+        self.document_texts = []
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return [float(len(text))]
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+    def embed_documents(self, texts):
+        self.document_texts.extend(texts)
+        return [[float(len(t))] for t in texts]
+
+
+class TestCachedEmbeddings:
+    def test_query_embedding_cached(self):
+        inner = CountingEmbeddings()
+        cached = CachedEmbeddings(inner, model="m")
+        assert cached.embed_query("goroutine") == cached.embed_query("goroutine")
+        assert inner.query_calls == 1
+        assert cached.stats()["query"]["hits"] == 1
+
+    async def test_async_and_sync_share_cache(self):
+        inner = CountingEmbeddings()
+        cached = CachedEmbeddings(inner, model="m")
+        await cached.aembed_query("goroutine")
+        cached.embed_query("goroutine")
+        assert inner.query_calls == 1
+
+    def test_model_is_part_of_key(self):
+        inner = CountingEmbeddings()
+        a = CachedEmbeddings(inner, model="small")
+        b = CachedEmbeddings(inner, model="large")
+        assert a._key("q") != b._key("q")
+
+    def test_lru_bound(self):
+        inner = CountingEmbeddings()
+        cached = CachedEmbeddings(inner, model="m", max_size=2)
+        for text in ["a", "b", "c", "a"]:
+            cached.embed_query(text)
+        assert inner.query_calls == 4
+        assert cached.stats()["query"]["entries"] == 2
+
+    def test_documents_not_cached_by_default(self):
+        inner = CountingEmbeddings()
+        cached = CachedEmbeddings(inner, model="m")
+        cached.embed_documents(["a", "b"])
+        cached.embed_documents(["a", "b"])
+        assert inner.document_texts == ["a", "b", "a", "b"]
+        assert cached.stats()["documents"] is None
+
+    def test_documents_cached_embeds_only_missing(self):
+        inner = CountingEmbeddings()
+        cached = CachedEmbeddings(inner, model="m", cache_documents=True)
+        cached.embed_documents(["a", "bb"])
+        vectors = cached.embed_documents(["bb", "ccc"])
+        assert inner.document_texts == ["a", "bb", "ccc"]
+        assert vectors == [[2.0], [3.0]]
+
+    async def test_aembed_queries_batches_missing_into_one_call(self):
+        inner = CountingEmbeddings()
+        cached = CachedEmbeddings(inner, model="m")
+        cached.embed_query("a")
+        await cached.aembed_queries(["a", "bb", "bb", "ccc"])
+
+        assert inner.document_texts == ["bb", "ccc"]
+        assert await cached.aembed_query("ccc") == [3.0]
+        assert inner.query_calls == 1
@@ -0,0 +1,66 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from app.rag.filters import MetadataFilter, MetadataIndex, date_to_int
+
+DOCS = [
+    Document(page_content="a", metadata={"category": "go", "tags": ["go", "concurrency"], "date": "2023-01-05"}),
+    Document(page_content="b", metadata={"category": "java", "tags": ["jvm"], "date": "2024-01-01"}),
+    Document(page_content="c", metadata={"category": "go", "date_int": 20250101}),
+    Document(page_content="d", metadata={"type": "quote", "author": "공자", "topics": ["배움"]}),
+    Document(page_content="e", metadata={"type": "author", "author_slug": "confucius"}),
+]
+
+
+def test_date_to_int():
+    assert date_to_int("2024-01-15") == 20240115
+    assert date_to_int("2024-01-15 10:00:00") == 20240115
+    assert date_to_int("") is None
+    assert date_to_int("Jan 15") is None
+
+
+class TestMetadataFilter:
+    def test_empty_filter_is_falsy(self):
+        assert not MetadataFilter()
+        assert MetadataFilter(date_to=20240101)
+
+    def test_cache_key_ignores_value_order(self):
+        assert MetadataFilter(tags=("b", "a")).cache_key() == MetadataFilter(tags=("a", "b", "a")).cache_key()
+        assert MetadataFilter(tags=("a",)).cache_key() != MetadataFilter(topics=("a",)).cache_key()
+
+    def test_matches_or_within_and_across_fields(self):
+        f = MetadataFilter(category=("go", "rust"), tags=("concurrency",))
+        assert [f.matches(d.metadata) for d in DOCS] == [True, False, False, False, False]
+
+    def test_date_range_excludes_undated(self):
+        f = MetadataFilter(date_from=20240101)
+        assert [f.matches(d.metadata) for d in DOCS] == [False, True, True, False, False]
+
+    def test_chroma_where(self):
+        assert MetadataFilter().to_chroma_where() is None
+        assert MetadataFilter(type=("quote",)).to_chroma_where() == {"type": {"$in": ["quote"]}}
+        assert MetadataFilter(tags=("go", "jvm"), date_to=20231231).to_chroma_where() == {"$and": [
+            {"$or": [{"tags": {"$contains": "go"}}, {"tags": {"$contains": "jvm"}}]},
+            {"date_int": {"$lte": 20231231}},
+        ]}
+
+
+class TestMetadataIndex:
+    def test_rows_agree_with_matches(self):
+        index = MetadataIndex.build(DOCS)
+        filters = [
+            MetadataFilter(category=("go",)),
+            MetadataFilter(tags=("go", "jvm")),
+            MetadataFilter(category=("go",), date_from=20240101),
+            MetadataFilter(date_to=20240101),
+            MetadataFilter(type=("quote",), topics=("배움",)),
+            MetadataFilter(author=("없는 저자",)),
+        ]
+        for f in filters:
+            expected = [row for row, d in enumerate(DOCS) if f.matches(d.metadata)]
+            assert index.rows(f).tolist() == expected, f
+
+    def test_rows_are_sorted_int64(self):
+        rows = MetadataIndex.build(DOCS).rows(MetadataFilter(tags=("jvm", "go")))
+        assert rows.dtype == np.int64
+        assert rows.tolist() == [0, 1]
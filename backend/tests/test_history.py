@@ -0,0 +1,83 @@
+import asyncio
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.rag.history import SUMMARY_PREFIX, HistoryManager
+from tests.helpers import char_count
+
+
+def conversation(turns: int) -> list:
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"질문 {i}"))
+        messages.append(AIMessage(content=f"답변 {i}"))
+    return messages
+
+
+class TestSplit:
+    def test_keeps_last_turns(self):
+        manager = HistoryManager(None, char_count, max_turns=2, token_budget=1000)
+        assert manager.split(conversation(5)) == 6
+
+    def test_token_budget_trims_to_turn_boundary(self):
+        manager = HistoryManager(None, char_count, max_turns=5, token_budget=14)
+        messages = conversation(3)
+        start = manager.split(messages)
+        assert start == 4
+        assert isinstance(messages[start], HumanMessage)
+
+    def test_short_history_untouched(self):
+        manager = HistoryManager(None, char_count, max_turns=3)
+        assert manager.split(conversation(2)) == 0
+
+
+class TestAbound:
+    async def test_short_history_returned_verbatim(self):
+        manager = HistoryManager(None, char_count, max_turns=3)
+        messages = conversation(2)
+        assert await manager.abound(messages) == messages
+
+    async def test_older_turns_folded_into_summary(self):
+        llm = FakeListChatModel(responses=["요약 A"])
+        manager = HistoryManager(llm, char_count, max_turns=2)
+
+        bounded = await manager.abound(conversation(4))
+
+        assert isinstance(bounded[0], SystemMessage)
+        assert bounded[0].content == SUMMARY_PREFIX + "요약 A"
+        assert [m.content for m in bounded[1:]] == ["질문 2", "답변 2", "질문 3", "답변 3"]
+
+    async def test_summary_cached_and_rolled_forward(self):
+        llm = FakeListChatModel(responses=["요약 A", "요약 B", "요약 C"])
+        manager = HistoryManager(llm, char_count, max_turns=2)
+
+        await manager.abound(conversation(4))
+        await manager.abound(conversation(4))
+        assert llm.i == 1
+        assert manager.stats()["hits"] == 1
+
+        # 다음 턴: 직전 요약에 새로 밀려난 턴만 접어 넣는다
+        bounded = await manager.abound(conversation(5))
+        assert llm.i == 2
+        assert bounded[0].content == SUMMARY_PREFIX + "요약 B"
+
+    async def test_slow_summary_falls_back_to_recent_turns(self):
+        llm = FakeListChatModel(responses=["요약 A"], sleep=0.2)
+        manager = HistoryManager(llm, char_count, max_turns=2)
+
+        bounded = await manager.abound_within(conversation(4), timeout=0.01)
+
+        assert [m.content for m in bounded] == ["질문 2", "답변 2", "질문 3", "답변 3"]
+        assert manager.stats()["timeouts"] == 1
+
+        # 시간 초과 후에도 요약은 끝까지 실행되어 다음 턴에 캐시 히트가 된다
+        await asyncio.gather(*manager._pending)
+        bounded = await manager.abound_within(conversation(4), timeout=0.01)
+        assert bounded[0].content == SUMMARY_PREFIX + "요약 A"
+        assert manager.stats()["hits"] == 1
+
+    async def test_without_llm_older_turns_dropped(self):
+        manager = HistoryManager(None, char_count, max_turns=1)
+        bounded = await manager.abound(conversation(3))
+        assert [m.content for m in bounded] == ["질문 2", "답변 2"]
@@ -0,0 +1,33 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.http import HttpPool
+
+
+@pytest.fixture
+def pool():
+    pool = HttpPool(max_connections=10, max_keepalive_connections=5, http2=False)
+    yield pool
+    asyncio.run(pool.aclose())
+
+
+class TestHttpPool:
+    def test_stats_before_any_request(self, pool):
+        stats = pool.stats()
+        assert stats["max_connections"] == 10
+        assert stats["async"] == {
+            "connections": 0, "active": 0, "idle": 0, "http2_connections": 0, "utilization": 0.0,
+        }
+
+    def test_shared_limits(self, pool):
+        assert isinstance(pool.client, httpx.Client)
+        assert isinstance(pool.async_client, httpx.AsyncClient)
+        assert pool.limits.max_keepalive_connections == 5
+
+    def test_http2_falls_back_without_h2(self, monkeypatch):
+        monkeypatch.setattr("importlib.util.find_spec", lambda name: None)
+        pool = HttpPool(http2=True)
+        assert pool.http2 is False
+        asyncio.run(pool.aclose())
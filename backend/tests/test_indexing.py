@@ -0,0 +1,83 @@
+from langchain_core.documents import Document
+
+import app.rag.indexing as indexing_module
+from app.config import Settings
+from app.rag.bm25 import build_keyword_index, load_keyword_index
+from app.rag.indexing import build_search_indexes, remove_search_indexes
+from app.rag.local_index import load_vector_index, save_vector_index
+
+CHUNKS = [Document(page_content="goroutine은 경량 스레드입니다", id="1")]
+
+
+class FakeManager:
+    def export_collection(self, blog_id):
+        return CHUNKS, [[1.0, 0.0]]
+
+
+def make_settings(tmp_path, **kwargs) -> Settings:
+    return Settings(
+        keyword_index_dir=str(tmp_path / "keyword"), local_vector_dir=str(tmp_path / "vectors"), **kwargs
+    )
+
+
+def save_stale_vector_index(settings: Settings) -> None:
+    save_vector_index(settings.local_vector_dir, "blog-v2", [Document(page_content="삭제된 청크")], [[0.0, 1.0]])
+
+
+class TestKeywordIndex:
+    def test_built_even_when_hybrid_search_disabled(self, tmp_path):
+        settings = make_settings(tmp_path, use_hybrid_search=False)
+        build_search_indexes(settings, FakeManager(), "blog-v2", CHUNKS)
+        assert len(load_keyword_index(settings.keyword_index_dir, "blog-v2")) == 1
+
+    def test_failed_build_removes_previous_index(self, tmp_path, monkeypatch):
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        settings = make_settings(tmp_path)
+        build_keyword_index(settings.keyword_index_dir, "blog-v2", [Document(page_content="삭제된 청크")])
+        monkeypatch.setattr(indexing_module, "build_keyword_index", fail)
+
+        build_search_indexes(settings, FakeManager(), "blog-v2", CHUNKS)
+
+        assert load_keyword_index(settings.keyword_index_dir, "blog-v2") is None
+
+    def test_remove_is_idempotent(self, tmp_path):
+        settings = make_settings(tmp_path)
+        build_search_indexes(settings, FakeManager(), "blog-v2", CHUNKS)
+        remove_search_indexes(settings, "blog-v2")
+        remove_search_indexes(settings, "blog-v2")
+        assert load_keyword_index(settings.keyword_index_dir, "blog-v2") is None
+
+
+class TestVectorIndex:
+    def test_exported_for_local_backend(self, tmp_path):
+        settings = make_settings(tmp_path, vector_backend="local")
+        save_stale_vector_index(settings)
+        build_search_indexes(settings, FakeManager(), "blog-v2", CHUNKS)
+        index = load_vector_index(settings.local_vector_dir, "blog-v2")
+        assert [doc.page_content for doc in index.documents] == ["goroutine은 경량 스레드입니다"]
+
+    def test_previous_version_disabled_for_chroma_backend(self, tmp_path):
+        settings = make_settings(tmp_path, vector_backend="chroma")
+        save_stale_vector_index(settings)
+        build_search_indexes(settings, FakeManager(), "blog-v2", CHUNKS)
+        assert load_vector_index(settings.local_vector_dir, "blog-v2") is None
+
+    def test_failed_export_disables_previous_version(self, tmp_path, monkeypatch):
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        settings = make_settings(tmp_path, vector_backend="local")
+        save_stale_vector_index(settings)
+        monkeypatch.setattr(indexing_module, "export_vector_index", fail)
+
+        build_search_indexes(settings, FakeManager(), "blog-v2", CHUNKS)
+
+        assert load_vector_index(settings.local_vector_dir, "blog-v2") is None
+
+    def test_remove_disables_vector_index(self, tmp_path):
+        settings = make_settings(tmp_path, vector_backend="local")
+        save_stale_vector_index(settings)
+        remove_search_indexes(settings, "blog-v2")
+        assert load_vector_index(settings.local_vector_dir, "blog-v2") is None
@@ -0,0 +1,157 @@
+import asyncio
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.rag.filters import MetadataFilter
+
+from app.rag.local_index import (
+    Int8Matrix,
+    LocalVectorIndex,
+    create_local_retriever,
+    export_vector_index,
+    index_dir,
+    load_vector_index,
+    save_vector_index,
+)
+
+DOCS = [
+    Document(page_content="goroutine", metadata={"url": "https://a"}, id="1"),
+    Document(page_content="channel", metadata={"url": "https://b"}, id="2"),
+    Document(page_content="ETF", metadata={"url": "https://c"}, id="3"),
+]
+EMBEDDINGS = [[2.0, 0.0, 0.0], [0.6, 0.8, 0.0], [0.0, 0.0, 5.0]]
+
+
+class FakeEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [1.0, 0.1, 0.0]
+
+
+class FakeManager:
+    def export_collection(self, blog_id):
+        return DOCS, EMBEDDINGS
+
+
+class TestLocalVectorIndex:
+    def test_rows_are_normalized_and_ranked_by_cosine(self):
+        index = LocalVectorIndex.build(DOCS, EMBEDDINGS)
+        assert np.allclose(np.linalg.norm(index.embeddings, axis=1), 1.0)
+        results = index.search([1.0, 0.0, 0.0], k=2)
+        assert [doc.id for doc, _ in results] == ["1", "2"]
+        assert [round(score, 4) for _, score in results] == [1.0, 0.6]
+        assert results[0][0].metadata == {"url": "https://a", "relevance": 1.0}
+        # 원본 청크의 메타데이터는 바뀌지 않는다
+        assert "relevance" not in index.documents[0].metadata
+
+    def test_mmr_prefers_diverse_candidates(self):
+        index = LocalVectorIndex.build(DOCS, EMBEDDINGS)
+        results = index.search([1.0, 0.0, 0.1], k=2, fetch_k=3, lambda_mult=0.1)
+        assert [doc.id for doc, _ in results] == ["1", "3"]
+
+    def test_mismatched_lengths_rejected(self):
+        try:
+            LocalVectorIndex(DOCS, np.zeros((2, 3), dtype=np.float32))
+        except ValueError:
+            return
+        raise AssertionError("ValueError expected")
+
+
+class TestPersistence:
+    def test_save_and_load_is_memory_mapped(self, tmp_path):
+        built = save_vector_index(str(tmp_path), "blog-v2", DOCS, EMBEDDINGS)
+        loaded = load_vector_index(str(tmp_path), "blog-v2")
+        assert isinstance(loaded.embeddings, np.memmap)
+        assert loaded.version == built.version
+        assert loaded.search([0.0, 1.0, 0.0], k=1) == built.search([0.0, 1.0, 0.0], k=1)
+
+    def test_new_version_replaces_current_and_prunes_old(self, tmp_path):
+        versions = [
+            save_vector_index(str(tmp_path), "blog-v2", DOCS[:n], EMBEDDINGS[:n]).version
+            for n in (1, 2, 3)
+        ]
+        loaded = load_vector_index(str(tmp_path), "blog-v2")
+        assert loaded.version == versions[-1] and len(loaded) == 3
+        remaining = {p.name for p in index_dir(str(tmp_path), "blog-v2").iterdir() if p.is_dir()}
+        assert remaining == set(versions[1:])
+
+    def test_missing_or_corrupt_index_is_none(self, tmp_path):
+        assert load_vector_index(str(tmp_path), "blog-v2") is None
+        directory = index_dir(str(tmp_path), "blog-v2")
+        directory.mkdir()
+        (directory / "CURRENT").write_text("v1")
+        assert load_vector_index(str(tmp_path), "blog-v2") is None
+
+    def test_export_from_collection(self, tmp_path):
+        export_vector_index(FakeManager(), str(tmp_path), "blog-v2")
+        assert len(load_vector_index(str(tmp_path), "blog-v2")) == 3
+
+
+class TestMetadataFilter:
+    def test_search_only_within_filtered_rows(self):
+        documents = [
+            Document(page_content=d.page_content, metadata={"category": c}, id=d.id)
+            for d, c in zip(DOCS, ["go", "go", "etf"])
+        ]
+        index = LocalVectorIndex.build(documents, EMBEDDINGS)
+        results = index.search([1.0, 0.0, 0.0], k=2, metadata_filter=MetadataFilter(category=("etf",)))
+        assert [doc.id for doc, _ in results] == ["3"]
+        assert index.search([1.0, 0.0, 0.0], k=2, metadata_filter=MetadataFilter(category=("java",))) == []
+
+    def test_int8_filtered_search_matches_exact(self, tmp_path):
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(400, 16)).astype(np.float32)
+        documents = [
+            Document(page_content=str(i), metadata={"category": "go" if i % 4 == 0 else "java"}, id=str(i))
+            for i in range(400)
+        ]
+        save_vector_index(str(tmp_path), "blog-v2", documents, embeddings)
+        go = MetadataFilter(category=("go",))
+        exact = load_vector_index(str(tmp_path), "blog-v2").search(embeddings[8], k=5, metadata_filter=go)
+        quantized = load_vector_index(str(tmp_path), "blog-v2", quantization="int8", rescore_k=30).search(
+            embeddings[8], k=5, metadata_filter=go
+        )
+        assert exact[0][0].id == "8"
+        assert all(doc.metadata["category"] == "go" for doc, _ in quantized)
+        assert {doc.id for doc, _ in quantized} == {doc.id for doc, _ in exact}
+
+
+class TestInt8Quantization:
+    def test_scores_approximate_float_dot_product(self):
+        matrix = np.random.default_rng(0).normal(size=(300, 64)).astype(np.float32)
+        query = np.random.default_rng(1).normal(size=64).astype(np.float32)
+        quantized = Int8Matrix.quantize(matrix)
+        assert quantized.codes.dtype == np.int8
+        assert quantized.nbytes < matrix.nbytes / 3
+        assert np.allclose(quantized.scores(query), matrix @ query, atol=0.2)
+
+    def test_rescoring_returns_exact_scores_and_ranking(self, tmp_path):
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(500, 32)).astype(np.float32)
+        documents = [Document(page_content=str(i), id=str(i)) for i in range(500)]
+        save_vector_index(str(tmp_path), "blog-v2", documents, embeddings)
+        exact = load_vector_index(str(tmp_path), "blog-v2")
+        quantized = load_vector_index(str(tmp_path), "blog-v2", quantization="int8", rescore_k=50)
+        assert quantized.quantization == "int8" and quantized.nbytes < exact.nbytes / 3
+
+        query = embeddings[7] + rng.normal(scale=0.1, size=32).astype(np.float32)
+        rows, scores = quantized.top_k(query, 10)
+        exact_rows, exact_scores = exact.top_k(query, 10)
+        assert rows[0] == 7
+        assert set(rows.tolist()) == set(exact_rows.tolist())
+        assert np.allclose(scores, exact_scores, atol=1e-5)
+
+    def test_unknown_quantization_is_none(self, tmp_path):
+        save_vector_index(str(tmp_path), "blog-v2", DOCS, EMBEDDINGS)
+        assert load_vector_index(str(tmp_path), "blog-v2", quantization="pq") is None
+
+
+def test_retriever_uses_shared_embeddings():
+    index = LocalVectorIndex.build(DOCS, EMBEDDINGS)
+    retriever = create_local_retriever(index, FakeEmbeddings(), top_k=2)
+    assert [d.id for d in retriever.invoke("goroutine")] == ["1", "2"]
+    assert [d.id for d in asyncio.run(retriever.ainvoke("goroutine"))] == ["1", "2"]
@@ -0,0 +1,74 @@
+import asyncio
+
+from langchain_core.documents import Document
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+
+from app.rag.chain import create_rag_chain
+from app.rag.quotes import (
+    GENERATE,
+    RECOMMEND,
+    decide_response_mode,
+    format_recommendations,
+    is_recommendation_request,
+)
+
+QUOTE = Document(
+    page_content='"Courage is grace under pressure."\n"용기란 압박 속의 품위다."\n— Ernest Hemingway\n주제: 용기',
+    metadata={"type": "quote", "author": "Ernest Hemingway", "url": "https://q/1"},
+)
+AUTHOR = Document(
+    page_content="어니스트 헤밍웨이 (Ernest Hemingway)\n국적: 미국\n소개: 미국의 소설가\nBio: American novelist",
+    metadata={"type": "author", "url": "https://a/hemingway"},
+)
+
+
+class TestIntent:
+    def test_recommendation_requests(self):
+        assert is_recommendation_request("용기에 관한 명언 추천해줘")
+        assert is_recommendation_request("Give me a quote about courage")
+
+    def test_explanations_need_llm(self):
+        assert not is_recommendation_request("이 명언의 의미가 뭐야?")
+        assert not is_recommendation_request("헤밍웨이는 누구야?")
+
+    def test_decide_response_mode(self):
+        assert decide_response_mode("inspireme", "용기 명언", None) == RECOMMEND
+        assert decide_response_mode("inspireme", "용기 명언", None, auto=False) == GENERATE
+        assert decide_response_mode("inspireme", "용기 명언", ["history"]) == GENERATE
+        assert decide_response_mode("inspireme", "헤밍웨이는 누구야?", None, RECOMMEND) == RECOMMEND
+        assert decide_response_mode("blog-v2", "명언", None, RECOMMEND) == GENERATE
+
+
+class TestFormatRecommendations:
+    def test_korean_lists_quotes_then_authors(self):
+        answer = format_recommendations([QUOTE, AUTHOR])
+        assert answer.startswith("추천 명언입니다.")
+        assert '1. "Courage is grace under pressure."\n   "용기란 압박 속의 품위다."\n   — Ernest Hemingway' in answer
+        assert "- 어니스트 헤밍웨이 (Ernest Hemingway) — 미국의 소설가" in answer
+
+    def test_english_prefers_english_text(self):
+        answer = format_recommendations([QUOTE, AUTHOR], "en")
+        assert '1. "Courage is grace under pressure."\n   — Ernest Hemingway' in answer
+        assert "용기란" not in answer
+        assert "American novelist" in answer
+
+    def test_no_documents(self):
+        assert format_recommendations([]) == "관련 명언을 찾지 못했습니다."
+        assert format_recommendations([], "en") == "No related quotes were found."
+
+
+class TestRecommendChain:
+    def test_recommend_mode_skips_llm(self):
+        llm = FakeListChatModel(responses=["LLM 답변", "LLM 답변"])
+        chain = create_rag_chain(
+            None, "gpt-test", retriever=RunnableLambda(lambda q: [QUOTE]), blog_id="inspireme", llm=llm,
+        )
+        recommended = asyncio.run(chain.ainvoke(
+            {"input": "용기 명언", "chat_history": [], "response_mode": RECOMMEND}
+        ))
+        generated = asyncio.run(chain.ainvoke({"input": "용기 명언", "chat_history": []}))
+
+        assert recommended["answer"].startswith("추천 명언입니다.")
+        assert generated["answer"] == "LLM 답변"
+        assert llm.i == 1
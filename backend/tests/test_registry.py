@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import FakeEmbeddings
+from langchain_core.runnables import RunnableLambda
+
+import app.rag.registry as registry_module
+from app.config import Settings
+from app.core.http import HttpPool
+from app.rag.bm25 import build_keyword_index
+from app.rag.local_index import LocalVectorRetriever, save_vector_index
+from app.rag.retriever import HybridRetriever
+from app.rag.registry import RagRegistry
+
+
+class FakeManager:
+    embeddings = None
+
+    def __init__(self):
+        self.evicted = []
+
+    def evict_store(self, blog_id):
+        self.evicted.append(blog_id)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    calls = []
+
+    def fake_create_rag_chain(store, model, top_k, **kwargs):
+        calls.append((kwargs["retriever"], model, top_k, kwargs["language"]))
+        return object()
+
+    monkeypatch.setattr(registry_module, "create_rag_chain", fake_create_rag_chain)
+    monkeypatch.setattr(
+        registry_module, "create_async_retriever",
+        lambda manager, blog_id, top_k, **kwargs: f"retriever:{blog_id}:{top_k}",
+    )
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    reg = RagRegistry(Settings(openai_model="gpt-test", top_k=5))
+    reg._manager = FakeManager()
+    reg.calls = calls
+    return reg
+
+
+class TestRagRegistry:
+    def test_chain_reused_for_same_key(self, registry):
+        first = registry.get_chain("blog-v2", None)
+        second = registry.get_chain("blog-v2", None, "gpt-test", 5)
+        assert first is second
+        assert len(registry.calls) == 1
+
+    def test_distinct_keys_build_distinct_chains(self, registry):
+        ko = registry.get_chain("inspireme", None)
+        en = registry.get_chain("inspireme", "en")
+        wide = registry.get_chain("inspireme", None, top_k=10)
+        assert len({id(ko), id(en), id(wide)}) == 3
+        assert registry.stats()["chains"] == 3
+
+    def test_llm_client_shared_across_chains(self, registry):
+        assert registry.get_llm("gpt-test") is registry.get_llm("gpt-test")
+        registry.get_chain("blog-v2", None)
+        registry.get_chain("investment", None)
+        assert registry.stats()["llms"] == 1
+
+    def test_invalidate_drops_only_target_blog(self, registry):
+        blog = registry.get_chain("blog-v2", None)
+        invest = registry.get_chain("investment", None)
+
+        registry.invalidate("blog-v2")
+
+        assert registry._manager.evicted == ["blog-v2"]
+        assert registry.get_chain("investment", None) is invest
+        assert registry.get_chain("blog-v2", None) is not blog
+
+    def test_invalidate_bumps_index_version(self, registry):
+        assert registry.index_version("blog-v2") == 0
+        registry.invalidate("blog-v2")
+        assert registry.index_version("blog-v2") == 1
+        assert registry.index_version("investment") == 0
+
+
+class TestRagRegistryHttpPool:
+    def test_llm_uses_shared_http_clients(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        pool = HttpPool(http2=False)
+        reg = RagRegistry(Settings(openai_model="gpt-test"), pool)
+        llm = reg.get_llm("gpt-test")
+        assert llm.http_async_client is pool.async_client
+        assert llm.http_client is pool.client
+        asyncio.run(pool.aclose())
+
+
+class TestRagRegistryHybrid:
+    def test_hybrid_retriever_when_keyword_index_saved(self, monkeypatch, tmp_path):
+        built = []
+        semantic = RunnableLambda(lambda query: [])
+        monkeypatch.setattr(
+            registry_module, "create_rag_chain",
+            lambda store, model, top_k, **kwargs: built.append(kwargs["retriever"]) or object(),
+        )
+        monkeypatch.setattr(
+            registry_module, "create_async_retriever", lambda manager, blog_id, top_k, **kwargs: semantic,
+        )
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        build_keyword_index(str(tmp_path), "blog-v2", [Document(page_content="goroutine")])
+        reg = RagRegistry(Settings(use_hybrid_search=True, keyword_index_dir=str(tmp_path)))
+        reg._manager = FakeManager()
+
+        reg.get_chain("blog-v2")
+        reg.get_chain("investment")
+
+        assert isinstance(built[0], HybridRetriever)
+        assert built[1] is semantic
+        assert reg.stats()["keyword_indexes"] == {"blog-v2": 1}
+
+
+class TestRagRegistryVectorBackend:
+    def test_local_backend_uses_saved_index_and_falls_back_to_chroma(self, monkeypatch, tmp_path):
+        built = []
+        chroma = RunnableLambda(lambda query: [])
+        monkeypatch.setattr(
+            registry_module, "create_rag_chain",
+            lambda store, model, top_k, **kwargs: built.append(kwargs["retriever"]) or object(),
+        )
+        monkeypatch.setattr(
+            registry_module, "create_async_retriever", lambda manager, blog_id, top_k, **kwargs: chroma,
+        )
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        save_vector_index(str(tmp_path), "blog-v2", [Document(page_content="goroutine")], [[1.0, 0.0]])
+        reg = RagRegistry(Settings(vector_backend="local", local_vector_dir=str(tmp_path)))
+        reg._manager = FakeManager()
+        reg._manager.embeddings = FakeEmbeddings(size=2)
+
+        reg.get_chain("blog-v2")
+        reg.get_chain("investment")
+
+        assert isinstance(built[0], LocalVectorRetriever)
+        assert built[1] is chroma
+        assert reg.stats()["vector_indexes"]["blog-v2"]["documents"] == 1
+
+        reg.invalidate("blog-v2")
+        assert reg.stats()["vector_indexes"] == {}
@@ -0,0 +1,50 @@
+import time
+
+from app.api.models import ChatMessage, ChatResponse
+from app.cache.response import ResponseCache, make_cache_key, normalize_question
+
+RESPONSE = ChatResponse(answer="답변", sources=[])
+
+
+class TestNormalizeQuestion:
+    def test_case_whitespace_and_trailing_punctuation(self):
+        assert normalize_question("  Goroutine이란   무엇인가요? ") == "goroutine이란 무엇인가요"
+        assert normalize_question("goroutine이란 무엇인가요") == "goroutine이란 무엇인가요"
+
+
+class TestMakeCacheKey:
+    def test_history_changes_key(self):
+        history = [ChatMessage(role="human", content="안녕")]
+        assert make_cache_key("blog-v2", None, "q", None, 0) != make_cache_key("blog-v2", None, "q", history, 0)
+
+    def test_index_version_changes_key(self):
+        assert make_cache_key("blog-v2", None, "q", None, 0) != make_cache_key("blog-v2", None, "q", None, 1)
+
+
+class TestResponseCache:
+    def test_hit_and_miss_counters(self):
+        cache = ResponseCache()
+        key = make_cache_key("blog-v2", None, "q", None, 0)
+        assert cache.get(key) is None
+        cache.put(key, RESPONSE)
+        assert cache.get(key) == RESPONSE
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1, "evictions": 0, "hit_rate": 0.5}
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        keys = [make_cache_key("blog-v2", None, q, None, 0) for q in ("a", "b", "c")]
+        cache.put(keys[0], RESPONSE)
+        cache.put(keys[1], RESPONSE)
+        cache.get(keys[0])
+        cache.put(keys[2], RESPONSE)
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == RESPONSE
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        cache = ResponseCache(ttl_seconds=5)
+        key = make_cache_key("blog-v2", None, "q", None, 0)
+        cache.put(key, RESPONSE)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+        assert cache.get(key) is None
@@ -0,0 +1,159 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from langchain_core.runnables import RunnableLambda
+
+from app.rag.bm25 import BM25Index
+from app.rag.filters import MetadataFilter
+from app.rag.retriever import (
+    create_async_retriever,
+    create_hybrid_retriever,
+    mmr_select,
+    query_results_to_documents,
+    reciprocal_rank_fusion,
+)
+from app.rag.vector_store import VectorStoreManager
+
+
+class FakeEmbeddings:
+    async def aembed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+class FakeAsyncCollection:
+    def __init__(self):
+        self.queries = []
+
+    async def query(self, query_embeddings, n_results, include, where=None):
+        self.queries.append((query_embeddings, n_results))
+        self.where = where
+        return {
+            "ids": [["c1", "c2"]],
+            "documents": [["goroutine 설명", "channel 설명"]],
+            "metadatas": [[{"url": "https://a"}, None]],
+        }
+
+
+class TestQueryResultsToDocuments:
+    def test_converts_first_query(self):
+        results = {
+            "ids": [["c1", "c2"]],
+            "documents": [["본문", None]],
+            "metadatas": [[{"title": "제목"}, {}]],
+        }
+        docs = query_results_to_documents(results)
+        assert docs == [Document(page_content="본문", metadata={"title": "제목"}, id="c1")]
+
+
+class FakeMMRCollection:
+    def __init__(self):
+        self.queries = []
+
+    async def query(self, query_embeddings, n_results, include, where=None):
+        self.queries.append((n_results, include))
+        return {
+            "ids": [["a1", "a2", "b1"]],
+            "documents": [["post A part 1", "post A part 2", "post B"]],
+            "metadatas": [[{"source": "a.md"}, {"source": "a.md"}, {"source": "b.md"}]],
+            "embeddings": [np.array([[1.0, 0.11], [1.0, 0.13], [0.6, 0.8]])],
+        }
+
+
+class TestMMRSelect:
+    def test_prefers_diverse_candidate(self):
+        candidates = [[1.0, 0.0], [0.99, 0.01], [0.7, 0.7]]
+        assert mmr_select([1.0, 0.0], candidates, 2, lambda_mult=0.3) == [0, 2]
+
+    def test_lambda_one_is_relevance_order(self):
+        candidates = [[0.7, 0.7], [1.0, 0.0], [0.99, 0.01]]
+        assert mmr_select([1.0, 0.0], candidates, 3, lambda_mult=1.0) == [1, 2, 0]
+
+    def test_k_larger_than_candidates(self):
+        assert mmr_select([1.0, 0.0], [[1.0, 0.0]], 5) == [0]
+        assert mmr_select([1.0, 0.0], [], 5) == []
+
+
+def doc(text):
+    return Document(page_content=text)
+
+
+class TestReciprocalRankFusion:
+    def test_documents_in_both_lists_rank_first(self):
+        fused = reciprocal_rank_fusion([[doc("a"), doc("b")], [doc("c"), doc("b")]], [1.0, 1.0], k=60)
+        assert [d.page_content for d, _ in fused] == ["b", "a", "c"]
+
+    def test_weights(self):
+        fused = reciprocal_rank_fusion([[doc("a")], [doc("c")]], [1.0, 2.0], k=60)
+        assert [d.page_content for d, _ in fused] == ["c", "a"]
+
+    def test_keeps_first_list_metadata(self):
+        semantic = Document(page_content="a", metadata={"relevance": 0.9})
+        fused = reciprocal_rank_fusion([[semantic], [doc("a")]], [1.0, 1.0])
+        assert fused[0][0].metadata == {"relevance": 0.9}
+
+
+class TestHybridRetriever:
+    async def test_fuses_semantic_and_keyword_results(self):
+        keyword_index = BM25Index.build([doc("goroutine 스케줄러"), doc("ETF 투자")])
+        semantic = RunnableLambda(lambda query: [doc("goroutine 소개"), doc("goroutine 스케줄러")])
+        retriever = create_hybrid_retriever(semantic, keyword_index, top_k=2)
+
+        docs = await retriever.ainvoke("goroutine")
+
+        assert [d.page_content for d in docs] == ["goroutine 스케줄러", "goroutine 소개"]
+
+    async def test_metadata_filter_applied_to_both_retrievers(self):
+        keyword_index = BM25Index.build([
+            Document(page_content="goroutine 스케줄러", metadata={"category": "go"}),
+            Document(page_content="goroutine 투자", metadata={"category": "etf"}),
+        ])
+        filters = []
+        semantic = RunnableLambda(lambda query, **kwargs: filters.append(kwargs) or [])
+        retriever = create_hybrid_retriever(semantic, keyword_index, top_k=2)
+
+        go = MetadataFilter(category=("go",))
+        docs = await retriever.ainvoke("goroutine", metadata_filter=go)
+
+        assert [d.page_content for d in docs] == ["goroutine 스케줄러"]
+        assert filters == [{"metadata_filter": go}]
+
+
+class TestAsyncChromaRetriever:
+    async def test_mmr_uses_stored_embeddings(self):
+        manager = VectorStoreManager("localhost", 8000, FakeEmbeddings())
+        collection = FakeMMRCollection()
+        manager._async_collections["blog-v2"] = collection
+
+        retriever = create_async_retriever(manager, "blog-v2", top_k=2, fetch_k=10, lambda_mult=0.3)
+        docs = await retriever.ainvoke("goroutine")
+
+        assert [d.id for d in docs] == ["a1", "b1"]
+        assert collection.queries == [(10, ["documents", "metadatas", "embeddings"])]
+
+    async def test_ainvoke_uses_async_collection(self):
+        manager = VectorStoreManager("localhost", 8000, FakeEmbeddings())
+        collection = FakeAsyncCollection()
+        manager._async_collections["blog-v2"] = collection
+
+        retriever = create_async_retriever(manager, "blog-v2", top_k=2)
+        docs = await retriever.ainvoke("goroutine")
+
+        assert [d.page_content for d in docs] == ["goroutine 설명", "channel 설명"]
+        assert docs[1].metadata == {}
+        assert collection.queries == [([[9.0, 1.0]], 2)]
+
+    async def test_metadata_filter_becomes_where_clause(self):
+        manager = VectorStoreManager("localhost", 8000, FakeEmbeddings())
+        collection = FakeAsyncCollection()
+        manager._async_collections["blog-v2"] = collection
+
+        retriever = create_async_retriever(manager, "blog-v2", top_k=2)
+        await retriever.ainvoke("goroutine", metadata_filter=MetadataFilter(category=("go",)))
+
+        assert collection.where == {"category": {"$in": ["go"]}}
+
+    def test_evict_store_drops_async_collection(self):
+        manager = VectorStoreManager("localhost", 8000, FakeEmbeddings())
+        manager._async_collections["blog-v2"] = FakeAsyncCollection()
+        manager.evict_store("blog-v2")
+        assert "blog-v2" not in manager._async_collections
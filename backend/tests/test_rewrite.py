@@ -0,0 +1,83 @@
+import pytest
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.retrievers import BaseRetriever
+
+from app.rag.chain import create_rag_chain
+from app.rag.rewrite import (
+    NO_HISTORY,
+    REWRITTEN,
+    SELF_CONTAINED,
+    decide_rewrite,
+    is_self_contained,
+)
+
+HISTORY = [HumanMessage(content="goroutine이란?"), AIMessage(content="경량 스레드입니다.")]
+
+
+class RecordingRetriever(BaseRetriever):
+    queries: list[str] = []
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        self.queries.append(query)
+        return [Document(page_content="본문", metadata={"url": "https://a"})]
+
+
+class TestIsSelfContained:
+    @pytest.mark.parametrize("question", [
+        "Go에서 iota는 어떻게 사용하나요?",
+        "Java Stream API의 주요 특징은?",
+        "What is a goroutine in Go?",
+    ])
+    def test_standalone_questions(self, question):
+        assert is_self_contained(question)
+
+    @pytest.mark.parametrize("question", [
+        "그거 예시 보여줘",
+        "그럼 channel과는 어떻게 달라?",
+        "이것의 단점은?",
+        "더 자세히 설명해줘",
+        "How does it compare to threads?",
+        "왜요?",
+    ])
+    def test_questions_referring_to_history(self, question):
+        assert not is_self_contained(question)
+
+
+class TestDecideRewrite:
+    def test_no_history(self):
+        assert decide_rewrite("그거 예시 보여줘", []) == NO_HISTORY
+        assert decide_rewrite("그거 예시 보여줘", None) == NO_HISTORY
+
+    def test_self_contained_with_history(self):
+        assert decide_rewrite("Go에서 iota는 어떻게 사용하나요?", HISTORY) == SELF_CONTAINED
+
+    def test_follow_up_with_history(self):
+        assert decide_rewrite("그거 예시 보여줘", HISTORY) == REWRITTEN
+
+    def test_always_policy(self):
+        assert decide_rewrite("Go에서 iota는 어떻게 사용하나요?", HISTORY, "always") == REWRITTEN
+
+
+class TestChainRewriteBranch:
+    def _chain(self, responses):
+        retriever = RecordingRetriever(queries=[])
+        llm = FakeListChatModel(responses=responses)
+        return create_rag_chain(None, "fake", retriever=retriever, llm=llm), retriever
+
+    def test_self_contained_skips_rewrite_llm_call(self):
+        chain, retriever = self._chain(["답변"])
+        result = chain.invoke({
+            "input": "Go에서 iota는 어떻게 사용하나요?",
+            "chat_history": HISTORY,
+            "rewrite_path": SELF_CONTAINED,
+        })
+        assert retriever.queries == ["Go에서 iota는 어떻게 사용하나요?"]
+        assert result["answer"] == "답변"
+
+    def test_follow_up_uses_rewritten_query(self):
+        chain, retriever = self._chain(["goroutine 예시", "답변"])
+        result = chain.invoke({"input": "그거 예시 보여줘", "chat_history": HISTORY})
+        assert retriever.queries == ["goroutine 예시"]
+        assert result["answer"] == "답변"
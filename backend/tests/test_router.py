@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+
+from app.rag.chain import create_rag_chain
+from app.rag.context import estimate_tokens
+from app.rag.router import ModelRouter, RoutingSignals
+
+CONTEXT = [Document(page_content="iota는 상수 선언에서 0부터 1씩 증가하는 값을 만든다.")]
+
+
+def make_router(**kwargs):
+    tiers = [
+        ("cheap", FakeListChatModel(responses=["cheap"] * 3)),
+        ("mid", FakeListChatModel(responses=["mid"] * 3)),
+        ("large", FakeListChatModel(responses=["large"] * 3)),
+    ]
+    return ModelRouter(tiers, **kwargs)
+
+
+class TestModelRouter:
+    def test_tier_is_number_of_exceeded_signals(self):
+        router = make_router(question_tokens=10, context_tokens=100, history_messages=4)
+        assert router.select(RoutingSignals(5, 50, 0)) == 0
+        assert router.select(RoutingSignals(20, 50, 0)) == 1
+        assert router.select(RoutingSignals(20, 200, 4)) == 2
+
+    def test_tier_capped_at_last(self):
+        router = ModelRouter([("only", FakeListChatModel(responses=["a"]))], question_tokens=1)
+        assert router.select(RoutingSignals(100, 10000, 10)) == 0
+
+    def test_requires_tiers(self):
+        with pytest.raises(ValueError):
+            ModelRouter([])
+
+    def test_signals(self):
+        router = make_router()
+        signals = router.signals(
+            {"input": "iota?", "context": CONTEXT, "chat_history": ["q", "a"]}, estimate_tokens
+        )
+        assert signals.question_tokens == estimate_tokens("iota?")
+        assert signals.context_tokens == estimate_tokens(CONTEXT[0].page_content)
+        assert signals.history_messages == 2
+
+
+class TestRoutedChain:
+    def test_routes_by_question_length_and_records_latency(self):
+        router = make_router(question_tokens=10, context_tokens=10000)
+        chain = create_rag_chain(
+            None, "cheap", retriever=RunnableLambda(lambda q: CONTEXT),
+            llm=router.llms[0], count_tokens=estimate_tokens, model_router=router,
+        )
+
+        short = asyncio.run(chain.ainvoke({"input": "iota?", "chat_history": []}))
+        long = asyncio.run(chain.ainvoke({
+            "input": "iota와 const 블록의 관계, 그리고 비트 플래그 정의에 쓰는 방법을 자세히 비교해줘",
+            "chat_history": [],
+        }))
+
+        assert short["answer"] == "cheap"
+        assert long["answer"] == "mid"
+        stats = router.stats()
+        assert stats["cheap"]["calls"] == 1
+        assert stats["mid"]["calls"] == 1
+        assert stats["large"]["calls"] == 0
@@ -0,0 +1,36 @@
+import pytest
+from langchain_core.documents import Document
+
+from app.rag.search import distance_to_similarity, group_by_post, snippet
+
+
+def doc(url, text="본문", title="제목"):
+    return Document(page_content=text, metadata={"url": url, "title": title})
+
+
+class TestDistanceToSimilarity:
+    def test_l2_is_squared_distance(self):
+        assert distance_to_similarity(0.0, "l2") == 1.0
+        assert distance_to_similarity(1.0, "l2") == pytest.approx(0.5)
+
+    def test_cosine(self):
+        assert distance_to_similarity(0.25, "cosine") == pytest.approx(0.75)
+
+
+class TestGroupByPost:
+    def test_groups_chunks_and_keeps_best_snippet(self):
+        docs = [doc("https://a", "a1"), doc("https://b", "b1"), doc("https://a", "a2")]
+        posts = group_by_post(docs, [0.7, 0.8, 0.9], limit=5)
+        assert [p.url for p in posts] == ["https://a", "https://b"]
+        assert posts[0].snippet == "a2"
+        assert posts[0].chunks == 2
+
+    def test_limit_and_missing_url(self):
+        docs = [doc("https://a"), doc(""), doc("https://b")]
+        posts = group_by_post(docs, [0.5, 0.9, 0.6], limit=1)
+        assert [p.url for p in posts] == ["https://b"]
+
+
+def test_snippet_truncates_and_collapses_whitespace():
+    assert snippet("a \n b") == "a b"
+    assert snippet("가" * 300, max_chars=10) == "가" * 10 + "…"
@@ -0,0 +1,52 @@
+import time
+
+from app.api.models import ChatResponse, Source
+from app.cache.semantic import SemanticCache
+
+RESPONSE = ChatResponse(answer="경량 스레드입니다.", sources=[Source(title="Go", url="https://a")])
+
+
+class TestSemanticCache:
+    def test_hit_above_threshold(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.store("blog-v2", None, "goroutine이란?", [1.0, 0.0], RESPONSE)
+        assert cache.lookup("blog-v2", None, [0.99, 0.05]) == RESPONSE
+        assert cache.stats()["hits"] == 1
+
+    def test_miss_below_threshold(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.store("blog-v2", None, "goroutine이란?", [1.0, 0.0], RESPONSE)
+        assert cache.lookup("blog-v2", None, [0.5, 0.5]) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_buckets_isolated_by_blog_and_language(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.store("inspireme", None, "용기에 관한 명언", [1.0, 0.0], RESPONSE)
+        assert cache.lookup("inspireme", "en", [1.0, 0.0]) is None
+        assert cache.lookup("blog-v2", None, [1.0, 0.0]) is None
+
+    def test_lru_eviction(self):
+        cache = SemanticCache(threshold=0.99, max_entries=2)
+        cache.store("blog-v2", None, "q1", [1.0, 0.0, 0.0], RESPONSE)
+        cache.store("blog-v2", None, "q2", [0.0, 1.0, 0.0], RESPONSE)
+        cache.lookup("blog-v2", None, [1.0, 0.0, 0.0])  # q1 최근 사용
+        cache.store("blog-v2", None, "q3", [0.0, 0.0, 1.0], RESPONSE)
+
+        assert cache.lookup("blog-v2", None, [0.0, 1.0, 0.0]) is None
+        assert cache.lookup("blog-v2", None, [1.0, 0.0, 0.0]) == RESPONSE
+        assert cache.stats()["entries"] == 2
+
+    def test_ttl_expiry(self, monkeypatch):
+        cache = SemanticCache(threshold=0.9, ttl_seconds=10)
+        cache.store("blog-v2", None, "q", [1.0, 0.0], RESPONSE)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+        assert cache.lookup("blog-v2", None, [1.0, 0.0]) is None
+
+    def test_clear_blog(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.store("blog-v2", None, "q", [1.0, 0.0], RESPONSE)
+        cache.store("investment", None, "q", [1.0, 0.0], RESPONSE)
+        cache.clear("blog-v2")
+        assert cache.lookup("blog-v2", None, [1.0, 0.0]) is None
+        assert cache.lookup("investment", None, [1.0, 0.0]) == RESPONSE
@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+from app.cache.session import ChatSession, SessionStore
+
+
+class TestChatSession:
+    def test_append_turn_keeps_recent_turns(self):
+        session = ChatSession(session_id="s", blog_id="blog-v2")
+        for i in range(3):
+            session.append_turn(f"q{i}", f"a{i}", max_turns=2)
+        assert [m.content for m in session.history()] == ["q1", "a1", "q2", "a2"]
+        assert session.history()[0].role == "human"
+
+
+class TestSessionStore:
+    def test_save_and_get(self):
+        store = SessionStore()
+        session = store.create("blog-v2")
+        asyncio.run(store.save(session))
+        assert asyncio.run(store.get(session.session_id, "blog-v2")) is session
+        assert store.stats()["hits"] == 1
+
+    def test_other_blog_id_is_miss(self):
+        store = SessionStore()
+        session = store.create("blog-v2")
+        asyncio.run(store.save(session))
+        assert asyncio.run(store.get(session.session_id, "investment")) is None
+        assert store.stats()["misses"] == 1
+
+    def test_expired_session_is_miss(self):
+        store = SessionStore(ttl_seconds=0)
+        session = store.create("blog-v2")
+        asyncio.run(store.save(session))
+        time.sleep(0.01)
+        assert asyncio.run(store.get(session.session_id, "blog-v2")) is None
+
+    def test_lru_eviction(self):
+        store = SessionStore(max_entries=2)
+        sessions = [store.create("blog-v2") for _ in range(3)]
+        for session in sessions:
+            asyncio.run(store.save(session))
+        assert asyncio.run(store.get(sessions[0].session_id, "blog-v2")) is None
+        assert store.stats()["entries"] == 2
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "답변"
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+        assert calls == 1
+        assert [r for r, _ in results] == ["답변"] * 5
+        assert [shared for _, shared in results].count(False) == 1
+        assert flight.stats() == {"in_flight": 0, "executed": 1, "shared": 4}
+
+    async def test_distinct_keys_run_separately(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0)
+            return 1
+
+        await asyncio.gather(flight.do("a", work), flight.do("b", work))
+        assert flight.stats()["executed"] == 2
+
+    async def test_sequential_calls_execute_again(self):
+        flight = SingleFlight()
+
+        async def work():
+            return 1
+
+        await flight.do("k", work)
+        await flight.do("k", work)
+        assert flight.stats()["executed"] == 2
+
+    async def test_exception_propagates_to_all_waiters(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            flight.do("k", work), flight.do("k", work), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def test_cancelled_leader_does_not_cancel_follower(self):
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "답변"
+
+        leader = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await follower == ("답변", True)